@@ -0,0 +1,369 @@
+import threading
+import time
+
+DEFAULT_SCREEN_SIZE = (1920, 1080)
+
+# pycaw master volume limits in dB
+MIN_VOLUME_DB = -65.25
+MAX_VOLUME_DB = 0.0
+
+
+class PyAutoGuiActuator:
+    # Drives the real pointer; pyautogui (and pycaw for volume) are imported only when used
+    def __init__(self, failsafe=True):
+        import pyautogui
+        # The default 0.1 s PAUSE sleeps after every single call
+        pyautogui.PAUSE = 0
+        pyautogui.FAILSAFE = failsafe
+        self.pyautogui = pyautogui
+        self._local = threading.local()
+
+    def screen_size(self):
+        return tuple(self.pyautogui.size())
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y, duration=0)
+
+    def click(self):
+        self.pyautogui.click()
+
+    def double_click(self):
+        self.pyautogui.doubleClick()
+
+    def mouse_down(self):
+        self.pyautogui.mouseDown()
+
+    def mouse_up(self):
+        self.pyautogui.mouseUp()
+
+    def scroll(self, amount):
+        self.pyautogui.scroll(amount)
+
+    def press(self, key):
+        self.pyautogui.press(key)
+
+    def adjust_volume(self, delta_db):
+        volume_ctrl = self._volume_ctrl()
+        current_volume = volume_ctrl.GetMasterVolumeLevel()
+        new_volume = min(max(current_volume + delta_db, MIN_VOLUME_DB), MAX_VOLUME_DB)
+        volume_ctrl.SetMasterVolumeLevel(new_volume, None)
+
+    def close(self):
+        pass
+
+    def _volume_ctrl(self):
+        # COM objects must be created on the thread that uses them
+        volume_ctrl = getattr(self._local, "volume_ctrl", None)
+        if volume_ctrl is None:
+            import comtypes
+            from ctypes import cast, POINTER
+            from comtypes import CLSCTX_ALL
+            from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+
+            comtypes.CoInitialize()
+            devices = AudioUtilities.GetSpeakers()
+            interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+            volume_ctrl = cast(interface, POINTER(IAudioEndpointVolume))
+            self._local.volume_ctrl = volume_ctrl
+        return volume_ctrl
+
+
+class NullActuator:
+    # Accepts every action and does nothing; used for headless runs
+    def __init__(self, screen_size=DEFAULT_SCREEN_SIZE):
+        self._screen_size = tuple(screen_size)
+
+    def screen_size(self):
+        return self._screen_size
+
+    def move_to(self, x, y):
+        pass
+
+    def click(self):
+        pass
+
+    def double_click(self):
+        pass
+
+    def mouse_down(self):
+        pass
+
+    def mouse_up(self):
+        pass
+
+    def scroll(self, amount):
+        pass
+
+    def press(self, key):
+        pass
+
+    def adjust_volume(self, delta_db):
+        pass
+
+    def close(self):
+        pass
+
+
+class RecordingActuator(NullActuator):
+    # Keeps every action as (time, name, args) so tests and benchmarks can inspect them
+    def __init__(self, screen_size=DEFAULT_SCREEN_SIZE):
+        super().__init__(screen_size)
+        self.actions = []
+        self._lock = threading.Lock()
+
+    def _record(self, name, *args):
+        with self._lock:
+            self.actions.append((time.perf_counter(), name, args))
+
+    def move_to(self, x, y):
+        self._record("move_to", x, y)
+
+    def click(self):
+        self._record("click")
+
+    def double_click(self):
+        self._record("double_click")
+
+    def mouse_down(self):
+        self._record("mouse_down")
+
+    def mouse_up(self):
+        self._record("mouse_up")
+
+    def scroll(self, amount):
+        self._record("scroll", amount)
+
+    def press(self, key):
+        self._record("press", key)
+
+    def adjust_volume(self, delta_db):
+        self._record("adjust_volume", delta_db)
+
+    def counts(self):
+        counts = {}
+        for _, name, _ in self.actions:
+            counts[name] = counts.get(name, 0) + 1
+        return counts
+
+
+class TimedActuator:
+    # Wraps another actuator and accumulates the time spent inside its calls
+    def __init__(self, actuator):
+        self.actuator = actuator
+        self.elapsed = 0.0
+
+    def __getattr__(self, name):
+        attr = getattr(self.actuator, name)
+        if not callable(attr):
+            return attr
+
+        def timed(*args):
+            t0 = time.perf_counter()
+            try:
+                return attr(*args)
+            finally:
+                self.elapsed += time.perf_counter() - t0
+
+        # Cache the wrapper so __getattr__ only runs once per method
+        setattr(self, name, timed)
+        return timed
+
+    def take_elapsed(self):
+        elapsed = self.elapsed
+        self.elapsed = 0.0
+        return elapsed
+
+
+class CallStats:
+    # Per-method call counts and latencies, plus how long calls waited in the queue
+    __slots__ = ("calls", "total", "max", "queued_total", "queued_max")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.queued_total = 0.0
+        self.queued_max = 0.0
+
+    def add(self, elapsed, queued):
+        self.calls += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.queued_total += queued
+        self.queued_max = max(self.queued_max, queued)
+
+    def summary(self):
+        calls = max(self.calls, 1)
+        return {"calls": self.calls, "mean_ms": self.total / calls * 1000, "max_ms": self.max * 1000,
+                "queued_mean_ms": self.queued_total / calls * 1000, "queued_max_ms": self.queued_max * 1000}
+
+
+class ThreadedActuator:
+    # Puts a backend actuator on its own thread so OS input never runs in the vision loop.
+    # Calls return immediately; the thread flushes at most rate times a second, in call order:
+    #   moves keep only the latest target, and are held back when closer than min_move px to the last one
+    #   consecutive scrolls and volume changes are summed
+    #   clicks, button and key presses are never merged or dropped
+    # A held-back move is still sent before the next click or button/key press, and once no
+    # call came for settle seconds, so the pointer always ends on the last target.
+    def __init__(self, backend, rate=120.0, min_move=2, settle=0.1):
+        self.backend = backend
+        self.period = 1.0 / rate if rate else 0.0
+        self.min_move = min_move
+        self.settle = settle
+        self.stats = {}
+        self.moves_skipped = 0
+        self.merged = 0
+        self._screen_size = backend.screen_size()
+        self._pending = []
+        self._last_move = None
+        self._held_move = None
+        self._closing = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="actuator", daemon=True)
+        self._thread.start()
+
+    def screen_size(self):
+        return self._screen_size
+
+    def _put(self, name, *args):
+        with self._condition:
+            pending = self._pending
+            if pending and pending[-1][0] == name and name in ("move_to", "scroll", "adjust_volume"):
+                last = pending[-1]
+                args = args if name == "move_to" else (last[1][0] + args[0],)
+                pending[-1] = (name, args, last[2])
+                self.merged += 1
+            else:
+                pending.append((name, args, time.perf_counter()))
+            self._condition.notify()
+
+    def move_to(self, x, y):
+        self._put("move_to", x, y)
+
+    def click(self):
+        self._put("click")
+
+    def double_click(self):
+        self._put("double_click")
+
+    def mouse_down(self):
+        self._put("mouse_down")
+
+    def mouse_up(self):
+        self._put("mouse_up")
+
+    def scroll(self, amount):
+        self._put("scroll", amount)
+
+    def press(self, key):
+        self._put("press", key)
+
+    def adjust_volume(self, delta_db):
+        self._put("adjust_volume", delta_db)
+
+    def _run(self):
+        next_flush = 0.0
+        while True:
+            with self._condition:
+                while not self._pending and not self._closing:
+                    if self._held_move is None:
+                        self._condition.wait()
+                    elif not self._condition.wait(self.settle):
+                        break
+                idle = not self._pending
+            if idle:
+                # Settled (or closing) with a move still held back: the pointer must end on it
+                self._send_held_move()
+                if self._closing:
+                    return
+                continue
+            # Hold back until the next tick so a burst of calls lands in one flush
+            delay = next_flush - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            with self._condition:
+                batch, self._pending = self._pending, []
+            for name, args, queued_at in batch:
+                self._call(name, args, queued_at)
+            next_flush = time.perf_counter() + self.period
+
+    def _send_held_move(self):
+        if self._held_move is not None:
+            args, queued_at = self._held_move
+            self._held_move = None
+            self._last_move = args
+            self._invoke("move_to", args, queued_at)
+
+    def _call(self, name, args, queued_at):
+        if name == "move_to":
+            last = self._last_move
+            if last is not None and abs(args[0] - last[0]) < self.min_move and abs(args[1] - last[1]) < self.min_move:
+                self.moves_skipped += 1
+                self._held_move = (args, queued_at)
+                return
+            self._held_move = None
+            self._last_move = args
+        elif name not in ("scroll", "adjust_volume"):
+            # Clicks and drops land where the pointer was last sent
+            self._send_held_move()
+        self._invoke(name, args, queued_at)
+
+    def _invoke(self, name, args, queued_at):
+        t0 = time.perf_counter()
+        try:
+            getattr(self.backend, name)(*args)
+        except Exception as e:
+            print(f"⚠️ Actuator {name} failed: {e}")
+        t1 = time.perf_counter()
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = CallStats()
+        stats.add(t1 - t0, t0 - queued_at)
+
+    def summary(self):
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+    def close(self, timeout=1.0):
+        # Flushes whatever is still queued, then stops the thread
+        with self._condition:
+            self._closing = True
+            self._condition.notify()
+        self._thread.join(timeout)
+        self.backend.close()
+
+
+BACKENDS = {
+    "pyautogui": PyAutoGuiActuator,
+    "null": NullActuator,
+    "record": RecordingActuator,
+}
+
+
+def create_actuator(name, rate=0.0, min_move=2):
+    # rate > 0 moves the backend onto its own flush thread
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown actuator: {name}")
+    backend = BACKENDS[name]()
+    if rate:
+        return ThreadedActuator(backend, rate=rate, min_move=min_move)
+    return backend
+
+
+def add_actuator_args(parser):
+    parser.add_argument("--actuator", default="pyautogui", choices=list(BACKENDS))
+    parser.add_argument("--actuator-rate", type=float, default=120.0,
+                        help="OS input flushes per second on the actuator thread (0: call inline)")
+    parser.add_argument("--min-move", type=int, default=2, help="skip pointer moves smaller than this many pixels")
+
+
+def actuator_from_args(args):
+    return create_actuator(args.actuator, args.actuator_rate, args.min_move)
+
+
+def format_actuator_stats(summary):
+    lines = ["🖱️ Actuator calls:"]
+    for name, stats in sorted(summary.items()):
+        lines.append(f"    {name:<14} {stats['calls']:6d} calls  mean {stats['mean_ms']:6.2f} ms  "
+                     f"max {stats['max_ms']:6.2f} ms  queued {stats['queued_mean_ms']:6.2f} ms")
+    return "\n".join(lines)
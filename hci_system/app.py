@@ -1,44 +1,111 @@
+from startup import PROCESS_START, StartupProfiler, add_startup_args  # First: marks process start
+
+import argparse
 import sys
-import subprocess
-import threading
-import pygame
-import pyttsx3
+import time
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QPushButton, QLabel, QVBoxLayout,
     QTextEdit, QFrame, QHBoxLayout, QGridLayout, QSizePolicy
 )
 from PyQt5.QtCore import Qt, QTimer
 
+import engine as hci_engine
+from feedback import FeedbackService
+
+# Time the goodbye gets to play, and the longest wait for the engine to stop, on exit
+FAREWELL_MS = 2500
+SHUTDOWN_TIMEOUT_MS = 3000
+# Spoken when a mode exits; all of them are pre-rendered (feedback.PHRASES)
+EXIT_PHRASES = {
+    "hand": "Exiting hand gesture control",
+    "eye": "Exiting eye gesture control",
+    "fusion": "Exiting hand and eye control",
+}
+
 
 class ControlWindow(QWidget):
-    def __init__(self):
+    def __init__(self, profiler=None):
         super().__init__()
+        self.profiler = profiler or StartupProfiler("app")
         self.setWindowTitle("🧠 HCI Movement Control System")
         self.setGeometry(300, 100, 700, 600)
         self.setStyleSheet(self.load_styles())
 
-        self.init_voice()
-        self.init_sound()
-        self.init_ui()
+        # Audio, TTS and the engine process are started after the window has painted
+        self.feedback = FeedbackService()
+        self.mode_requested_at = {}
+        self.exit_started_at = None
+        self.closing = False
+        with self.profiler.step("build window"):
+            self.init_ui()
+        self.worker = hci_engine.EngineClient()
 
-    def init_voice(self):
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 160)
-        self.engine.setProperty('volume', 0.9)
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not hasattr(self, "_warm_up_started"):
+            self._warm_up_started = True
+            # Runs once the event loop has painted the window
+            QTimer.singleShot(0, self.warm_up)
 
-    def speak(self, text):
-        threading.Thread(target=self._speak_text, args=(text,), daemon=True).start()
+    def warm_up(self):
+        self.profiler.add("window shown", self.profiler_elapsed())
+        with self.profiler.step("start engine process"):
+            self.init_worker()
+        with self.profiler.step("start feedback worker"):
+            self.feedback.start()
 
-    def _speak_text(self, text):
-        self.engine.say(text)
-        self.engine.runAndWait()
+    def profiler_elapsed(self):
+        return (time.perf_counter() - PROCESS_START) * 1000
 
-    def init_sound(self):
-        pygame.mixer.init()
-        self.click_sound = pygame.mixer.Sound("click.wav")
+    def speak(self, text, key=None):
+        # Queued on the feedback worker; never blocks the GUI thread
+        self.feedback.say(text, key=key)
 
     def play_sound(self):
-        self.click_sound.play()
+        # Silently skipped while the mixer is still warming up
+        self.feedback.cue("click")
+
+    def init_worker(self):
+        # One engine process owns the camera and both models for the whole session
+        self.worker.start()
+        self.worker_timer = QTimer(self)
+        self.worker_timer.timeout.connect(self.poll_worker)
+        self.worker_timer.start(50)
+
+    def poll_worker(self):
+        for message in self.worker.poll():
+            kind = message[0]
+            if kind == hci_engine.READY:
+                self.profiler.add("engine ready", self.profiler_elapsed())
+                self.status_label.setText(f"🟢 Engine Ready ({message[1]:.0f} ms). Awaiting Commands...")
+            elif kind == hci_engine.MODE:
+                _, mode, switch_ms = message
+                requested_at = self.mode_requested_at.pop(mode, None)
+                if requested_at is not None:
+                    first_frame_ms = (time.perf_counter() - requested_at) * 1000
+                    self.profiler.add(f"first frame ({mode})", first_frame_ms)
+                    print(f"⏱️ {mode}: time to first frame {first_frame_ms:.0f} ms after click")
+                    if self.profiler.enabled:
+                        print(self.profiler.report())
+                    if self.profiler.log_path:
+                        self.profiler.save(self.profiler.log_path)
+                self.status_label.setText(f"🟢 {mode.capitalize()} Gesture Control Running "
+                                          f"(switched in {switch_ms:.0f} ms)")
+            elif kind == hci_engine.EXITED:
+                self.status_label.setText(f"🟢 {message[1].capitalize()} Gesture Control Exited. Awaiting Commands...")
+                self.speak(EXIT_PHRASES[message[1]], key="mode")
+            elif kind == hci_engine.STOPPED:
+                self.status_label.setText(f"🟢 {message[1].capitalize()} Gesture Control Stopped.")
+            elif kind == hci_engine.METRICS:
+                _, mode, snapshot, lines = message
+                self.metrics_label.setText(f"📊 {mode.capitalize()} Metrics\n" + "\n".join(lines))
+            elif kind == hci_engine.ERROR:
+                self.status_label.setText(f"🔴 Engine Error: {message[1]}")
+            elif kind == hci_engine.SHUTDOWN:
+                self.finish_exit()
+        if self.exit_started_at is not None and not self.worker.is_running():
+            # Exited without reporting (crashed or never started)
+            self.finish_exit()
 
     def init_ui(self):
         main_layout = QVBoxLayout()
@@ -62,15 +129,19 @@ class ControlWindow(QWidget):
 
         self.hand_btn = QPushButton("🖐️ Hand Gesture Control")
         self.eye_btn = QPushButton("👁️ Eye Gesture Control")
+        self.fusion_btn = QPushButton("🤝 Hand + Eye Control")
 
         self.hand_btn.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.eye_btn.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.fusion_btn.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
         self.hand_btn.clicked.connect(self.run_hand_control)
         self.eye_btn.clicked.connect(self.run_eye_control)
+        self.fusion_btn.clicked.connect(self.run_fusion_control)
 
         button_layout.addWidget(self.hand_btn, 0, 0)
         button_layout.addWidget(self.eye_btn, 0, 1)
+        button_layout.addWidget(self.fusion_btn, 1, 0, 1, 2)
 
         main_layout.addLayout(button_layout)
 
@@ -99,7 +170,12 @@ class ControlWindow(QWidget):
            "• Double Blink → Double Click\n"
            "• Right Eye Blink (hold) → volume Up\n"
            "• Left Eye Blink (hold) → volume Down\n"
-           "• Open Mouth → Exit Eye Control"
+           "• Open Mouth → Exit Eye Control\n\n"
+           "🔹 Hand + Eye:\n"
+           "• Look → Pointer jumps near the target\n"
+           "• Move Index Finger → Fine adjustment\n"
+           "• Hand gestures click, drag, scroll and set the volume\n"
+           "• Blinks click only while no hand is in view"
         )
         main_layout.addWidget(self.instructions)
 
@@ -112,7 +188,12 @@ class ControlWindow(QWidget):
         self.quit_btn.clicked.connect(self.exit_app)
         self.quit_btn.setFixedWidth(100)
 
+        # Live per-stage metrics from the engine, refreshed about once a second
+        self.metrics_label = QLabel("📊 Metrics appear once a mode is running")
+        self.metrics_label.setObjectName("metricsLabel")
+
         bottom_layout.addWidget(self.status_label)
+        bottom_layout.addWidget(self.metrics_label)
         bottom_layout.addStretch()
         bottom_layout.addWidget(self.quit_btn)
 
@@ -162,6 +243,15 @@ class ControlWindow(QWidget):
             color: #00ff66;
             padding: 6px;
         }
+        #metricsLabel {
+            font-family: 'Consolas', monospace;
+            font-size: 11px;
+            color: #99ffcc;
+            background-color: #1a1a1a;
+            border: 1px solid #00ff88;
+            border-radius: 8px;
+            padding: 6px;
+        }
         #instructionBox {
             background-color: #1a1a1a;
             border: 1px solid #00ff88;
@@ -173,24 +263,71 @@ class ControlWindow(QWidget):
 
     def run_hand_control(self):
         self.status_label.setText("🟡 Hand Gesture Control Activated...")
+        self.mode_requested_at["hand"] = time.perf_counter()
         self.play_sound()
-        self.speak("Hand gesture control activated")
-        subprocess.Popen(["python", "hand_control.py"])
+        self.speak("Hand gesture control activated", key="mode")
+        self.worker.start_mode("hand")
 
     def run_eye_control(self):
         self.status_label.setText("🟡 Eye Gesture Control Activated...")
+        self.mode_requested_at["eye"] = time.perf_counter()
+        self.play_sound()
+        self.speak("Eye gesture control activated", key="mode")
+        self.worker.start_mode("eye")
+
+    def run_fusion_control(self):
+        self.status_label.setText("🟡 Hand + Eye Control Activated...")
+        self.mode_requested_at["fusion"] = time.perf_counter()
         self.play_sound()
-        self.speak("Eye gesture control activated")
-        subprocess.Popen(["python", "eye_control.py"])
+        self.speak("Hand and eye control activated", key="mode")
+        self.worker.start_mode("fusion")
 
     def exit_app(self):
+        # Asks the engine to stop and returns; poll_worker closes the window once it has
+        if self.exit_started_at is not None:
+            return
+        self.exit_started_at = time.perf_counter()
         self.play_sound()
-        self.speak("Exiting interface. Goodbye.")
-        QTimer.singleShot(2500, QApplication.quit)
+        self.feedback.say("Exiting interface. Goodbye.", interrupt=True)
+        self.status_label.setText("🟡 Shutting Down...")
+        for button in (self.hand_btn, self.eye_btn, self.fusion_btn, self.quit_btn):
+            button.setEnabled(False)
+        self.worker.request_shutdown()
+        if not self.worker.is_running():
+            self.finish_exit()
+        QTimer.singleShot(SHUTDOWN_TIMEOUT_MS, self.force_exit)
+
+    def finish_exit(self):
+        # The engine has stopped; close once the goodbye has had time to play
+        if self.closing:
+            return
+        self.closing = True
+        elapsed_ms = (time.perf_counter() - self.exit_started_at) * 1000
+        QTimer.singleShot(max(0, int(FAREWELL_MS - elapsed_ms)), self.close)
+
+    def force_exit(self):
+        if not self.closing:
+            print("⚠️ Engine did not stop in time; terminating it")
+            self.worker.terminate()
+            self.finish_exit()
+
+    def closeEvent(self, event):
+        # The window's close button exits like the Exit button
+        if self.closing:
+            event.accept()
+            QApplication.quit()
+            return
+        event.ignore()
+        self.exit_app()
 
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    window = ControlWindow()
+    parser = argparse.ArgumentParser(description="HCI movement control GUI")
+    add_startup_args(parser)
+    args, qt_args = parser.parse_known_args()
+    profiler = StartupProfiler("app", args.profile_startup, args.startup_log)
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = ControlWindow(profiler)
     window.show()
     sys.exit(app.exec_())              
@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import time
+
+from actuators import RecordingActuator
+from eye_control import EyeController
+from hand_control import HandController
+from head_pose import MODES as HEAD_POSE_MODES
+from metrics import Metrics
+from pipeline import run_sequential
+from sources import open_source
+
+# Clip layout: <clips>/hand/* and <clips>/eye/*, each entry a video file,
+# an image directory or a recorded landmark .npz. The fixed clip set in
+# benchmarks/clips is synthetic and written by benchmarks/make_clips.py:
+# landmark traces for the gesture path, and an image directory per mode for the
+# preprocess and process stages (landmark traces skip both).
+CLIPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "clips")
+CONTROLLERS = {
+    "hand": HandController,
+    "eye": EyeController,
+}
+STAGES = ["decode", "preprocess", "process", "features", "gesture", "actuation"]
+
+
+def list_clips(clips_dir, mode):
+    mode_dir = os.path.join(clips_dir, mode)
+    if not os.path.isdir(mode_dir):
+        return []
+    return [os.path.join(mode_dir, name) for name in sorted(os.listdir(mode_dir))
+            if not name.startswith(".")]
+
+
+def benchmark_clip(mode, clip, max_frames=None, eye_options=None):
+    source = open_source(clip)
+    actuator = RecordingActuator()
+    timer = Metrics(window=None)
+    kwargs = dict(eye_options or {}, auto_calibrate=True) if mode == "eye" else {}
+    controller = CONTROLLERS[mode](actuator, source.frame_size(), timer=timer, **kwargs)
+    controller.latency_monitor.report_every = 0
+
+    start = time.perf_counter()
+    try:
+        frames = run_sequential(controller, source, headless=True, max_frames=max_frames)
+    finally:
+        source.release()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "clip": os.path.basename(clip),
+        "frames": frames,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "stages_ms": timer.percentiles(),
+        "actions": actuator.counts(),
+    }
+
+
+def format_report(report):
+    lines = [f"[{report['mode']}] {report['clip']}: {report['frames']} frames, {report['fps']:.1f} fps"]
+    for stage in STAGES:
+        stats = report["stages_ms"].get(stage)
+        if stats is None:
+            continue
+        lines.append(f"    {stage:<13} p50 {stats['p50']:7.3f} ms  p95 {stats['p95']:7.3f} ms  "
+                     f"p99 {stats['p99']:7.3f} ms")
+    actions = ", ".join(f"{name}={count}" for name, count in sorted(report["actions"].items()))
+    lines.append(f"    actions: {actions or 'none'}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless throughput benchmark for the control loops")
+    parser.add_argument("--clips", default=CLIPS_DIR,
+                        help="directory with hand/ and eye/ clip folders (default: the committed synthetic set)")
+    parser.add_argument("--mode", default="both", choices=["hand", "eye", "both"])
+    parser.add_argument("--max-frames", type=int, help="stop each clip after this many frames")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--eye-roi", action="store_true", help="run the eye clips with FaceMesh ROI tracking")
+    parser.add_argument("--inference-scale", type=float, default=1.0,
+                        help="downscale factor for the FaceMesh input")
+    parser.add_argument("--head-pose", default="compensate", choices=HEAD_POSE_MODES,
+                        help="head-pose handling for the eye clips ('off' is the uncompensated mapping)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    modes = ["hand", "eye"] if args.mode == "both" else [args.mode]
+    eye_options = {"roi_tracking": args.eye_roi, "inference_scale": args.inference_scale,
+                   "head_pose": args.head_pose}
+
+    reports = []
+    for mode in modes:
+        clips = list_clips(args.clips, mode)
+        if not clips:
+            print(f"⚠️ No {mode} clips in {os.path.join(args.clips, mode)} "
+                  f"(python benchmarks/make_clips.py --out {args.clips} writes the synthetic set)")
+        for clip in clips:
+            report = benchmark_clip(mode, clip, args.max_frames, eye_options)
+            print(format_report(report))
+            reports.append(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    return reports
+
+
+if __name__ == "__main__":
+    main()
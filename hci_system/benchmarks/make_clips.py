@@ -0,0 +1,173 @@
+import argparse
+import os
+
+import cv2
+import numpy as np
+
+# Writes the fixed benchmark clip set as synthetic landmark traces (.npz, the format
+# sources.LandmarkRecorder saves), so benchmark.py replays the same input on every
+# machine without a camera, MediaPipe or video files:
+#   hand/point_pinch.npz: one right hand pointing with the index finger along a slow
+#                         sine, pinching thumb and index once (frames 100-109)
+#   eye/blink_gaze.npz:   one face whose irises sweep left and right, blinking both
+#                         eyes every 2 seconds: 2 frames closing, 3 closed, 2 opening
+#   hand/frames, eye/frames: 30 drawn 640x480 JPEG frames (a skin-toned blob with two
+#                         dark eyes moving over a gradient), so the pixel stages run:
+#                         decode, preprocess and process, which --eye-roi and
+#                         --inference-scale change. Hands finds no hand in them and
+#                         FaceMesh at most a rough face: they time the models, the
+#                         landmark clips measure the gestures
+#   blink/*.npz:          30 s faces for the blink benchmark (python blink.py), blinking
+#                         for 4 frames every 3 seconds with per-user eye openings and
+#                         noise (BLINK_TRACES); drift.npz's open eye narrows to half
+#                         a third of the way in
+# The clips are committed under benchmarks/clips; rerun this after changing them:
+#   python benchmarks/make_clips.py [--out benchmarks/clips]
+
+FRAMES = 300
+FPS = 30.0
+FRAME_SIZE = (640, 480)
+NUM_HAND_LANDMARKS = 21
+NUM_FACE_LANDMARKS = 478
+# name: (open eyelid gap, closed eyelid gap, noise std), in frame widths over a 0.06 wide eye
+BLINK_TRACES = {
+    "typical": (0.02, 0.002, 0.0003),
+    "narrow": (0.0165, 0.002, 0.0003),
+    "noisy": (0.0195, 0.003, 0.0012),
+    "wide": (0.04, 0.012, 0.0005),
+}
+BLINK_FRAMES = 900
+PIXEL_FRAMES = 30
+
+
+def hand_trace(frames=FRAMES):
+    hands = np.zeros((frames, 1, NUM_HAND_LANDMARKS, 3), dtype=np.float32)
+    for t in range(frames):
+        points = hands[t, 0]
+        points[:, :2] = 0.5
+        # Every finger folded (tip below its PIP joint), then the index raised
+        for tip, pip in ((4, 3), (8, 6), (12, 10), (16, 14), (20, 18)):
+            points[pip, 1] = 0.5
+            points[tip, 1] = 0.55
+        points[8, :2] = (0.3 + 0.2 * np.sin(t / 30), 0.3)
+        points[4, :2] = (points[8, 0] + (0.01 if 100 <= t < 110 else 0.2), 0.31)
+        points[2, 1] = 0.31
+        points[12, 1] = 0.5
+        # Wrist and knuckles
+        points[0, :2] = (0.5, 0.7)
+        points[5, :2] = (0.44, 0.55)
+        points[9, :2] = (0.5, 0.55)
+        points[17, :2] = (0.57, 0.57)
+    return hands
+
+
+def face_trace(frames=FRAMES, blink_every=60, blink_frames=3, open_gap=0.02, closed_gap=0.002, noise=None,
+               iris=True, ramp=0):
+    # noise: per-frame eyelid gap offsets added to both eyes
+    # ramp: frames over which the lids close before, and open after, the closed frames
+    faces = np.zeros((frames, 1, NUM_FACE_LANDMARKS, 3), dtype=np.float32)
+    for t in range(frames):
+        points = faces[t, 0]
+        points[:, :2] = 0.5
+        # Eye corners (outer, inner) of both eyes
+        points[33] = (0.40, 0.4, 0)
+        points[133] = (0.46, 0.4, 0)
+        points[263] = (0.60, 0.4, 0)
+        points[362] = (0.54, 0.4, 0)
+        gap = open_gap(t) if callable(open_gap) else open_gap
+        k = t % blink_every - blink_every // 2
+        if 0 <= k < blink_frames:
+            gap = closed_gap
+        elif -ramp <= k < 0 or 0 <= k - blink_frames < ramp:
+            # Linear between the levels, reaching neither on a ramp frame
+            steps = -k if k < 0 else k - blink_frames + 1
+            gap = closed_gap + (gap - closed_gap) * steps / (ramp + 1)
+        if noise is not None:
+            gap += noise[t]
+        # Upper and lower eyelids
+        points[159] = (0.43, 0.4 - gap / 2, 0)
+        points[145] = (0.43, 0.4 + gap / 2, 0)
+        points[386] = (0.57, 0.4 - gap / 2, 0)
+        points[374] = (0.57, 0.4 + gap / 2, 0)
+        # Both irises look the same way: centres (468 right, 473 left) and the right iris
+        # edge point 474 move together, so the compensated gaze path and the raw one both
+        # see the sweep
+        sweep = 0.02 * np.sin(t / 20) if iris else 0.0
+        points[468] = (0.42 + sweep, 0.4, 0)
+        points[473] = (0.56 + sweep, 0.4, 0)
+        points[474] = (0.43 + sweep, 0.4, 0)
+        # Lips
+        points[13] = (0.5, 0.6, 0)
+        points[14] = (0.5, 0.61, 0)
+    return faces
+
+
+def blink_trace(open_gap, closed_gap, noise, frames=BLINK_FRAMES, seed=0):
+    # Noise smoothed over 3 frames (landmark jitter is correlated), keeping its standard deviation
+    jitter = np.random.default_rng(seed).normal(0.0, noise, frames)
+    jitter = np.convolve(jitter, np.ones(3) / np.sqrt(3), "same")
+    return face_trace(frames, blink_every=90, blink_frames=4, open_gap=open_gap, closed_gap=closed_gap,
+                      noise=jitter, iris=False)
+
+
+def pixel_frames(frames=PIXEL_FRAMES):
+    w, h = FRAME_SIZE
+    gradient = np.linspace(40, 200, w, dtype=np.float32)[None, :, None] * np.array([1.0, 0.9, 0.8], np.float32)
+    background = np.broadcast_to(gradient, (h, w, 3)).astype(np.uint8)
+    for t in range(frames):
+        frame = background.copy()
+        center = (int(w * (0.5 + 0.25 * np.sin(t / 5))), h // 2)
+        cv2.ellipse(frame, center, (60, 80), 0, 0, 360, (120, 160, 210), -1)
+        cv2.circle(frame, (center[0] - 20, center[1] - 20), 8, (40, 40, 40), -1)
+        cv2.circle(frame, (center[0] + 20, center[1] - 20), 8, (40, 40, 40), -1)
+        yield frame
+
+
+def save_frames(path, frames):
+    os.makedirs(path, exist_ok=True)
+    for i, frame in enumerate(frames):
+        cv2.imwrite(os.path.join(path, f"{i:04d}.jpg"), frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    print(f"💾 Wrote {i + 1} frames to {path}")
+
+
+def drift_gap(t):
+    # Open eyelid gap of drift.npz: halves a third of the way in (head lowered, lighting change)
+    return 0.02 if t < BLINK_FRAMES // 3 else 0.01
+
+
+def save_trace(path, kind, landmarks, fps=FPS, handedness=None):
+    frames, max_items = landmarks.shape[:2]
+    if handedness is None:
+        handedness = np.full((frames, max_items), -1, dtype=np.int8)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(
+        path,
+        kind=kind,
+        frame_size=np.array(FRAME_SIZE),
+        timestamps=np.arange(frames, dtype=np.float64) / fps,
+        landmarks=landmarks,
+        counts=np.ones(frames, dtype=np.int32),
+        handedness=handedness,
+    )
+    print(f"💾 Wrote {frames} frames to {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the synthetic benchmark clip set")
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "clips"),
+                        help="clip directory (hand/ and eye/ are created in it)")
+    args = parser.parse_args(argv)
+
+    right_hand = np.ones((FRAMES, 1), dtype=np.int8)
+    save_trace(os.path.join(args.out, "hand", "point_pinch.npz"), "hand", hand_trace(), handedness=right_hand)
+    save_trace(os.path.join(args.out, "eye", "blink_gaze.npz"), "face", face_trace(ramp=2))
+    for mode in ("hand", "eye"):
+        save_frames(os.path.join(args.out, mode, "frames"), pixel_frames())
+    for seed, (name, (open_gap, closed_gap, noise)) in enumerate(BLINK_TRACES.items()):
+        save_trace(os.path.join(args.out, "blink", f"{name}.npz"), "face", blink_trace(open_gap, closed_gap, noise,
+                                                                                       seed=seed))
+    save_trace(os.path.join(args.out, "blink", "drift.npz"), "face", blink_trace(drift_gap, 0.002, 0.0003, seed=4))
+
+
+if __name__ == "__main__":
+    main()
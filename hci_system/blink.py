@@ -0,0 +1,303 @@
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+
+# Per-user eye-closure thresholds learned online. Eye aspect ratios differ a lot between
+# people (eye shape, glasses, camera height), so one fixed threshold gives some users
+# false clicks and leaves others unable to click. Each eye keeps O(1) streaming
+# statistics of its two states:
+#   open:   exponentially weighted mean and variance of the samples above the threshold,
+#           with a time constant rather than a per-frame rate, so it adapts equally fast
+#           at any frame rate
+#   closed: the deepest EAR of each closure, averaged over recent closures
+# The threshold sits blink_level of the way from the closed to the open level, and
+# never within NOISE_SIGMAS standard deviations of the open level. Eye gestures wait
+# until WARMUP seconds of open eyes were seen; the levels are learned anew after the
+# face was gone for forget_after seconds (someone new in front of the camera).
+# The open level only learns from samples above the threshold, so an open level that
+# drops below it (head lowered, lighting change) would read as one endless closure:
+# no more clicks, the volume hold repeating. A closure longer than recover_after, which
+# outlasts any blink and a normal volume hold, is therefore taken as the eye's new open
+# level: the closure's samples replace the open statistics.
+
+# Seconds of open-eye samples before the learned threshold is used
+WARMUP = 0.5
+# Learned threshold stays this many standard deviations below the open level
+NOISE_SIGMAS = 3.0
+# Closed level assumed, as a fraction of the open level, until a closure was measured
+CLOSED_PRIOR = 0.3
+# Weight of each new closure in the closed level
+CLOSED_WEIGHT = 0.3
+# Longest frame gap that counts towards the statistics' time constant
+MAX_GAP = 0.5
+
+
+class EyeLevels:
+    # Open and closed EAR levels of one eye, and the closure threshold between them
+    def __init__(self, blink_level=0.5, adapt_time=20.0, recover_after=5.0):
+        self.blink_level = blink_level
+        self.adapt_time = adapt_time
+        self.recover_after = recover_after
+        self.reset()
+
+    def reset(self):
+        self.open_mean = None
+        self.open_var = 0.0
+        self.open_time = 0.0
+        self.closed_level = None
+        self.closure_min = None
+        self.closure_start = None
+        # Sample count, mean and squared deviations (Welford) of the current closure
+        self.closure_count = 0
+        self.closure_mean = 0.0
+        self.closure_m2 = 0.0
+        self.recoveries = 0
+        self.threshold = None
+        self.last_time = None
+
+    def update(self, ear, now):
+        # Threshold for this frame; 0.0 (the eye never counts as closed) while still learning
+        dt = min(now - self.last_time, MAX_GAP) if self.last_time is not None else 0.0
+        self.last_time = now
+        if self.threshold is None:
+            # Learning: every sample but an obvious closure counts as open
+            if self.open_mean is None or ear >= self.open_mean * CLOSED_PRIOR * 2:
+                self._add_open(ear, dt)
+            if self.open_time < WARMUP:
+                return 0.0
+        elif ear >= self.threshold:
+            if self.closure_min is not None:
+                # A closure just ended: its depth updates the closed level
+                if self.closed_level is None:
+                    self.closed_level = self.closure_min
+                else:
+                    self.closed_level += CLOSED_WEIGHT * (self.closure_min - self.closed_level)
+                self.closure_min = None
+            self._add_open(ear, dt)
+        else:
+            self._add_closed(ear, now)
+            if now - self.closure_start > self.recover_after:
+                self._recover()
+        self.threshold = self.learned_threshold()
+        return self.threshold
+
+    def _add_closed(self, ear, now):
+        if self.closure_min is None:
+            self.closure_min = ear
+            self.closure_start = now
+            self.closure_count = 0
+            self.closure_mean = 0.0
+            self.closure_m2 = 0.0
+        self.closure_min = min(self.closure_min, ear)
+        self.closure_count += 1
+        delta = ear - self.closure_mean
+        self.closure_mean += delta / self.closure_count
+        self.closure_m2 += delta * (ear - self.closure_mean)
+
+    def _recover(self):
+        # The "closure" is the open eye at a lower level: relearn the open statistics from it.
+        # open_time restarts at WARMUP, so the next samples still move the young estimate quickly.
+        self.open_mean = self.closure_mean
+        self.open_var = self.closure_m2 / self.closure_count
+        self.open_time = WARMUP
+        # Not a blink, so its depth says nothing about the closed level
+        self.closure_min = None
+        self.recoveries += 1
+
+    def _add_open(self, ear, dt):
+        # Exponentially weighted mean and variance; a plain running mean while younger than adapt_time
+        self.open_time += dt
+        if self.open_mean is None:
+            self.open_mean = ear
+            return
+        alpha = max(1.0 - math.exp(-dt / self.adapt_time), dt / max(self.open_time, dt, 1e-9))
+        delta = ear - self.open_mean
+        self.open_mean += alpha * delta
+        self.open_var = (1.0 - alpha) * (self.open_var + alpha * delta * delta)
+
+    def learned_threshold(self):
+        closed = self.closed_level if self.closed_level is not None else self.open_mean * CLOSED_PRIOR
+        closed = min(closed, self.open_mean * CLOSED_PRIOR * 2)
+        span = self.open_mean - closed
+        threshold = min(closed + self.blink_level * span, self.open_mean - NOISE_SIGMAS * math.sqrt(self.open_var))
+        # A very noisy open level must not push the threshold down to where no blink reaches it
+        return max(threshold, closed + 0.5 * self.blink_level * span)
+
+
+class BlinkThresholds:
+    # Both eyes' closure thresholds: learned per eye in mode "adaptive", blink_threshold in mode "fixed"
+    def __init__(self, settings):
+        self.left = EyeLevels()
+        self.right = EyeLevels()
+        self.last_seen = None
+        self.configure(settings)
+
+    def configure(self, settings):
+        # settings: the config's eye section; takes effect on the next frame
+        self.mode = settings.blink_mode
+        self.fixed = settings.blink_threshold
+        self.forget_after = settings.blink_forget_after
+        for eye in (self.left, self.right):
+            eye.blink_level = settings.blink_level
+            eye.adapt_time = settings.blink_adapt_time
+            eye.recover_after = settings.blink_recover_after
+
+    def update(self, ear_left, ear_right, now):
+        # (left, right) thresholds for this frame's EARs
+        if self.mode == "fixed":
+            return self.fixed, self.fixed
+        if self.last_seen is not None and now - self.last_seen > self.forget_after:
+            self.left.reset()
+            self.right.reset()
+        self.last_seen = now
+        return self.left.update(ear_left, now), self.right.update(ear_right, now)
+
+    def status(self):
+        if self.mode == "fixed":
+            return f"blink fixed: < {self.fixed:.3f}"
+        if self.left.threshold is None or self.right.threshold is None:
+            return "blink adaptive: learning"
+        return f"blink adaptive: left < {self.left.threshold:.3f} | right < {self.right.threshold:.3f}"
+
+
+# Replay benchmark: false and missed blink clicks on recorded face traces, for the
+# fixed and the learned threshold, at the recorded frame rate and decimated ones.
+# Reference blinks come from a labels file ({"<clip name>": [seconds, ...]}) when given,
+# otherwise from an offline labeller that sees the whole trace: each eye's open level is
+# its median EAR, its closed level the 1st percentile, and a blink is a dip below the
+# midpoint lasting at least blink_time.
+
+MATCH_WINDOW = 0.3
+
+
+def ear_series(path):
+    # (timestamps, left EAR, right EAR) of the frames with a face
+    from features import FaceFeatures
+    from sources import open_source
+
+    source = open_source(path)
+    if not source.provides_landmarks:
+        raise SystemExit(f"{path}: the blink benchmark replays face landmark traces (.npz or .trace)")
+    w, h = source.frame_size()
+    features = FaceFeatures()
+    rows = []
+    try:
+        while True:
+            ok, results, timestamp = source.read()
+            if not ok:
+                break
+            if results.multi_face_landmarks:
+                features.update(results.multi_face_landmarks[0].landmark, w, h)
+                rows.append((timestamp, features.ear_left, features.ear_right))
+    finally:
+        source.release()
+    return np.array(rows, dtype=np.float64).reshape(-1, 3)
+
+
+def label_blinks(series, min_time):
+    # Offline reference: reopen times of closures of the left eye (the click eye)
+    ears = series[:, 1]
+    open_level = float(np.median(ears))
+    closed_level = float(np.percentile(ears, 1))
+    if closed_level > open_level * 2 * CLOSED_PRIOR:
+        # Nothing deeper than noise: no blinks in this trace
+        return []
+    closed = ears < (open_level + closed_level) / 2
+    blinks, since = [], None
+    for t, is_closed in zip(series[:, 0], closed):
+        if is_closed:
+            since = t if since is None else since
+        elif since is not None:
+            if t - since >= min_time:
+                blinks.append(float(t))
+            since = None
+    return blinks
+
+
+def replay_clicks(series, settings, step=1):
+    # Blink clicks the eye controller's path (thresholds, BlinkGesture) produces on every step-th frame
+    from gestures import BlinkGesture
+
+    thresholds = BlinkThresholds(settings)
+    blink = BlinkGesture(settings.blink_time, settings.double_click_time, settings.blink_recover_after)
+    events = []
+    for t, ear_left, ear_right in series[::step]:
+        threshold_left, _ = thresholds.update(ear_left, ear_right, t)
+        blink.update(ear_left < threshold_left, t, events)
+    return [event.time for event in events]
+
+
+def score(clicks, reference, window=MATCH_WINDOW):
+    # Greedy one-to-one matching within window seconds
+    unmatched = list(reference)
+    hits = 0
+    for t in clicks:
+        match = next((r for r in unmatched if abs(r - t) <= window), None)
+        if match is not None:
+            unmatched.remove(match)
+            hits += 1
+    return {"blinks": len(reference), "clicks": len(clicks), "hits": hits,
+            "false": len(clicks) - hits, "missed": len(unmatched)}
+
+
+def parse_args(argv=None):
+    from benchmark import CLIPS_DIR
+
+    parser = argparse.ArgumentParser(description="False and missed blink clicks on recorded face traces")
+    parser.add_argument("traces", nargs="*", default=[os.path.join(CLIPS_DIR, "blink")],
+                        help="face landmark traces (.npz or .trace) or directories of them "
+                             "(default: the committed synthetic set, written by benchmarks/make_clips.py)")
+    parser.add_argument("--labels", metavar="PATH",
+                        help="JSON file of reference blink times per clip name (default: offline labelling)")
+    parser.add_argument("--steps", nargs="+", type=int, default=[1, 2, 3],
+                        help="frame decimations to evaluate (2 keeps every second frame)")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from config import Config
+
+    args = parse_args(argv)
+    labels = None
+    if args.labels:
+        with open(args.labels) as f:
+            labels = json.load(f)
+    paths = []
+    for path in args.traces:
+        if os.path.isdir(path):
+            paths += [os.path.join(path, name) for name in sorted(os.listdir(path))
+                      if name.endswith((".npz", ".trace"))]
+        else:
+            paths.append(path)
+
+    defaults = Config().eye
+    modes = {mode: Config({"eye": {"blink_mode": mode}}).eye for mode in ("fixed", "adaptive")}
+    reports = []
+    for path in paths:
+        name = os.path.basename(path)
+        series = ear_series(path)
+        if not len(series):
+            print(f"⚠️ {name}: no face in the trace")
+            continue
+        reference = labels.get(name, []) if labels is not None else label_blinks(series, defaults.blink_time)
+        fps = 1.0 / float(np.median(np.diff(series[:, 0]))) if len(series) > 1 else 0.0
+        print(f"[eye] {name}: {len(series)} frames, {len(reference)} reference blinks")
+        for step in args.steps:
+            for mode, settings in modes.items():
+                result = score(replay_clicks(series, settings, step), reference)
+                print(f"    {fps / step:5.1f} fps  {mode:<9} clicks {result['clicks']:3d}  hits {result['hits']:3d}  "
+                      f"false {result['false']:3d}  missed {result['missed']:3d}")
+                reports.append(dict(result, clip=name, fps=fps / step, mode=mode))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+import argparse
+import getpass
+import json
+import os
+import re
+import time
+
+import cv2
+import numpy as np
+
+# N-point gaze calibration. The user looks at a sequence of dots; each frame's gaze
+# features (iris centre relative to the eye-corner midpoint, in eye widths, for both
+# eyes: see FaceFeatures.iris_offset) are paired with the dot's normalized screen
+# position, and a regression from features to screen position is fitted. Being
+# relative to the eye, the features do not depend on the camera resolution or on
+# where the face is in the frame. Fitted models are cached per user and camera and
+# loaded at startup; a calibration can also be saved as a trace for the benchmark
+# (python calibration.py bench traces...).
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "hci_system", "gaze")
+CALIBRATION_WINDOW = "Gaze Calibration"
+
+# Model inputs are (left x, left y, right x, right y); the terms each model regresses on
+KINDS = ("affine", "poly2")
+DEFAULT_KIND = "poly2"
+RIDGE = 1e-3
+
+DEFAULT_POINTS = 9
+MARGIN = 0.1  # screen fraction kept free around the outer dots
+DWELL = 1.6  # seconds each dot is shown
+SETTLE = 0.6  # seconds discarded after a dot appears, while the eyes travel there
+
+
+def expand(features, kind):
+    # (N, 4) standardized features -> (N, terms) design matrix
+    f = features
+    columns = [np.ones(len(f)), f[:, 0], f[:, 1], f[:, 2], f[:, 3]]
+    if kind == "poly2":
+        # Quadratic terms of the two-eye average: 9 dots cannot pin down those of each eye
+        gx = (f[:, 0] + f[:, 2]) * 0.5
+        gy = (f[:, 1] + f[:, 3]) * 0.5
+        columns += [gx * gx, gy * gy, gx * gy]
+    return np.stack(columns, axis=1)
+
+
+class GazeModel:
+    # Maps iris offsets to a normalized screen position (0..1 on both axes)
+    def __init__(self, kind=DEFAULT_KIND, mean=None, scale=None, coef=None, info=None):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown gaze model '{kind}' (choose from {', '.join(KINDS)})")
+        self.kind = kind
+        self.mean = np.zeros(4) if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = np.ones(4) if scale is None else np.asarray(scale, dtype=np.float64)
+        self.coef = None if coef is None else np.asarray(coef, dtype=np.float64)
+        self.info = info or {}
+        # Drift correction set by recenter(), not saved with the model
+        self.offset = np.zeros(2)
+        self._row = np.zeros((1, 4))
+
+    def fit(self, features, targets, ridge=RIDGE):
+        features = np.asarray(features, dtype=np.float64)
+        self.mean = features.mean(axis=0)
+        self.scale = features.std(axis=0) + 1e-6
+        x = expand((features - self.mean) / self.scale, self.kind)
+        penalty = ridge * len(x) * np.eye(x.shape[1])
+        penalty[0, 0] = 0.0  # the intercept is not shrunk
+        self.coef = np.linalg.solve(x.T @ x + penalty, x.T @ np.asarray(targets, dtype=np.float64))
+        return self
+
+    def predict_many(self, features):
+        x = expand((np.asarray(features, dtype=np.float64) - self.mean) / self.scale, self.kind)
+        return x @ self.coef + self.offset
+
+    def predict(self, iris_offset):
+        # iris_offset: ((lx, ly), (rx, ry)) as kept by FaceFeatures; returns (x, y) in 0..1
+        (lx, ly), (rx, ry) = iris_offset
+        row = self._row
+        row[0] = (lx, ly, rx, ry)
+        x, y = self.predict_many(row)[0]
+        return float(x), float(y)
+
+    def recenter(self, iris_offset):
+        # The user looks at the screen centre: absorb the current error as drift
+        self.offset[:] = 0.0
+        x, y = self.predict(iris_offset)
+        self.offset[:] = (0.5 - x, 0.5 - y)
+
+    def to_dict(self):
+        return {"kind": self.kind, "mean": self.mean.tolist(), "scale": self.scale.tolist(),
+                "coef": self.coef.tolist(), "info": self.info}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["kind"], data["mean"], data["scale"], data["coef"], data.get("info"))
+
+
+def calibration_targets(points=DEFAULT_POINTS, margin=MARGIN):
+    # Normalized dot positions: the four corners and the centre for 5, a square grid otherwise
+    if points == 5:
+        lo, hi = margin, 1 - margin
+        return [(0.5, 0.5), (lo, lo), (hi, lo), (hi, hi), (lo, hi)]
+    side = int(round(points ** 0.5))
+    if side * side != points or side < 2:
+        raise ValueError("calibration points must be 5 or a square number (4, 9, 16, ...)")
+    steps = np.linspace(margin, 1 - margin, side)
+    # Row by row, alternating direction, so the eyes never jump across the whole screen
+    targets = []
+    for r, y in enumerate(steps):
+        row = [(float(x), float(y)) for x in steps]
+        targets += row if r % 2 == 0 else row[::-1]
+    return targets
+
+
+class CalibrationSession:
+    # Shows each target for dwell seconds and keeps the samples taken after settle.
+    # Driven by the eye controller: add() once per frame with a face, draw() on render.
+    def __init__(self, targets, dwell=DWELL, settle=SETTLE):
+        self.targets = targets
+        self.dwell = dwell
+        self.settle = settle
+        self.start = None
+        self.now = None
+        self.timestamps = []
+        self.features = []
+        self.target_index = []
+        self._canvas = None
+
+    @property
+    def current(self):
+        if self.start is None:
+            return 0
+        return int((self.now - self.start) // self.dwell)
+
+    @property
+    def done(self):
+        return self.current >= len(self.targets)
+
+    def add(self, now, iris_offset, eyes_open=True):
+        if self.start is None:
+            self.start = now
+        self.now = now
+        i = self.current
+        if i >= len(self.targets) or not eyes_open:
+            return
+        if now - self.start - i * self.dwell < self.settle:
+            return
+        (lx, ly), (rx, ry) = iris_offset
+        self.timestamps.append(now)
+        self.features.append((lx, ly, rx, ry))
+        self.target_index.append(i)
+
+    def arrays(self):
+        index = np.array(self.target_index, dtype=np.int32)
+        targets = np.array(self.targets, dtype=np.float64)
+        return (np.array(self.timestamps, dtype=np.float64), np.array(self.features, dtype=np.float64).reshape(-1, 4),
+                index, targets[index] if len(index) else np.zeros((0, 2)))
+
+    def fit(self, kind=DEFAULT_KIND):
+        # None unless every target got samples
+        _, features, index, targets = self.arrays()
+        if len(set(index.tolist())) < len(self.targets):
+            return None
+        return GazeModel(kind).fit(features, targets)
+
+    def save(self, path, screen_size):
+        timestamps, features, index, targets = self.arrays()
+        np.savez_compressed(path, timestamps=timestamps, features=features, target_index=index,
+                            targets=targets, points=np.array(self.targets), screen_size=np.array(screen_size))
+        print(f"💾 Saved {len(timestamps)} calibration samples to {path}")
+
+    def draw(self, screen_w, screen_h):
+        # Full-screen canvas with the current dot; shrinks while its samples are taken
+        canvas = self._canvas
+        if canvas is None or canvas.shape[:2] != (screen_h, screen_w):
+            canvas = self._canvas = np.zeros((screen_h, screen_w, 3), dtype=np.uint8)
+        canvas[:] = 0
+        i = min(self.current, len(self.targets) - 1)
+        x, y = self.targets[i]
+        center = (int(x * (screen_w - 1)), int(y * (screen_h - 1)))
+        elapsed = 0.0 if self.start is None else self.now - self.start - i * self.dwell
+        radius = int(6 + 18 * max(0.0, 1.0 - elapsed / self.dwell))
+        cv2.circle(canvas, center, radius, (255, 255, 255), -1)
+        cv2.circle(canvas, center, 3, (0, 0, 255), -1)
+        cv2.putText(canvas, f"Look at the dot ({i + 1}/{len(self.targets)})", (30, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (160, 160, 160), 2)
+        return canvas
+
+
+def model_path(user, source, frame_size, cache_dir=CACHE_DIR):
+    # One cached model per user, camera (or clip) and capture size; user None is the login name
+    camera = os.path.basename(str(source).rstrip("/\\")) or "0"
+    name = f"{user or getpass.getuser()}-{camera}-{frame_size[0]}x{frame_size[1]}"
+    return os.path.join(cache_dir, re.sub(r"[^\w.-]", "_", name) + ".json")
+
+
+def load_model(path):
+    # None when there is no (readable) cached model
+    try:
+        with open(path) as f:
+            return GazeModel.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_model(model, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(model.to_dict(), f)
+    os.replace(tmp, path)
+
+
+def add_calibration_args(parser):
+    parser.add_argument("--calibrate", action="store_true",
+                        help="run the N-point gaze calibration at startup (also: 'k' key)")
+    parser.add_argument("--calibration-points", type=int, default=DEFAULT_POINTS,
+                        help="dots in the gaze calibration: 5 or a square number")
+    parser.add_argument("--gaze-model", default=DEFAULT_KIND, choices=KINDS, help="regression fitted by calibration")
+    parser.add_argument("--user", help="name the gaze calibration is cached under (default: login name)")
+    parser.add_argument("--record-calibration", metavar="PATH",
+                        help="save the calibration samples to an .npz trace for the benchmark")
+
+
+# Accuracy benchmark over recorded calibration traces
+
+def load_trace(path):
+    data = np.load(path)
+    return {key: data[key] for key in data.files}
+
+
+def fold_errors(trace, kind):
+    # Leave-one-target-out: every dot is predicted by a model fitted on the others,
+    # which is how far off the cursor lands between calibration points
+    features, targets, index = trace["features"], trace["targets"], trace["target_index"]
+    errors = np.zeros(len(features))
+    for i in np.unique(index):
+        held_out = index == i
+        model = GazeModel(kind).fit(features[~held_out], targets[~held_out])
+        errors[held_out] = np.linalg.norm((model.predict_many(features[held_out]) - targets[held_out])
+                                          * trace["screen_size"], axis=1)
+    return errors
+
+
+def benchmark(paths, kinds=KINDS):
+    reports = []
+    for path in paths:
+        trace = load_trace(path)
+        screen_w, screen_h = (int(v) for v in trace["screen_size"])
+        lines = [f"[gaze] {os.path.basename(path)}: {len(trace['features'])} samples, "
+                 f"{len(trace['points'])} points, screen {screen_w}x{screen_h}"]
+        for kind in kinds:
+            t0 = time.perf_counter()
+            model = GazeModel(kind).fit(trace["features"], trace["targets"])
+            fit_ms = (time.perf_counter() - t0) * 1000
+            fitted = np.linalg.norm((model.predict_many(trace["features"]) - trace["targets"])
+                                    * trace["screen_size"], axis=1)
+            held_out = fold_errors(trace, kind)
+            t0 = time.perf_counter()
+            offset = ((0.0, 0.0), (0.0, 0.0))
+            for _ in range(1000):
+                model.predict(offset)
+            predict_us = (time.perf_counter() - t0) * 1000
+            result = {"trace": path, "model": kind, "fit_ms": fit_ms, "predict_us": predict_us,
+                      "fit_mean_px": float(fitted.mean()),
+                      "held_out_mean_px": float(held_out.mean()),
+                      "held_out_p95_px": float(np.percentile(held_out, 95))}
+            reports.append(result)
+            lines.append(f"    {kind:<7} fit {result['fit_mean_px']:6.1f} px | held-out mean "
+                         f"{result['held_out_mean_px']:6.1f} px, p95 {result['held_out_p95_px']:6.1f} px | "
+                         f"fit {fit_ms:.2f} ms, predict {predict_us:.1f} µs")
+        print("\n".join(lines))
+    return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gaze calibration models and their accuracy")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="score the gaze models on recorded calibration traces")
+    bench.add_argument("traces", nargs="+", help="calibration .npz files saved with --record-calibration")
+    bench.add_argument("--model", action="append", choices=KINDS, dest="kinds", help="model to score, repeatable")
+    bench.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    sub.add_parser("list", help="list the cached calibrations")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        names = sorted(os.listdir(CACHE_DIR)) if os.path.isdir(CACHE_DIR) else []
+        for name in names:
+            model = load_model(os.path.join(CACHE_DIR, name))
+            if model is not None:
+                info = model.info
+                print(f"🎯 {name}: {model.kind}, {info.get('points', '?')} points, "
+                      f"{info.get('fit_px', float('nan')):.0f} px, {time.ctime(info.get('created', 0))}")
+        if not names:
+            print(f"No calibrations in {CACHE_DIR}")
+        return
+    reports = benchmark(args.traces, args.kinds or KINDS)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+import argparse
+import getpass
+import json
+import os
+import re
+import threading
+
+# Typed tuning profiles for both control modes.
+# Every knob is declared once in SCHEMA with its type, default and help text.
+# Profiles are JSON files holding any subset of it ({"eye": {"blink_threshold": 0.2}}),
+# merged over the defaults in this order:
+#   <profile>.json, <profile>@<camera>.json, then an explicit --config file
+# The running controllers pick up edits through ConfigWatcher: thresholds and timings
+# apply on the next frame, model options rebuild only that model in the background,
+# and the camera is never touched.
+
+PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".config", "hci_system", "profiles")
+
+# section -> name -> (type, default, help[, (low, high) or choices for strings])
+# Distances are relative to the hand or face (see features.py), never in pixels,
+# so one profile works at every capture resolution.
+SCHEMA = {
+    "hand": {
+        "click_threshold": (float, 0.35, "thumb-index distance (palm sizes) that counts as a pinch", (0.0, 2.0)),
+        "drag_hold_time": (float, 1.2, "seconds a pinch is held before it turns into a drag"),
+        "scroll_cooldown": (float, 0.3, "seconds between scroll steps while the finger stays in a band"),
+        "scroll_amount": (int, 100, "scroll units per step"),
+        "scroll_up_band": (float, 0.4, "middle fingertip above this fraction of the frame height scrolls up",
+                           (0.0, 1.0)),
+        "scroll_down_band": (float, 0.6, "middle fingertip below this fraction of the frame height scrolls down",
+                             (0.0, 1.0)),
+        "thumb_threshold": (float, 0.2, "thumb tip to thumb base height (palm sizes) for the volume gesture",
+                            (0.0, 2.0)),
+        "volume_step_db": (float, 1.5, "volume change per step, in dB"),
+        "volume_repeat": (float, 0.1, "seconds between volume steps while the thumb gesture is held"),
+        "palm_exit_frames": (int, 15, "frames an open palm must be held to exit", (1, 1000)),
+        "filter": (str, "", "cursor filter spec (empty: the mode default)"),
+        "model_complexity": (int, 1, "Hands model: 0 is faster, 1 more accurate", (0, 1)),
+        "min_detection_confidence": (float, 0.8, "Hands palm detection confidence", (0.0, 1.0)),
+        "min_tracking_confidence": (float, 0.8, "Hands tracking confidence", (0.0, 1.0)),
+    },
+    "eye": {
+        "sensitivity": (float, 31200.0, "screen px per frame height of iris movement (uncompensated mapping)"),
+        "gaze_sensitivity": (float, 1950.0, "screen px per eye width (pose-compensated mapping)"),
+        "dead_zone": (float, 25.0, "screen px around the reference where the cursor holds still"),
+        "blink_mode": (str, "adaptive", "closed-eye threshold: fixed (blink_threshold) or adaptive (learned per user)",
+                       ("fixed", "adaptive")),
+        "blink_threshold": (float, 0.22, "eye aspect ratio below which an eye counts as closed (blink_mode fixed)"),
+        "blink_level": (float, 0.5, "adaptive threshold between the closed (0) and open (1) eye levels", (0.05, 0.95)),
+        "blink_adapt_time": (float, 20.0, "seconds over which the learned open-eye level follows changes",
+                             (1.0, 3600.0)),
+        "blink_forget_after": (float, 10.0, "seconds without a face after which the learned levels reset",
+                               (0.0, 3600.0)),
+        "blink_recover_after": (float, 5.0, "longest eye closure: longer ones never click, and in blink_mode "
+                                "adaptive their EAR becomes the new open level (seconds)", (1.0, 3600.0)),
+        "blink_time": (float, 0.05, "seconds an eye must stay closed for a blink click", (0.0, 5.0)),
+        "double_click_time": (float, 0.5, "seconds within which a second blink double-clicks"),
+        "volume_hold_time": (float, 0.35, "seconds one eye stays closed before the volume changes", (0.0, 10.0)),
+        "volume_repeat": (float, 0.2, "seconds between volume steps while the eye stays closed"),
+        "mouth_open_threshold": (float, 0.2, "lip gap (face widths) that exits", (0.0, 2.0)),
+        "filter": (str, "", "cursor filter spec (empty: the mode default)"),
+        "min_detection_confidence": (float, 0.5, "FaceMesh detection confidence", (0.0, 1.0)),
+        "min_tracking_confidence": (float, 0.5, "FaceMesh tracking confidence", (0.0, 1.0)),
+    },
+    "fusion": {
+        "fine_gain": (float, 0.3, "cursor movement per unit of hand movement while the gaze anchors the pointer",
+                      (0.0, 1.0)),
+        "warp_distance": (float, 0.15, "gaze this far from the cursor (screen diagonals) moves the pointer there",
+                          (0.0, 1.0)),
+    },
+    "performance": {
+        "inference_scale": (float, 1.0, "downscale factor applied to the model input", (0.1, 1.0)),
+        "target_fps": (float, 0.0, "inference budget while in use; 0 runs every frame", (0.0, 240.0)),
+        "still_fps": (float, 15.0, "inference budget while the target is still", (0.0, 240.0)),
+        "idle_fps": (float, 4.0, "inference budget while nothing is detected", (0.0, 240.0)),
+        "idle_scale": (float, 0.5, "model input scale while idle", (0.1, 1.0)),
+        "skip_method": (str, "off", "landmarks between inferences: off (infer every frame), flow or extrapolate",
+                        ("off", "flow", "extrapolate")),
+        "max_skip": (int, 2, "most frames propagated in a row; k adapts up to it", (0, 30)),
+        "infer_fps": (float, 0.0, "fixed inference budget while propagating; 0 adapts k instead", (0.0, 240.0)),
+        "skip_tolerance": (float, 0.01, "propagation error (frame heights) that halves k", (0.0, 1.0)),
+    },
+    "quality": {
+        "mode": (str, "off", "frame quality gate: off, skip (unusable frames) or enhance (also dark and flat ones)",
+                 ("off", "skip", "enhance")),
+        "black_level": (float, 15.0, "mean level (0-255) below which a frame is skipped", (0.0, 255.0)),
+        "dark_level": (float, 50.0, "mean level (0-255) below which a frame counts as dark", (0.0, 255.0)),
+        "contrast_level": (float, 15.0, "level deviation below which enhance applies CLAHE", (0.0, 255.0)),
+        "blur_ratio": (float, 0.35, "sharpness below this fraction of the scene's average skips the frame",
+                       (0.0, 1.0)),
+        "max_skip_time": (float, 0.25, "longest run (s) of skipped frames before one is inferred anyway",
+                          (0.0, 10.0)),
+        "low_light_after": (float, 2.0, "seconds of dark frames before the models switch confidences",
+                            (0.0, 600.0)),
+        "low_light_detection_confidence": (float, 0.5, "model detection confidence in low light", (0.0, 1.0)),
+        "low_light_tracking_confidence": (float, 0.3, "model tracking confidence in low light", (0.0, 1.0)),
+    },
+}
+
+# Options a model is built with: changing one rebuilds that model
+MODEL_KEYS = {
+    "hand": ("model_complexity", "min_detection_confidence", "min_tracking_confidence"),
+    "eye": ("min_detection_confidence", "min_tracking_confidence"),
+}
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def coerce(section, name, value):
+    # Checks one value against the schema; ints are accepted for floats, nothing else converts
+    fields = SCHEMA.get(section)
+    if fields is None:
+        raise ConfigError(f"Unknown config section '{section}' (expected {', '.join(SCHEMA)})")
+    spec = fields.get(name)
+    if spec is None:
+        raise ConfigError(f"Unknown setting '{section}.{name}'")
+    kind = spec[0]
+    if isinstance(value, bool) or not isinstance(value, (int, float) if kind is float else kind):
+        raise ConfigError(f"{section}.{name} must be {kind.__name__}, got {value!r}")
+    value = kind(value)
+    if len(spec) > 3 and kind is str:
+        if value not in spec[3]:
+            raise ConfigError(f"{section}.{name} must be one of {', '.join(spec[3])}, got {value!r}")
+    elif len(spec) > 3:
+        low, high = spec[3]
+        if not low <= value <= high:
+            raise ConfigError(f"{section}.{name} must be between {low} and {high}, got {value!r}")
+    return value
+
+
+class Section:
+    # Attribute access to one section's values
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+class Config:
+    # Defaults with layers of overrides ({section: {name: value}}) applied in order
+    def __init__(self, *layers, sources=()):
+        values = {section: {name: spec[1] for name, spec in fields.items()} for section, fields in SCHEMA.items()}
+        for layer in layers:
+            for section, overrides in (layer or {}).items():
+                if not isinstance(overrides, dict):
+                    raise ConfigError(f"Config section '{section}' must be an object")
+                for name, value in overrides.items():
+                    values[section][name] = coerce(section, name, value)
+        self.sources = list(sources)
+        for section, section_values in values.items():
+            setattr(self, section, Section(section_values))
+
+    def to_dict(self):
+        return {section: getattr(self, section).to_dict() for section in SCHEMA}
+
+    def changed(self, other, section, keys=None):
+        # True when any of keys (default: all) differ between this config and other
+        mine, theirs = getattr(self, section).to_dict(), getattr(other, section).to_dict()
+        return any(mine[key] != theirs[key] for key in (keys or mine))
+
+
+def merge_layers(*layers):
+    # One {section: {name: value}} layer from several, later ones winning
+    merged = {}
+    for layer in layers:
+        for section, values in layer.items():
+            merged.setdefault(section, {}).update(values)
+    return merged
+
+
+def profile_paths(profile=None, camera=None, path=None, profile_dir=PROFILE_DIR):
+    # Files a profile is read from, lowest priority first; missing ones are skipped
+    profile = re.sub(r"[^\w.-]", "_", profile or getpass.getuser())
+    paths = [os.path.join(profile_dir, f"{profile}.json")]
+    if camera is not None:
+        camera = re.sub(r"[^\w.-]", "_", os.path.basename(str(camera).rstrip("/\\")) or "0")
+        paths.append(os.path.join(profile_dir, f"{profile}@{camera}.json"))
+    if path:
+        paths.append(path)
+    return paths
+
+
+def load_config(paths, overrides=None):
+    # overrides (e.g. from command-line flags) win over every file
+    layers, sources = [], []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path) as f:
+                layers.append(json.load(f))
+        except json.JSONDecodeError as e:
+            raise ConfigError(f"{path}: {e}") from None
+        sources.append(path)
+    return Config(*layers, overrides, sources=sources)
+
+
+class ConfigWatcher(threading.Thread):
+    # Polls the profile files (including ones that do not exist yet) and calls
+    # on_change(config) after each edit; a broken file is reported and ignored
+    def __init__(self, paths, on_change, overrides=None, interval=1.0):
+        super().__init__(name="config-watch", daemon=True)
+        self.paths = paths
+        self.on_change = on_change
+        self.overrides = overrides
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self._mtimes = self._stat()
+
+    def _stat(self):
+        return [os.path.getmtime(path) if os.path.exists(path) else None for path in self.paths]
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            mtimes = self._stat()
+            if mtimes == self._mtimes:
+                continue
+            self._mtimes = mtimes
+            try:
+                config = load_config(self.paths, self.overrides)
+            except (ConfigError, OSError) as e:
+                print(f"⚠️ Config not reloaded: {e}")
+                continue
+            print(f"🔄 Reloaded config from {', '.join(config.sources) or 'defaults'}")
+            self.on_change(config)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def add_config_args(parser):
+    parser.add_argument("--profile", help="tuning profile name (default: login name)")
+    parser.add_argument("--config", metavar="PATH", help="extra JSON config file, applied over the profile")
+    parser.add_argument("--no-reload", action="store_true", help="do not watch the profile files for edits")
+
+
+def config_from_args(args, camera, overrides=None):
+    config = load_config(profile_paths(args.profile, camera, args.config), overrides)
+    if config.sources:
+        print(f"⚙️ Config: {', '.join(config.sources)}")
+    return config
+
+
+def watch_config(args, camera, on_change, overrides=None):
+    # Started watcher over the same files as config_from_args, or None with --no-reload
+    if args.no_reload:
+        return None
+    watcher = ConfigWatcher(profile_paths(args.profile, camera, args.config), on_change, overrides)
+    watcher.start()
+    return watcher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show or create tuning profiles")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, text in (("show", "print the merged settings and where they come from"),
+                       ("init", "write the merged settings to the profile file for editing")):
+        command = sub.add_parser(name, help=text)
+        command.add_argument("--profile", help="profile name (default: login name)")
+        command.add_argument("--camera", help="write or include the per-camera profile for this source")
+    args = parser.parse_args(argv)
+
+    paths = profile_paths(args.profile, args.camera)
+    config = load_config(paths)
+    if args.command == "init":
+        path = paths[-1]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(config.to_dict(), f, indent=2)
+        print(f"💾 Wrote {path}")
+        return
+    print(f"⚙️ Sources: {', '.join(config.sources) or 'defaults only'}")
+    for section, fields in SCHEMA.items():
+        print(f"[{section}]")
+        values = getattr(config, section)
+        for name, spec in fields.items():
+            print(f"    {name:<26} {getattr(values, name)!r:<10} {spec[2]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+import multiprocessing
+import queue
+import threading
+import time
+
+# One long-lived worker process that imports cv2/MediaPipe once, owns the camera,
+# keeps both models loaded and switches between hand, eye and fused control on command.
+# The GUI talks to it through EngineClient; nothing heavy is imported on the GUI side.
+
+# Commands sent to the engine
+START = "start"
+STOP = "stop"
+QUIT = "quit"
+
+# Status messages sent back: (kind, *details)
+READY = "ready"          # ("ready", load_ms)
+MODE = "mode"            # ("mode", mode, switch_ms) once the first frame of a mode was actuated
+EXITED = "exited"        # ("exited", mode) after the exit gesture
+STOPPED = "stopped"      # ("stopped", mode)
+ERROR = "error"          # ("error", message)
+METRICS = "metrics"      # ("metrics", mode, snapshot, lines) about once a second while a mode runs
+SHUTDOWN = "shutdown"    # ("shutdown",) after quit, once the camera was released
+
+MODES = ("hand", "eye", "fusion")
+METRICS_EVERY = 1.0
+
+
+class Engine:
+    # Runs inside the worker process
+    def __init__(self, status_queue, camera_index=0):
+        self.status_queue = status_queue
+        self.camera_index = camera_index
+        self.source = None
+        self.models = {}
+        # The tuning profile for this camera, and the one each model was built with
+        self.config = None
+        self.model_configs = {}
+        self.controller = None
+        self.watcher = None
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.run_stop = threading.Event()
+        self.requested = None
+        self.requested_at = None
+
+    def send(self, *message):
+        self.status_queue.put(message)
+
+    def load(self):
+        import numpy as np
+        from config import load_config, profile_paths, ConfigWatcher
+        from hand_control import create_hand_detector, MAX_HANDS
+        from eye_control import create_face_mesh
+        from sources import CameraSource
+        from startup import Background
+
+        t0 = time.perf_counter()
+        paths = profile_paths(None, self.camera_index)
+        self.config = load_config(paths)
+        # Opening the camera can take a second or more; build the graphs meanwhile
+        hand = Background(create_hand_detector, MAX_HANDS, self.config.hand)
+        eye = Background(create_face_mesh, self.config.eye)
+        self.source = CameraSource(self.camera_index)
+        self.models["hand"] = hand.result()
+        self.models["eye"] = eye.result()
+        self.model_configs = {"hand": self.config, "eye": self.config}
+        self.watcher = ConfigWatcher(paths, self.on_config)
+        self.watcher.start()
+        # The first process() call initializes the graph; pay for it now, not on the first switch
+        w, h = self.source.frame_size()
+        blank = np.zeros((h or 480, w or 640, 3), dtype=np.uint8)
+        for model in self.models.values():
+            model.process(blank)
+        self.send(READY, (time.perf_counter() - t0) * 1000)
+
+    def on_command(self, command):
+        # Called from the listener thread; interrupts the current mode if it changes
+        with self.lock:
+            kind = command[0]
+            if kind == START:
+                self.requested = command[1]
+            elif kind == STOP:
+                self.requested = None
+            elif kind == QUIT:
+                self.requested = QUIT
+            self.requested_at = time.perf_counter()
+            self.run_stop.set()
+        self.wake.set()
+
+    def on_config(self, config):
+        # Called from the config watcher; the running mode picks it up between frames
+        with self.lock:
+            self.config = config
+            controller = self.controller
+        if controller is not None:
+            controller.reconfigure(config)
+
+    def model_for(self, mode):
+        # The loaded model, rebuilt first if the profile changed its options since
+        from config import MODEL_KEYS
+
+        config = self.config
+        built_with = self.model_configs[mode]
+        if built_with is None or config.changed(built_with, mode, MODEL_KEYS[mode]):
+            from eye_control import create_face_mesh
+            from hand_control import create_hand_detector, MAX_HANDS
+            self.models[mode].close()
+            if mode == "hand":
+                self.models[mode] = create_hand_detector(MAX_HANDS, config.hand)
+            else:
+                self.models[mode] = create_face_mesh(config.eye)
+            self.model_configs[mode] = config
+        return self.models[mode]
+
+    def keep_model(self, mode, controller):
+        # The controller may have swapped in a rebuilt model while it ran
+        pending = controller.pending_detector if mode == "hand" else controller.pending_face_mesh
+        model = controller.hand_detector if mode == "hand" else controller.face_mesh
+        if pending is not None:
+            model.close()
+            model = pending.result()
+        self.models[mode] = model
+        if controller.quality.low_light:
+            # Built with the low-light confidences; the next mode starts from the profile's again
+            self.model_configs[mode] = None
+        else:
+            self.model_configs[mode] = controller.config if controller.pending_config is None \
+                else controller.pending_config
+
+    def create_controller(self, mode):
+        from actuators import PyAutoGuiActuator, ThreadedActuator
+        from governor import FrameGovernor
+
+        actuator = ThreadedActuator(PyAutoGuiActuator())
+        frame_size = self.source.frame_size()
+        if mode == "hand":
+            from hand_control import HandController
+            return HandController(actuator, frame_size, governor=FrameGovernor(),
+                                  hand_detector=self.model_for("hand"), config=self.config)
+        from calibration import load_model, model_path
+        from eye_control import EyeController
+        # The last gaze calibration for this camera, if any ('k' in the preview runs one)
+        gaze_model_path = model_path(None, self.camera_index, frame_size)
+        if mode == "fusion":
+            from fusion import FusionController
+            return FusionController(actuator, frame_size, hand_detector=self.model_for("hand"),
+                                    face_mesh=self.model_for("eye"), gaze_model=load_model(gaze_model_path),
+                                    gaze_model_path=gaze_model_path, config=self.config)
+        return EyeController(actuator, frame_size, governor=FrameGovernor(),
+                             face_mesh=self.model_for("eye"), gaze_model=load_model(gaze_model_path),
+                             gaze_model_path=gaze_model_path, config=self.config)
+
+    def run_mode(self, mode):
+        import cv2
+        from metrics import format_snapshot
+        from pipeline import run_sequential, run_threaded
+
+        with self.lock:
+            if self.requested != mode:
+                return
+            requested_at = self.requested_at
+            self.run_stop = threading.Event()
+            stop_event = self.run_stop
+        controller = self.create_controller(mode)
+        with self.lock:
+            self.controller = controller
+            if controller.config is not self.config:
+                # Edited while the controller was being built
+                controller.reconfigure(self.config)
+        reported = []
+        next_metrics = [0.0]
+
+        def on_actuated(packet):
+            if not reported:
+                reported.append(True)
+                self.send(MODE, mode, (time.perf_counter() - requested_at) * 1000)
+            if packet.t_actuated >= next_metrics[0]:
+                # Formatted here so the GUI needs no numpy/cv2
+                next_metrics[0] = packet.t_actuated + METRICS_EVERY
+                snapshot = controller.timer.snapshot()
+                self.send(METRICS, mode, snapshot, format_snapshot(snapshot))
+
+        if mode in ("hand", "fusion"):
+            run_threaded(controller, self.source, stop_event=stop_event, on_actuated=on_actuated)
+        else:
+            run_sequential(controller, self.source, stop_event=stop_event, on_actuated=on_actuated)
+        with self.lock:
+            self.controller = None
+        if mode == "fusion":
+            controller.close()
+            self.keep_model("hand", controller.hand)
+            self.keep_model("eye", controller.eye)
+        else:
+            self.keep_model(mode, controller)
+        controller.actuator.close()
+        cv2.destroyWindow(controller.window_name)
+        cv2.waitKey(1)
+
+        with self.lock:
+            if self.requested == mode:
+                # Ended by the exit gesture or ESC rather than by a new command
+                self.requested = None
+        self.send(EXITED if controller.exit_requested else STOPPED, mode)
+
+    def run(self):
+        while True:
+            self.wake.wait()
+            self.wake.clear()
+            with self.lock:
+                mode = self.requested
+            if mode == QUIT:
+                break
+            if mode in MODES:
+                self.run_mode(mode)
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.source is not None:
+            self.source.release()
+        self.send(SHUTDOWN)
+
+
+def _listen(engine, command_queue):
+    while True:
+        command = command_queue.get()
+        engine.on_command(command)
+        if command[0] == QUIT:
+            break
+
+
+def engine_main(command_queue, status_queue, camera_index=0):
+    # Entry point of the worker process
+    engine = Engine(status_queue, camera_index)
+    try:
+        engine.load()
+        threading.Thread(target=_listen, args=(engine, command_queue), daemon=True).start()
+        engine.run()
+    except Exception as e:
+        status_queue.put((ERROR, f"{type(e).__name__}: {e}"))
+        raise
+
+
+class EngineClient:
+    # GUI-side handle on the worker process
+    def __init__(self, camera_index=0):
+        # spawn keeps the worker independent of the GUI's Qt state on every platform
+        context = multiprocessing.get_context("spawn")
+        self.commands = context.Queue()
+        self.status = context.Queue()
+        self.process = context.Process(target=engine_main, args=(self.commands, self.status, camera_index),
+                                       name="hci-engine", daemon=True)
+
+    def start(self):
+        self.process.start()
+
+    def start_mode(self, mode):
+        self.commands.put((START, mode))
+
+    def stop_mode(self):
+        self.commands.put((STOP,))
+
+    def poll(self):
+        messages = []
+        while True:
+            try:
+                messages.append(self.status.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def is_running(self):
+        return self.process.is_alive()
+
+    def request_shutdown(self):
+        # Returns at once; the engine answers with SHUTDOWN when it has stopped
+        if self.process.is_alive():
+            self.commands.put((QUIT,))
+
+    def terminate(self):
+        if self.process.is_alive():
+            self.process.terminate()
@@ -1,181 +1,564 @@
+from startup import StartupProfiler, Background, add_startup_args  # First: marks process start
+
+import argparse
+import time
+
 import cv2
 import mediapipe as mp
-import pyautogui
 import numpy as np
-import time
-from collections import deque
-import pyttsx3
-
-# Voice setup
-engine = pyttsx3.init()
-engine.setProperty('rate', 160)
-def speak(text):
-    engine.say(text)
-    engine.runAndWait()
-
-# Setup
-screen_w, screen_h = pyautogui.size()
-cap = cv2.VideoCapture(0)
-mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=1)
-
-# Config
-BASE_SENSITIVITY = 65
-ALPHA = 0.1
-SMOOTHING_BUFFER = 8
-DEAD_ZONE = 25
-cursor_x, cursor_y = screen_w // 2, screen_h // 2
-eye_ref_x, eye_ref_y = None, None
-eye_buffer_x = deque(maxlen=SMOOTHING_BUFFER)
-eye_buffer_y = deque(maxlen=SMOOTHING_BUFFER)
-
-# Blink detection
-BLINK_THRESHOLD = 0.22
-CONSEC_FRAMES = 2
-blink_counter = 0
-blink_timestamps = []
-DOUBLE_CLICK_TIME = 0.5
-
-# Scroll hold blink
-SCROLL_HOLD_FRAMES = 12
-scroll_up_counter = 0
-scroll_down_counter = 0
-
-# Landmark indices
-RIGHT_EYE_TOP = 159
-RIGHT_EYE_BOTTOM = 145
-RIGHT_EYE_LEFT = 33
-RIGHT_EYE_RIGHT = 133
-
-LEFT_EYE_TOP = 386
-LEFT_EYE_BOTTOM = 374
-LEFT_EYE_LEFT = 263
-LEFT_EYE_RIGHT = 362
-
-RIGHT_IRIS = 474
-
-UPPER_LIP = 13
-LOWER_LIP = 14
-MOUTH_OPEN_THRESHOLD = 20  # Adjust if needed
-
-def calculate_ear(landmarks, top_idx, bottom_idx, left_idx, right_idx, w, h):
-    top = np.array([landmarks[top_idx].x * w, landmarks[top_idx].y * h])
-    bottom = np.array([landmarks[bottom_idx].x * w, landmarks[bottom_idx].y * h])
-    left = np.array([landmarks[left_idx].x * w, landmarks[left_idx].y * h])
-    right = np.array([landmarks[right_idx].x * w, landmarks[right_idx].y * h])
-    vertical = np.linalg.norm(top - bottom)
-    horizontal = np.linalg.norm(left - right)
-    return vertical / horizontal
-
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    frame = cv2.flip(frame, 1)
-    h, w, _ = frame.shape
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = face_mesh.process(rgb)
-    key = cv2.waitKey(1) & 0xFF
-
-    if results.multi_face_landmarks:
-        face = results.multi_face_landmarks[0].landmark
-
-        # EAR values
-        ear_left = calculate_ear(face, LEFT_EYE_TOP, LEFT_EYE_BOTTOM, LEFT_EYE_LEFT, LEFT_EYE_RIGHT, w, h)
-        ear_right = calculate_ear(face, RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM, RIGHT_EYE_LEFT, RIGHT_EYE_RIGHT, w, h)
+
+from actuators import add_actuator_args, actuator_from_args, format_actuator_stats, TimedActuator
+from blink import BlinkThresholds
+from calibration import (add_calibration_args, calibration_targets, load_model, model_path, save_model,
+                         CalibrationSession, CALIBRATION_WINDOW, DEFAULT_KIND)
+from config import add_config_args, config_from_args, merge_layers, watch_config, Config, MODEL_KEYS
+from features import FaceFeatures
+from feedback import FeedbackService
+from filters import add_filter_args, mode_filter
+from gestures import (ActionQueue, BlinkGesture, GestureEvent, HoldGesture,
+                      CLICK, DOUBLE_CLICK, EXIT, MOVE, VOLUME)
+from governor import add_governor_args, governor_from_args, governor_overrides
+from head_pose import add_head_pose_args, compensate, pointer_position, HeadPoseEstimator
+from metrics import add_metrics_args, exporter_from_args, Hud, Metrics
+from pipeline import LatencyMonitor, run_sequential
+from preprocess import Preprocessor
+from propagate import add_propagate_args, propagate_overrides, LandmarkPropagator, NEAR_THRESHOLD
+from quality import add_quality_args, low_light_settings, quality_overrides, FrameQualityGate, ENHANCE, SKIP
+from roi import FaceRoiTracker
+from sessions import add_extra_source_args, run_sessions, SessionManager
+from sources import open_source, LandmarkRecorder
+from tracefile import add_trace_args, TraceWriter, TracingActuator
+
+# Sensitivities, blink and exit thresholds live in the tuning profile (config.py, section "eye")
+
+NUM_FACE_LANDMARKS = 478
+
+
+def create_face_mesh(settings=None):
+    # settings: the config's eye section (default: the built-in profile)
+    settings = settings or Config().eye
+    return mp.solutions.face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=1,
+                                           min_detection_confidence=settings.min_detection_confidence,
+                                           min_tracking_confidence=settings.min_tracking_confidence)
+
+
+class EyeController:
+    window_name = "Eye Mouse"
+
+    def __init__(self, actuator, frame_size, timer=None, recorder=None, auto_calibrate=False,
+                 roi_tracking=False, inference_scale=None, governor=None, face_mesh=None, feedback=None,
+                 cursor_filter=None, draw=True, gaze_model=None, gaze_model_path=None, head_pose="compensate",
+                 config=None):
+        self.config = config if config is not None else Config()
+        self.actuator = TimedActuator(actuator)
+        self.feedback = feedback
+        self.timer = timer if timer is not None else Metrics()
+        self.hud = Hud(self.timer)
+        self.latency_monitor = LatencyMonitor()
+        self.recorder = recorder
+        self.governor = governor
+        # Created on the first inferred frame unless a preloaded one is passed in
+        self.face_mesh = face_mesh
+        # A replacement built in the background after the profile changed a model option
+        self.pending_face_mesh = None
+        self.pending_config = None
+        self.features = FaceFeatures()
+        # Camera frames stay unflipped; only the (cropped, downscaled) model input is mirrored
+        self.preprocess = Preprocessor()
+        # An explicit inference_scale wins over the profile's, also across reloads
+        self.fixed_scale = inference_scale is not None
+        if not self.fixed_scale:
+            inference_scale = self.config.performance.inference_scale
+        self.roi = FaceRoiTracker(scale=inference_scale, enabled=roi_tracking, mirror=True,
+                                  preprocessor=self.preprocess)
+        # Carries the landmarks across frames the model skips (performance.skip_method)
+        self.propagator = LandmarkPropagator("face")
+        self.propagator.configure(self.config.performance)
+        # Skips or enhances unusable frames before inference (config section "quality")
+        self.quality = FrameQualityGate()
+        self.quality.configure(self.config.quality)
+        # draw=False shows the bare preview, without the gesture overlays
+        self.draw = draw
+        self.frame_w, self.frame_h = frame_size
+        self.screen_w, self.screen_h = actuator.screen_size()
+
+        # Cursor state
+        self.cursor_x, self.cursor_y = self.screen_w // 2, self.screen_h // 2
+        self.eye_ref_x, self.eye_ref_y = None, None
+        self.fixed_filter = cursor_filter is not None
+        self.cursor_filter = cursor_filter if self.fixed_filter else mode_filter("eye", self.config.eye.filter)
+        # Calibrated gaze mapping ('k' runs an N-point calibration); without one the cursor
+        # follows the iris around a single reference point set with 'c'
+        self.gaze_model = gaze_model
+        self.gaze_model_path = gaze_model_path
+        self.gaze_kind = DEFAULT_KIND
+        self.calibration_targets = calibration_targets()
+        self.calibration_trace = None
+        self.calibration = None
+        self._calibration_window = False
+        # "compensate": gaze is corrected for head rotation; "pointer": the head alone moves the cursor
+        self.head_mode = head_pose
+        self.head_pose = HeadPoseEstimator() if head_pose != "off" else None
+        if self.head_pose is not None and gaze_model is not None:
+            # The pose the model was calibrated in
+            self.head_pose.load_reference(gaze_model.info.get("head_reference"))
+        # Headless runs have no 'c' key, so they set the reference on the first face seen
+        self.calibrate_requested = auto_calibrate and gaze_model is None
+
+        # Gesture state machines, fed once per frame; their events go through the action queue
+        settings = self.config.eye
+        self.mouth_exit = HoldGesture(EXIT)
+        # Closed-eye thresholds learned from this user's eyes (blink_mode "adaptive")
+        self.blink_thresholds = BlinkThresholds(settings)
+        # (left, right) thresholds of the last inferred frame; 0.0 never counts as closed
+        self.thresholds = (0.0, 0.0)
+        self.blink = BlinkGesture(settings.blink_time, settings.double_click_time, settings.blink_recover_after)
+        self.volume_up = HoldGesture(VOLUME, 1, hold_time=settings.volume_hold_time, repeat=settings.volume_repeat)
+        self.volume_down = HoldGesture(VOLUME, -1, hold_time=settings.volume_hold_time,
+                                       repeat=settings.volume_repeat)
+        self.actions = ActionQueue(self.actuator)
+        self.events = []
+        self.exit_requested = False
+        self.features_time = 0.0
+        if self.governor is not None:
+            self.governor.configure(self.config.performance)
+
+        # Labels and markers for the render stage
+        self.overlays = []
+
+    def reconfigure(self, config):
+        # Called from the config watcher thread; applied by the actuation stage between frames
+        current = self.pending_config or self.config
+        if config.changed(current, "eye", MODEL_KEYS["eye"]):
+            self.pending_face_mesh = Background(create_face_mesh, self.model_settings(config))
+        self.pending_config = config
+
+    def model_settings(self, config=None):
+        # The options the model is built with: the low-light confidences while the quality gate reports low light
+        config = config or self.config
+        if self.quality.low_light:
+            return low_light_settings(config.eye, config.quality)
+        return config.eye
+
+    def apply_config(self, config):
+        settings = config.eye
+        if config.changed(self.config, "eye", ("filter",)) and not self.fixed_filter:
+            self.cursor_filter = mode_filter("eye", settings.filter)
+        self.config = config
+        self.blink_thresholds.configure(settings)
+        self.blink.min_time = settings.blink_time
+        self.blink.double_time = settings.double_click_time
+        self.blink.max_time = settings.blink_recover_after
+        for gesture in (self.volume_up, self.volume_down):
+            gesture.hold_time = settings.volume_hold_time
+            gesture.repeat = settings.volume_repeat
+        if not self.fixed_scale:
+            self.roi.scale = config.performance.inference_scale
+        self.propagator.configure(config.performance)
+        self.quality.configure(config.quality)
+        if self.governor is not None:
+            self.governor.configure(config.performance)
+
+    def infer(self, packet):
+        if self.pending_face_mesh is not None and self.pending_face_mesh.done():
+            # Swap in the rebuilt model between frames; the camera keeps running meanwhile
+            old, self.face_mesh = self.face_mesh, self.pending_face_mesh.result()
+            self.pending_face_mesh = None
+            if old is not None:
+                old.close()
+        if packet.results is None:
+            governor = self.governor
+            if governor is not None and not governor.should_infer(packet.timestamp, packet.frame):
+                self.timer.count("skipped")
+                return None
+            propagator = self.propagator
+            if not propagator.should_infer(packet.timestamp):
+                t0 = time.perf_counter()
+                packet.results = propagator.propagate(packet.frame, packet.timestamp)
+                if packet.results is not None:
+                    # Propagated landmarks are in full-frame coordinates; the crop follows them
+                    self.roi.update(packet.results, None, self.frame_w, self.frame_h)
+                    self.timer.add("propagate", time.perf_counter() - t0)
+                    self.timer.count("propagated")
+        if packet.results is None:
+            governor = self.governor
+            t0 = time.perf_counter()
+            frame = packet.frame
+            quality = self.quality
+            if quality.mode != "off":
+                verdict = quality.check(frame, packet.timestamp)
+                if quality.take_light_change():
+                    self.pending_face_mesh = Background(create_face_mesh, self.model_settings())
+                if verdict == SKIP:
+                    self.timer.count("unusable")
+                    return None
+                if verdict == ENHANCE:
+                    frame = quality.enhance(frame)
+            # Crop to last frame's face (and downscale) before converting, when enabled
+            scale = governor.inference_scale() if governor is not None else 1.0
+            rgb, packet.region = self.roi.prepare(frame, scale)
+            t1 = time.perf_counter()
+            if self.face_mesh is None:
+                self.face_mesh = create_face_mesh(self.model_settings())
+            packet.results = self.face_mesh.process(rgb)
+            t2 = time.perf_counter()
+            self.roi.update(packet.results, packet.region, self.frame_w, self.frame_h)
+            self.timer.add("preprocess", t1 - t0)
+            self.timer.add("process", t2 - t1)
+            self.timer.mark("inferred", t2)
+            self.propagator.observe(packet.frame, packet.results, packet.region, packet.timestamp)
+            if governor is not None:
+                faces = packet.results.multi_face_landmarks
+                position = None
+                if faces:
+                    # Iris position plus both eyelid gaps, so a blink counts as motion
+                    face = faces[0].landmark
+                    position = (face[474].x, face[474].y,
+                                face[159].y - face[145].y, face[386].y - face[374].y)
+                governor.update(packet.timestamp, bool(faces), position)
+        if self.recorder is not None:
+            # Replayed landmarks are recorded too, so a replay can be re-saved with its actions
+            if packet.region is not None and packet.results.multi_face_landmarks:
+                packet.region.landmarks_to_frame(packet.results.multi_face_landmarks[0].landmark)
+                packet.region = None
+            self.recorder.add(packet.timestamp, packet.results)
+        packet.t_inferred = time.perf_counter()
+        return packet
+
+    def actuate(self, packet):
+        t0 = time.perf_counter()
+        if self.pending_config is not None:
+            config, self.pending_config = self.pending_config, None
+            self.apply_config(config)
+        self.overlays = []
+        events = self.events
+        events.clear()
+        self.features_time = 0.0
+        self.timer.mark("detected", 1.0 if packet.results.multi_face_landmarks else 0.0)
+        if packet.results.multi_face_landmarks:
+            # Landmarks carried forward between inferences move the cursor but decide no gestures
+            guessed = getattr(packet.results, "propagated", False)
+            self.handle_face(packet.results.multi_face_landmarks[0].landmark, packet.timestamp, events,
+                             packet.region, guessed)
+        else:
+            self.cursor_filter.reset()
+        for event in events:
+            self.handle_event(event)
+        self.actions.flush(packet.timestamp)
+        packet.t_actuated = time.perf_counter()
+        actuation_time = self.actuator.take_elapsed()
+        if self.features_time:
+            self.timer.add("features", self.features_time)
+        self.timer.add("gesture", packet.t_actuated - t0 - actuation_time - self.features_time)
+        self.timer.add("actuation", actuation_time)
+        self.timer.add("latency", packet.t_actuated - packet.t_capture)
+        self.timer.mark("actuated", packet.t_actuated)
+        self.timer.set("actions", self.actions.sent)
+        self.latency_monitor.record(packet)
+        return packet
+
+    def handle_face(self, face, now, events, region=None, guessed=False):
+        overlays = self.overlays
+        settings = self.config.eye
+
+        # EAR values, mouth opening and iris position in one batched pass, then the head pose
+        t_features = time.perf_counter()
+        features = self.features.update(face, self.frame_w, self.frame_h, region)
+        iris_offset = features.iris_offset
+        pose = None
+        if self.head_pose is not None:
+            if self.calibrate_requested or (self.calibration is not None and self.calibration.start is None):
+                # Calibrating: this is the pose gaze is measured against from now on
+                self.head_pose.set_reference(face, self.frame_w, self.frame_h, region)
+            pose = self.head_pose.update(face, self.frame_w, self.frame_h, region)
+            if self.head_mode == "compensate":
+                iris_offset = compensate(iris_offset, pose)
+        self.features_time = time.perf_counter() - t_features
+        ear_left = features.ear_left
+        ear_right = features.ear_right
+        if not guessed:
+            # Guessed EARs neither train the thresholds nor decide anything below
+            self.thresholds = self.blink_thresholds.update(ear_left, ear_right, now)
+        threshold_left, threshold_right = self.thresholds
 
         # Mouth open detection for exit
-        upper_lip = np.array([face[UPPER_LIP].x * w, face[UPPER_LIP].y * h])
-        lower_lip = np.array([face[LOWER_LIP].x * w, face[LOWER_LIP].y * h])
-        mouth_open_dist = np.linalg.norm(upper_lip - lower_lip)
-
-        if mouth_open_dist > MOUTH_OPEN_THRESHOLD:
-            cv2.putText(frame, "Mouth Open Detected - Exiting", (30, 300),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-            speak("Exited from execution")
-            cv2.imshow("Eye Mouse", frame)
-            cv2.waitKey(1000)
-            break
+        if not guessed and self.mouth_exit.update(features.mouth_open > settings.mouth_open_threshold, now, events):
+            overlays.append(("text", "Mouth Open Detected - Exiting", (30, 300), 0.8, (0, 0, 255)))
+            return
 
         # Eye tracking
-        eye_x = int(face[RIGHT_IRIS].x * w)
-        eye_y = int(face[RIGHT_IRIS].y * h)
-
-        if key == ord('c'):
-            eye_ref_x, eye_ref_y = eye_x, eye_y
+        eye_x = features.iris_x
+        eye_y = features.iris_y
+        if self.head_mode == "off":
+            gaze, sensitivity = features.iris_position, settings.sensitivity
+        else:
+            (lx, ly), (rx, ry) = iris_offset
+            gaze, sensitivity = ((lx + rx) * 0.5, (ly + ry) * 0.5), settings.gaze_sensitivity
+
+        if self.calibration is not None:
+            # Gestures pause while the dots are shown
+            eyes_open = ear_left >= threshold_left and ear_right >= threshold_right
+            self.calibration.add(now, iris_offset, eyes_open)
+            overlays.append(("text", f"Calibrating {min(self.calibration.current + 1, len(self.calibration.targets))}"
+                                     f"/{len(self.calibration.targets)}", (10, 30), 0.7, (0, 200, 255)))
+            if self.calibration.done:
+                self.finish_calibration()
+            return
+
+        if self.calibrate_requested:
+            if self.gaze_model is not None:
+                self.gaze_model.recenter(iris_offset)
+            else:
+                self.eye_ref_x, self.eye_ref_y = gaze
+            self.calibrate_requested = False
+            self.cursor_filter.reset()
             print("Center calibrated.")
 
-        if eye_ref_x is not None:
-            dx = (eye_x - eye_ref_x) * BASE_SENSITIVITY
-            dy = (eye_y - eye_ref_y) * BASE_SENSITIVITY
-
-            if abs(dx) > DEAD_ZONE or abs(dy) > DEAD_ZONE:
-                eye_buffer_x.append(dx)
-                eye_buffer_y.append(dy)
-
-            if len(eye_buffer_x) == SMOOTHING_BUFFER:
-                weights = np.linspace(1, 2, SMOOTHING_BUFFER)
-                weights /= weights.sum()
-                avg_dx = np.dot(eye_buffer_x, weights)
-                avg_dy = np.dot(eye_buffer_y, weights)
+        if self.head_mode == "pointer":
+            pointer_x, pointer_y = pointer_position(pose)
+            x, y = self.cursor_filter.filter(now, pointer_x * (self.screen_w - 1), pointer_y * (self.screen_h - 1))
+            self.cursor_x, self.cursor_y = int(x), int(y)
+            events.append(GestureEvent(MOVE, now, (self.cursor_x, self.cursor_y)))
+        elif self.gaze_model is not None:
+            gaze_x, gaze_y = self.gaze_model.predict(iris_offset)
+            target_x = min(max(gaze_x * self.screen_w, 0), self.screen_w - 1)
+            target_y = min(max(gaze_y * self.screen_h, 0), self.screen_h - 1)
+            x, y = self.cursor_filter.filter(now, target_x, target_y)
+            self.cursor_x, self.cursor_y = int(x), int(y)
+            events.append(GestureEvent(MOVE, now, (self.cursor_x, self.cursor_y)))
+        elif self.eye_ref_x is not None:
+            dx = (gaze[0] - self.eye_ref_x) * sensitivity
+            dy = (gaze[1] - self.eye_ref_y) * sensitivity
+
+            # Gaze within the dead zone around the reference holds the cursor where it is
+            if abs(dx) > settings.dead_zone or abs(dy) > settings.dead_zone:
+                target_x = min(max(self.screen_w // 2 + dx, 0), self.screen_w)
+                target_y = min(max(self.screen_h // 2 + dy, 0), self.screen_h)
+                x, y = self.cursor_filter.filter(now, target_x, target_y)
+                self.cursor_x, self.cursor_y = int(x), int(y)
+                events.append(GestureEvent(MOVE, now, (self.cursor_x, self.cursor_y)))
+
+        if not guessed:
+            # Right eye hold - Volume Up, left eye hold - Volume Down
+            self.volume_up.update(ear_right < threshold_right, now, events)
+            self.volume_down.update(ear_left < threshold_left, now, events)
+            # Blink clicks
+            self.blink.update(ear_left < threshold_left, now, events)
+        # An eye closing or closed keeps the model running until the gesture is decided
+        if (self.blink.closed_since is not None or ear_left < threshold_left * NEAR_THRESHOLD
+                or ear_right < threshold_right * NEAR_THRESHOLD):
+            self.propagator.hold()
+        if self.volume_up.holding:
+            overlays.append(("text", "Volume UP", (30, 100), 1, (0, 255, 255)))
+        if self.volume_down.holding:
+            overlays.append(("text", "Volume DOWN", (30, 140), 1, (255, 255, 0)))
 
-                target_x = screen_w // 2 + avg_dx
-                target_y = screen_h // 2 + avg_dy
-                target_x = np.clip(target_x, 0, screen_w)
-                target_y = np.clip(target_y, 0, screen_h)
-
-                cursor_x = int((1 - ALPHA) * cursor_x + ALPHA * target_x)
-                cursor_y = int((1 - ALPHA) * cursor_y + ALPHA * target_y)
-
-                pyautogui.moveTo(cursor_x, cursor_y, duration=0)
-
-        # Right eye hold - Volume Up
-        if ear_right < BLINK_THRESHOLD:
-            scroll_up_counter += 1
-            if scroll_up_counter >= SCROLL_HOLD_FRAMES:
-                pyautogui.press("volumeup")
-                cv2.putText(frame, "Volume UP", (30, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
-        else:
-            scroll_up_counter = 0
-
-        # Left eye hold - Volume Down
-        if ear_left < BLINK_THRESHOLD:
-            scroll_down_counter += 1
-            if scroll_down_counter >= SCROLL_HOLD_FRAMES:
-                pyautogui.press("volumedown")
-                cv2.putText(frame, "Volume DOWN", (30, 140), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
+        # Visuals
+        overlays.append(("circle", (eye_x, eye_y), 5, (255, 255, 0)))
+        overlays.append(("text", "Eye Control Active", (10, 30), 0.7, (100, 255, 100)))
+        if pose is not None:
+            overlays.append(("text", f"Head yaw {pose.yaw:+.0f} pitch {pose.pitch:+.0f} deg", (10, 55), 0.5,
+                             (200, 200, 200)))
+
+    def start_calibration(self):
+        self.calibration = CalibrationSession(self.calibration_targets)
+        print(f"🎯 Gaze calibration: follow the {len(self.calibration_targets)} dots with your eyes")
+
+    def finish_calibration(self):
+        session = self.calibration
+        self.calibration = None
+        if self.calibration_trace:
+            session.save(self.calibration_trace, (self.screen_w, self.screen_h))
+        model = session.fit(self.gaze_kind)
+        if model is None:
+            print("⚠️ Gaze calibration failed: a dot got no samples (face lost or eyes closed)")
+            return
+        _, features, _, targets = session.arrays()
+        fit_px = float(np.linalg.norm((model.predict_many(features) - targets) * (self.screen_w, self.screen_h),
+                                      axis=1).mean())
+        model.info = {"points": len(session.targets), "samples": len(features), "fit_px": fit_px,
+                      "screen_size": [self.screen_w, self.screen_h], "created": time.time(),
+                      "head_reference": self.head_pose.to_dict() if self.head_pose is not None else None}
+        self.gaze_model = model
+        self.cursor_filter.reset()
+        print(f"🎯 Gaze calibrated on {len(session.targets)} points, mean fit error {fit_px:.0f} px")
+        if self.gaze_model_path:
+            save_model(model, self.gaze_model_path)
+            print(f"💾 Saved gaze calibration to {self.gaze_model_path}")
+
+    def handle_event(self, event):
+        if event.kind == EXIT:
+            self.exit_requested = True
+            if self.feedback is not None:
+                self.feedback.say("Exited from execution", interrupt=True)
+            return
+        if event.kind == DOUBLE_CLICK:
+            self.overlays.append(("text", "DOUBLE CLICK", (30, 50), 1, (0, 100, 255)))
+        elif event.kind == CLICK:
+            self.overlays.append(("text", "SINGLE CLICK", (30, 50), 1, (0, 255, 0)))
+        self.actions.put(event)
+
+    def render(self, packet):
+        if packet.frame is None:
+            # Landmark replay has no pixels; draw on a blank canvas
+            frame = np.zeros((self.frame_h, self.frame_w, 3), dtype=np.uint8)
         else:
-            scroll_down_counter = 0
-
-        # Blink clicks
-        if ear_left < BLINK_THRESHOLD:
-            blink_counter += 1
+            frame = self.preprocess.preview(packet.frame)
+        if self.draw:
+            self.draw_overlays(frame)
+        if self.governor is not None:
+            cv2.putText(frame, self.governor.status(), (10, frame.shape[0] - 15),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+        self.show_calibration()
+        return self.hud.draw(frame)
+
+    def draw_overlays(self, frame):
+        for overlay in self.overlays:
+            if overlay[0] == "text":
+                _, text, pos, scale, color = overlay
+                cv2.putText(frame, text, pos, cv2.FONT_HERSHEY_SIMPLEX, scale, color, 2)
+            else:
+                _, center, radius, color = overlay
+                cv2.circle(frame, center, radius, color, -1)
+
+    def show_calibration(self):
+        # The dots get their own full-screen window, open only while calibrating
+        if self.calibration is not None:
+            if not self._calibration_window:
+                cv2.namedWindow(CALIBRATION_WINDOW, cv2.WINDOW_NORMAL)
+                cv2.setWindowProperty(CALIBRATION_WINDOW, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+                self._calibration_window = True
+            cv2.imshow(CALIBRATION_WINDOW, self.calibration.draw(self.screen_w, self.screen_h))
+        elif self._calibration_window:
+            cv2.destroyWindow(CALIBRATION_WINDOW)
+            self._calibration_window = False
+
+    def handle_key(self, key):
+        if key == ord('c'):
+            self.calibrate_requested = True
+        elif key == ord('k'):
+            self.start_calibration()
+        elif key == ord('h'):
+            self.hud.toggle()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Eye gesture mouse control")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file, image directory or recorded landmark .npz")
+    add_actuator_args(parser)
+    parser.add_argument("--headless", action="store_true",
+                        help="do not open a preview window; calibrates on the first detected face")
+    parser.add_argument("--no-draw", action="store_true", help="show the preview without gesture overlays")
+    parser.add_argument("--record-landmarks", metavar="PATH", help="save detected landmarks to an .npz file")
+    parser.add_argument("--roi", action="store_true",
+                        help="run FaceMesh on a crop around the last detected face")
+    parser.add_argument("--inference-scale", type=float,
+                        help="downscale factor applied to the FaceMesh input (default: from the profile)")
+    add_calibration_args(parser)
+    add_head_pose_args(parser)
+    add_governor_args(parser)
+    add_propagate_args(parser)
+    add_quality_args(parser)
+    add_filter_args(parser)
+    add_trace_args(parser)
+    add_metrics_args(parser)
+    add_startup_args(parser)
+    add_config_args(parser)
+    add_extra_source_args(parser)
+    args = parser.parse_args(argv)
+    if args.extra_sources and (args.record_landmarks or args.record_trace or args.calibrate):
+        parser.error("--extra-source cannot be combined with --record-landmarks, --record-trace or --calibrate")
+    return args
+
+
+def run_extra_sources(args, config, overrides):
+    # --source plus every --extra-source as eye sessions of one SessionManager
+    # Sessions keep only the newest frame, so recorded sources are always paced
+    manager = SessionManager(args.workers or 1 + len(args.extra_sources), config, actuator_from_args(args))
+    for spec in dict.fromkeys([args.source] + args.extra_sources):
+        # Each camera has its own cached calibration
+        gaze_model_path = model_path(args.user, spec, manager.feed(spec).source.frame_size())
+        gaze_model = load_model(gaze_model_path)
+        session = manager.add_session("eye", spec, auto_calibrate=args.headless, roi_tracking=args.roi,
+                                      governor=governor_from_args(args, config.performance),
+                                      draw=not args.no_draw, gaze_model=gaze_model,
+                                      gaze_model_path=gaze_model_path, head_pose=args.head_pose)
+        session.controller.gaze_kind = args.gaze_model
+        session.controller.calibration_targets = calibration_targets(args.calibration_points)
+    return run_sessions(manager, args, args.source, overrides)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiler = StartupProfiler("eye_control", args.profile_startup, args.startup_log)
+    # Command-line flags win over the profile files
+    flags = {"performance": {"inference_scale": args.inference_scale}} if args.inference_scale else {}
+    overrides = merge_layers(governor_overrides(args), propagate_overrides(args), quality_overrides(args),
+                             flags, {"eye": {"filter": args.filter}} if args.filter else {})
+    config = config_from_args(args, args.source, overrides)
+    if args.extra_sources:
+        run_extra_sources(args, config, overrides)
+        return
+    # Build the MediaPipe graph while the camera opens
+    face_mesh = Background(create_face_mesh, config.eye, profiler=profiler, label="create FaceMesh")
+    with profiler.step("open source"):
+        source = open_source(args.source, realtime=not args.headless)
+    with profiler.step("create actuator"):
+        actuator = actuator_from_args(args)
+    # Speech runs on its own worker so the exit phrase never stalls the loop
+    feedback = None if args.headless else FeedbackService(sound=False).start()
+    recorder = None
+    if args.record_trace:
+        recorder = TraceWriter(args.record_trace, "face", source.frame_size(), 1, NUM_FACE_LANDMARKS,
+                               args.trace_dtype)
+        actuator = TracingActuator(actuator, recorder)
+    elif args.record_landmarks:
+        recorder = LandmarkRecorder(args.record_landmarks, "face", source.frame_size(), 1, NUM_FACE_LANDMARKS)
+    # A cached calibration for this user and camera loads instantly; --calibrate fits a new one
+    gaze_model_path = model_path(args.user, args.source, source.frame_size())
+    gaze_model = None if args.calibrate else load_model(gaze_model_path)
+    if gaze_model is not None:
+        print(f"🎯 Loaded gaze calibration {gaze_model_path}")
+    controller = EyeController(actuator, source.frame_size(), recorder=recorder, auto_calibrate=args.headless,
+                               roi_tracking=args.roi, governor=governor_from_args(args, config.performance),
+                               face_mesh=face_mesh.result(), feedback=feedback, draw=not args.no_draw,
+                               gaze_model=gaze_model, gaze_model_path=gaze_model_path, head_pose=args.head_pose,
+                               config=config)
+    controller.hud.enabled = args.hud
+    controller.gaze_kind = args.gaze_model
+    controller.calibration_targets = calibration_targets(args.calibration_points)
+    controller.calibration_trace = args.record_calibration
+    if args.calibrate:
+        controller.start_calibration()
+    exporter = exporter_from_args(args, controller.timer, "eye")
+    watcher = watch_config(args, args.source, controller.reconfigure, overrides)
+
+    try:
+        run_sequential(controller, source, headless=args.headless, on_actuated=profiler.mark_first_frame)
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        if exporter is not None:
+            exporter.stop()
+        actuator.close()
+        if hasattr(actuator, "summary"):
+            print(format_actuator_stats(actuator.summary()))
+        if recorder is not None:
+            recorder.save()
+
+    if feedback is not None:
+        if controller.exit_requested:
+            # Show the last frame (exit notice included) while the goodbye plays
+            cv2.waitKey(1000)
         else:
-            if blink_counter >= CONSEC_FRAMES:
-                current_time = time.time()
-                blink_timestamps.append(current_time)
-                blink_timestamps = [t for t in blink_timestamps if current_time - t <= DOUBLE_CLICK_TIME]
-
-                if len(blink_timestamps) == 2:
-                    pyautogui.doubleClick()
-                    cv2.putText(frame, "DOUBLE CLICK", (30, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 100, 255), 2)
-                    blink_timestamps = []
-                elif len(blink_timestamps) == 1:
-                    pyautogui.click()
-                    cv2.putText(frame, "SINGLE CLICK", (30, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-
-            blink_counter = 0
-
-        # Visuals
-        cv2.circle(frame, (eye_x, eye_y), 5, (255, 255, 0), -1)
-        cv2.putText(frame, "Eye Control Active", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (100, 255, 100), 2)
+            feedback.say("Exited from execution")
+        feedback.close()
 
-    cv2.imshow("Eye Mouse", frame)
+    source.release()
+    if not args.headless:
+        cv2.destroyAllWindows()
 
-    if key == 27:  # ESC key
-        speak("Exited from execution")
-        break
 
-cap.release()
-cv2.destroyAllWindows()
+if __name__ == "__main__":
+    main()
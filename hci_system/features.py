@@ -0,0 +1,266 @@
+import math
+
+import numpy as np
+
+# Per-frame landmark features computed with one batched NumPy operation.
+# Landmarks are gathered once into a preallocated (N, 3) float32 array using a
+# fixed index table. Every derived quantity that is linear in the landmark
+# coordinates (pixel offsets between point pairs, joint height differences,
+# fingertip pixels) is a row of a constant feature matrix, so a single matrix
+# product per frame yields all of them; the few non-linear features (distances,
+# ratios) are then finished on plain floats.
+#
+# Gesture features are scale-free, so the same thresholds hold at any capture
+# resolution and distance from the camera: hand distances are in palm sizes,
+# the mouth opening in face widths, eye openings and iris offsets in eye widths.
+# Pixel positions are kept only for drawing and for mapping onto the screen.
+
+# FaceMesh indices (refine_landmarks=True)
+RIGHT_EYE_TOP = 159
+RIGHT_EYE_BOTTOM = 145
+RIGHT_EYE_LEFT = 33
+RIGHT_EYE_RIGHT = 133
+
+LEFT_EYE_TOP = 386
+LEFT_EYE_BOTTOM = 374
+LEFT_EYE_LEFT = 263
+LEFT_EYE_RIGHT = 362
+
+RIGHT_IRIS_CENTER = 468
+LEFT_IRIS_CENTER = 473
+RIGHT_IRIS = 474  # Point the eye cursor follows
+
+UPPER_LIP = 13
+LOWER_LIP = 14
+
+FACE_POINTS = [
+    LEFT_EYE_TOP, LEFT_EYE_BOTTOM, LEFT_EYE_LEFT, LEFT_EYE_RIGHT,
+    RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM, RIGHT_EYE_LEFT, RIGHT_EYE_RIGHT,
+    UPPER_LIP, LOWER_LIP,
+    LEFT_IRIS_CENTER, RIGHT_IRIS_CENTER, RIGHT_IRIS,
+]
+
+# Hands indices
+WRIST = 0
+THUMB_MCP = 2
+THUMB_TIP = 4
+INDEX_MCP = 5
+INDEX_TIP = 8
+MIDDLE_MCP = 9
+MIDDLE_TIP = 12
+PINKY_MCP = 17
+TIP_IDS = [4, 8, 12, 16, 20]
+PIP_IDS = [3, 6, 10, 14, 18]
+NUM_HAND_LANDMARKS = 21
+
+X, Y = 0, 1
+
+
+def landmark_view(points):
+    # Flat float32 memoryview of a C-contiguous points buffer; writes through it land in points.
+    # Casting raises for a non-contiguous buffer, where a reshaped copy would silently drop the writes.
+    return memoryview(points).cast("B").cast("f")
+
+
+def landmarks_to_array(landmarks, out, indices=None):
+    # Writes x, y, z of the selected landmarks into out (shape (len(indices), 3)) in place,
+    # one element at a time, so no per-frame lists or temporary arrays are built.
+    # out: a landmark_view of the buffer (callers keep one) or the float32 buffer itself
+    values = out if isinstance(out, memoryview) else landmark_view(out)
+    i = 0
+    if indices is None:
+        for lm in landmarks:
+            values[i] = lm.x
+            values[i + 1] = lm.y
+            values[i + 2] = lm.z
+            i += 3
+    else:
+        for index in indices:
+            lm = landmarks[index]
+            values[i] = lm.x
+            values[i + 1] = lm.y
+            values[i + 2] = lm.z
+            i += 3
+    return out
+
+
+def feature_matrix(num_points, rows):
+    # rows: one list of (point_row, axis, coeff) terms per output feature.
+    # Multiplying the result with the flattened (num_points, 3) array evaluates all rows.
+    matrix = np.zeros((len(rows), num_points * 3), dtype=np.float32)
+    for r, terms in enumerate(rows):
+        for point, axis, coeff in terms:
+            matrix[r, point * 3 + axis] += coeff
+    return matrix
+
+
+def pair_rows(a, b, w, h):
+    # Pixel offset (dx, dy) from point b to point a
+    return [[(a, X, w), (b, X, -w)], [(a, Y, h), (b, Y, -h)]]
+
+
+def point_rows(a, w, h):
+    # Pixel position (x, y) of point a
+    return [[(a, X, w)], [(a, Y, h)]]
+
+
+class FaceFeatures:
+    # Eye aspect ratios, mouth opening, iris position and iris offsets for one face
+    def __init__(self):
+        self.indices = FACE_POINTS
+        self.points = np.zeros((len(FACE_POINTS), 3), dtype=np.float32)
+        self._flat = self.points.reshape(-1)
+        self._view = landmark_view(self.points)
+        self._size = None
+        self._matrix = None
+        self._values = None
+
+        self.ear_left = 0.0
+        self.ear_right = 0.0
+        # Outer eye corner to outer eye corner, in pixels: the face's size in the frame
+        self.face_width = 0.0
+        # Lip gap in face widths
+        self.mouth_open = 0.0
+        # Iris position in frame heights (both axes), resolution-independent
+        self.iris_position = (0.0, 0.0)
+        # Iris centre relative to the eye-corner midpoint, in eye widths: ((lx, ly), (rx, ry))
+        self.iris_offset = ((0.0, 0.0), (0.0, 0.0))
+        self.iris_x = 0
+        self.iris_y = 0
+
+    def _build(self, w, h):
+        row = {idx: r for r, idx in enumerate(FACE_POINTS)}
+        rows = []
+        rows += pair_rows(row[LEFT_EYE_TOP], row[LEFT_EYE_BOTTOM], w, h)      # 0, 1
+        rows += pair_rows(row[LEFT_EYE_LEFT], row[LEFT_EYE_RIGHT], w, h)      # 2, 3
+        rows += pair_rows(row[RIGHT_EYE_TOP], row[RIGHT_EYE_BOTTOM], w, h)    # 4, 5
+        rows += pair_rows(row[RIGHT_EYE_LEFT], row[RIGHT_EYE_RIGHT], w, h)    # 6, 7
+        rows += pair_rows(row[UPPER_LIP], row[LOWER_LIP], w, h)               # 8, 9
+        for iris, corner_a, corner_b in ((LEFT_IRIS_CENTER, LEFT_EYE_LEFT, LEFT_EYE_RIGHT),     # 10, 11
+                                         (RIGHT_IRIS_CENTER, RIGHT_EYE_LEFT, RIGHT_EYE_RIGHT)):  # 12, 13
+            for axis, scale in ((X, w), (Y, h)):
+                rows.append([(row[iris], axis, scale),
+                             (row[corner_a], axis, -0.5 * scale),
+                             (row[corner_b], axis, -0.5 * scale)])
+        rows += point_rows(row[RIGHT_IRIS], w, h)                            # 14, 15
+        rows += pair_rows(row[LEFT_EYE_LEFT], row[RIGHT_EYE_LEFT], w, h)     # 16, 17
+        self._matrix = feature_matrix(len(FACE_POINTS), rows)
+        self._values = np.zeros(len(rows), dtype=np.float32)
+        self._size = (w, h)
+
+    def update(self, landmarks, w, h, region=None):
+        # region: roi.Region the landmarks are relative to, if inference ran on a crop
+        if self._size != (w, h):
+            self._build(w, h)
+        landmarks_to_array(landmarks, self._view, self.indices)
+        if region is not None:
+            region.to_frame(self.points)
+        v = np.dot(self._matrix, self._flat, out=self._values).tolist()
+
+        left_width = math.hypot(v[2], v[3]) or 1e-6
+        right_width = math.hypot(v[6], v[7]) or 1e-6
+        self.ear_left = math.hypot(v[0], v[1]) / left_width
+        self.ear_right = math.hypot(v[4], v[5]) / right_width
+        self.face_width = math.hypot(v[16], v[17]) or 1e-6
+        self.mouth_open = math.hypot(v[8], v[9]) / self.face_width
+        self.iris_offset = ((v[10] / left_width, v[11] / left_width),
+                            (v[12] / right_width, v[13] / right_width))
+        self.iris_x = int(v[14])
+        self.iris_y = int(v[15])
+        self.iris_position = (v[14] / h, v[15] / h)
+        return self
+
+
+class HandFeatures:
+    # Finger states, pinch distance and key fingertip positions for one hand
+    def __init__(self):
+        self.points = np.zeros((NUM_HAND_LANDMARKS, 3), dtype=np.float32)
+        self._flat = self.points.reshape(-1)
+        self._view = landmark_view(self.points)
+        self._size = None
+        self._matrix = None
+        self._values = None
+
+        self.fingers_up = [False] * 5
+        self.fingers_folded = [False] * 5
+        # Palm size in pixels; the distances below are in palm sizes
+        self.size = 0.0
+        self.thumb_extension = 0.0
+        self.pinch = 0.0
+        self.index_px = (0, 0)
+        self.middle_px = (0, 0)
+        # Fingertip positions as fractions of the frame
+        self.index = (0.0, 0.0)
+        self.middle = (0.0, 0.0)
+        self._frame_size = (1, 1)
+
+    def _build(self, w, h):
+        rows = []
+        # Tip minus PIP height per finger; negative means the finger is up   0-4
+        rows += [[(tip, Y, 1.0), (pip, Y, -1.0)] for tip, pip in zip(TIP_IDS, PIP_IDS)]
+        # Thumb tip minus thumb MCP height in pixels; negative when the thumb points up   5
+        rows.append([(THUMB_TIP, Y, h), (THUMB_MCP, Y, -h)])
+        rows += pair_rows(THUMB_TIP, INDEX_TIP, w, h)                        # 6, 7
+        rows += point_rows(INDEX_TIP, w, h)                                  # 8, 9
+        rows += point_rows(MIDDLE_TIP, w, h)                                 # 10, 11
+        rows += pair_rows(MIDDLE_MCP, WRIST, w, h)                           # 12, 13 palm length
+        rows += pair_rows(PINKY_MCP, INDEX_MCP, w, h)                        # 14, 15 palm width
+        self._matrix = feature_matrix(NUM_HAND_LANDMARKS, rows)
+        self._values = np.zeros(len(rows), dtype=np.float32)
+        self._size = (w, h)
+        self._frame_size = (w, h)
+
+    def update(self, landmarks, w, h):
+        if self._size != (w, h):
+            self._build(w, h)
+        landmarks_to_array(landmarks, self._view)
+        return self.fill(np.dot(self._matrix, self._flat, out=self._values).tolist())
+
+    def fill(self, v):
+        # v: one row of feature values, as produced by the hand feature matrix
+        self.fingers_up = [d < 0 for d in v[0:5]]
+        self.fingers_folded = [d > 0 for d in v[0:5]]
+        # The longer of palm length and width, so turning the hand sideways barely changes it
+        self.size = max(math.hypot(v[12], v[13]), math.hypot(v[14], v[15])) or 1e-6
+        self.thumb_extension = v[5] / self.size
+        self.pinch = math.hypot(v[6], v[7]) / self.size
+        self.index_px = (int(v[8]), int(v[9]))
+        self.middle_px = (int(v[10]), int(v[11]))
+        w, h = self._frame_size
+        self.index = (v[8] / w, v[9] / h)
+        self.middle = (v[10] / w, v[11] / h)
+        return self
+
+    def all_fingers_up(self):
+        return all(self.fingers_up)
+
+    def other_fingers_folded(self):
+        # Index, middle, ring and pinky folded (thumb ignored)
+        return all(self.fingers_folded[1:])
+
+
+class HandFeatureBatch:
+    # Features for every detected hand from a single matrix product
+    def __init__(self, max_hands=2):
+        self.hands = [HandFeatures() for _ in range(max_hands)]
+        self.points = np.zeros((max_hands, NUM_HAND_LANDMARKS, 3), dtype=np.float32)
+        self._flat = self.points.reshape(max_hands, -1)
+        # One view per hand slot of the (max_hands, 21, 3) buffer, filled in place every frame
+        self._views = [landmark_view(points) for points in self.points]
+        self._matrix_t = None
+        self._values = np.zeros((max_hands, 0), dtype=np.float32)
+
+    def update(self, hand_landmarks, w, h):
+        # hand_landmarks: one landmark list per hand; returns a HandFeatures per hand, in order
+        template = self.hands[0]
+        if template._size != (w, h):
+            template._build(w, h)
+            for hand in self.hands:
+                hand._frame_size = (w, h)
+            self._matrix_t = np.ascontiguousarray(template._matrix.T)
+            self._values = np.zeros((len(self.hands), template._matrix.shape[0]), dtype=np.float32)
+        count = min(len(hand_landmarks), len(self.hands))
+        for i in range(count):
+            landmarks_to_array(hand_landmarks[i], self._views[i])
+        values = np.dot(self._flat[:count], self._matrix_t, out=self._values[:count]).tolist()
+        return [self.hands[i].fill(values[i]) for i in range(count)]
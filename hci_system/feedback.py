@@ -0,0 +1,208 @@
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+
+# One speech worker owns the pyttsx3 engine and the mixer, so callers on the
+# vision or GUI threads only ever append to a queue and return immediately.
+
+CLICK_SOUND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "click.wav")
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "hci_system", "speech")
+
+# Fixed phrases pre-rendered to WAV clips while the worker is idle
+PHRASES = [
+    "Hand gesture control activated",
+    "Eye gesture control activated",
+    "Hand and eye control activated",
+    "Exiting hand gesture control",
+    "Exiting eye gesture control",
+    "Exiting hand and eye control",
+    "Exited from execution",
+    "Exiting interface. Goodbye.",
+]
+
+SPEECH_RATE = 160
+SPEECH_VOLUME = 0.9
+
+
+class Message:
+    __slots__ = ("text", "key", "created")
+
+    def __init__(self, text, key, created):
+        self.text = text
+        self.key = key
+        self.created = created
+
+
+class FeedbackService:
+    # say() queues speech, cue() plays a short sound; neither blocks.
+    #   key:     a newer message with the same key replaces a pending one ("mode" announcements)
+    #   max_age: messages that waited longer than this are dropped instead of spoken late
+    def __init__(self, voice=True, sound=True, rate=SPEECH_RATE, volume=SPEECH_VOLUME,
+                 max_age=2.0, max_pending=4, cache_dir=CACHE_DIR, phrases=PHRASES):
+        self.voice = voice
+        self.sound = sound
+        self.rate = rate
+        self.volume = volume
+        self.max_age = max_age
+        self.max_pending = max_pending
+        self.cache_dir = cache_dir
+        self.to_render = list(phrases) if cache_dir else []
+
+        self.pending = deque()
+        self.condition = threading.Condition()
+        self.ready = threading.Event()
+        self.closing = False
+        self.dropped = 0
+        self.speaking = False
+
+        self.engine = None
+        self.mixer = None
+        self.channel = None
+        self.cues = {}
+        self.clips = {}
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="feedback", daemon=True)
+            self.thread.start()
+        return self
+
+    def say(self, text, key=None, interrupt=False):
+        # interrupt drops everything pending and cuts off a clip that is playing
+        if not self.voice:
+            return
+        with self.condition:
+            if interrupt:
+                self.dropped += len(self.pending)
+                self.pending.clear()
+                if self.channel is not None:
+                    self.channel.stop()
+            key = key or text
+            for message in self.pending:
+                if message.key == key:
+                    self.pending.remove(message)
+                    self.dropped += 1
+                    break
+            if len(self.pending) >= self.max_pending:
+                self.pending.popleft()
+                self.dropped += 1
+            self.pending.append(Message(text, key, time.perf_counter()))
+            self.condition.notify()
+
+    def cue(self, name="click", path=CLICK_SOUND):
+        # Plays on its own mixer channel; silently skipped until the mixer is up
+        if not self.sound or not self.ready.is_set() or self.mixer is None:
+            return
+        sound = self.cues.get(name)
+        if sound is None:
+            try:
+                sound = self.cues[name] = self.mixer.Sound(path)
+            except Exception as e:
+                print(f"⚠️ Cannot load sound {path}: {e}")
+                self.cues[name] = False
+                return
+        if sound:
+            sound.play()
+
+    def busy(self):
+        with self.condition:
+            return self.speaking or bool(self.pending)
+
+    def close(self, timeout=3.0):
+        # Lets queued speech finish for up to timeout seconds
+        deadline = time.perf_counter() + timeout
+        while self.thread is not None and self.busy() and time.perf_counter() < deadline:
+            time.sleep(0.02)
+        with self.condition:
+            self.closing = True
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join(max(0.0, deadline - time.perf_counter()))
+
+    def _init(self):
+        if self.sound or self.cache_dir:
+            try:
+                import pygame
+                pygame.mixer.init()
+                self.mixer = pygame.mixer
+                self.channel = pygame.mixer.Channel(0)
+                # Channel 0 is kept for speech clips so cues never cut them off
+                pygame.mixer.set_reserved(1)
+            except Exception as e:
+                print(f"⚠️ Audio cues disabled: {e}")
+        if self.voice:
+            try:
+                import pyttsx3
+                self.engine = pyttsx3.init()
+                self.engine.setProperty('rate', self.rate)
+                self.engine.setProperty('volume', self.volume)
+            except Exception as e:
+                print(f"⚠️ Voice feedback disabled: {e}")
+                self.voice = False
+        if self.mixer is not None and self.cache_dir:
+            self.to_render = [text for text in self.to_render if not self._load_clip(text)]
+        else:
+            self.to_render = []
+        self.ready.set()
+
+    def _run(self):
+        self._init()
+        while True:
+            with self.condition:
+                while not self.pending and not self.closing and not (self.to_render and self.engine):
+                    self.condition.wait()
+                if self.closing:
+                    return
+                message = self.pending.popleft() if self.pending else None
+                self.speaking = message is not None
+            try:
+                if message is None:
+                    # Idle: render one missing phrase clip
+                    self._render_clip(self.to_render.pop(0))
+                elif time.perf_counter() - message.created > self.max_age:
+                    self.dropped += 1
+                else:
+                    self._speak(message.text)
+            finally:
+                with self.condition:
+                    self.speaking = False
+
+    def _speak(self, text):
+        clip = self.clips.get(text)
+        if clip is not None:
+            self.channel.play(clip)
+            # Wait out the clip, but wake early for close()
+            with self.condition:
+                self.condition.wait_for(lambda: self.closing or not self.channel.get_busy(),
+                                        timeout=clip.get_length())
+        elif self.engine is not None:
+            self.engine.say(text)
+            self.engine.runAndWait()
+
+    def _clip_path(self, text):
+        digest = hashlib.sha1(f"{text}|{self.rate}|{self.volume}".encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.wav")
+
+    def _load_clip(self, text):
+        path = self._clip_path(text)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return False
+        try:
+            self.clips[text] = self.mixer.Sound(path)
+            return True
+        except Exception:
+            return False
+
+    def _render_clip(self, text):
+        if self.engine is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.engine.save_to_file(text, self._clip_path(text))
+            self.engine.runAndWait()
+            self._load_clip(text)
+        except Exception as e:
+            print(f"⚠️ Cannot cache phrase '{text}': {e}")
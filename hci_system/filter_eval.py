@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from actuators import NullActuator
+from filters import MODE_FILTERS, PassThrough, mode_filter
+from pipeline import run_sequential
+from sources import open_source
+from tracefile import TraceReader
+
+# Offline lag/jitter evaluation of cursor filters. The controller runs once over a
+# recorded trace with a pass-through filter to capture the raw cursor targets;
+# every candidate filter is then replayed over those samples.
+#   lag:    delay (ms) that best aligns the filtered path with a zero-phase smoothed reference
+#   jitter: RMS (px) of what is left after zero-phase smoothing the filtered path
+#   error:  RMS (px) distance to the reference at zero delay
+
+DEFAULT_SPECS = ["none", "ema:alpha=0.3", "kalman"]
+REFERENCE_SIGMA = 2.0  # samples
+MAX_LAG = 0.3  # seconds
+MIN_SEGMENT = 10
+
+
+class TraceFilter(PassThrough):
+    # Passes samples through unchanged and keeps them, split where tracking was lost
+    def __init__(self):
+        self.segments = [[]]
+
+    def filter(self, t, x, y):
+        self.segments[-1].append((t, x, y))
+        return x, y
+
+    def reset(self):
+        if self.segments[-1]:
+            self.segments.append([])
+
+
+def capture_trace(mode, path, max_frames=None):
+    # Lazy: only the mode being evaluated is imported
+    if mode == "hand":
+        from hand_control import HandController as controller_class
+        kwargs = {}
+    else:
+        from eye_control import EyeController as controller_class
+        kwargs = {"auto_calibrate": True}
+    trace = TraceFilter()
+    source = open_source(path)
+    try:
+        controller = controller_class(NullActuator(), source.frame_size(), cursor_filter=trace, **kwargs)
+        controller.latency_monitor.report_every = 0
+        run_sequential(controller, source, headless=True, max_frames=max_frames)
+    finally:
+        source.release()
+    return [np.array(segment, dtype=np.float64) for segment in trace.segments if len(segment) >= MIN_SEGMENT]
+
+
+def zero_phase_smooth(points, sigma=REFERENCE_SIGMA):
+    # Centered Gaussian smoothing per column, edges padded with the end values
+    radius = int(3 * sigma)
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    kernel /= kernel.sum()
+    padded = np.pad(points, ((radius, radius), (0, 0)), mode="edge")
+    return np.stack([np.convolve(padded[:, i], kernel, mode="valid") for i in range(points.shape[1])], axis=1)
+
+
+def apply_filter(cursor_filter, segment):
+    cursor_filter.reset()
+    out = np.empty((len(segment), 2))
+    for i, (t, x, y) in enumerate(segment):
+        out[i] = cursor_filter.filter(t, x, y)
+    return out
+
+
+def segment_metrics(filtered, segment):
+    reference = zero_phase_smooth(segment[:, 1:])
+    dt = float(np.median(np.diff(segment[:, 0]))) if len(segment) > 1 else 0.0
+    max_shift = int(MAX_LAG / dt) if dt > 0 else 0
+    max_shift = min(max_shift, len(segment) - MIN_SEGMENT)
+
+    errors = [np.linalg.norm(filtered[s:] - reference[:len(reference) - s], axis=1).mean()
+              for s in range(max_shift + 1)]
+    residual = filtered - zero_phase_smooth(filtered)
+    return {
+        "lag_ms": int(np.argmin(errors)) * dt * 1000,
+        "jitter_px": float(np.sqrt((residual ** 2).sum(axis=1).mean())),
+        "error_px": float(np.sqrt(((filtered - reference) ** 2).sum(axis=1).mean())),
+    }
+
+
+def evaluate(mode, segments, specs):
+    samples = sum(len(segment) for segment in segments)
+    results = []
+    for spec in specs:
+        totals = {"lag_ms": 0.0, "jitter_px": 0.0, "error_px": 0.0}
+        for segment in segments:
+            metrics = segment_metrics(apply_filter(mode_filter(mode, spec), segment), segment)
+            for key, value in metrics.items():
+                totals[key] += value * len(segment) / samples
+        results.append(dict(filter=spec, **totals))
+    return results
+
+
+def format_results(mode, path, samples, results):
+    lines = [f"[{mode}] {os.path.basename(path)}: {samples} cursor samples"]
+    for result in results:
+        lines.append(f"    {result['filter']:<40} lag {result['lag_ms']:6.1f} ms  "
+                     f"jitter {result['jitter_px']:6.2f} px  error {result['error_px']:6.2f} px")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded traces and compare cursor filters")
+    parser.add_argument("traces", nargs="+", help="recorded landmark .npz / .trace files (or any frame source)")
+    parser.add_argument("--mode", choices=list(MODE_FILTERS),
+                        help="controller to replay with (default: the kind stored in the trace)")
+    parser.add_argument("--filter", action="append", metavar="SPEC", dest="filters",
+                        help="filter spec to evaluate, repeatable (default: none, ema, kalman and the mode default)")
+    parser.add_argument("--max-frames", type=int, help="stop each trace after this many frames")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def trace_mode(path):
+    kind = None
+    if path.endswith(".npz"):
+        kind = str(np.load(path)["kind"])
+    elif path.endswith(".trace"):
+        kind = TraceReader(path).kind
+    return {"hand": "hand", "face": "eye"}.get(kind)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    reports = []
+    for path in args.traces:
+        mode = args.mode or trace_mode(path)
+        if mode is None:
+            print(f"⚠️ Cannot tell the mode of {path}; pass --mode")
+            continue
+        specs = args.filters or DEFAULT_SPECS + [MODE_FILTERS[mode][0]]
+        segments = capture_trace(mode, path, args.max_frames)
+        samples = sum(len(segment) for segment in segments)
+        if not samples:
+            print(f"⚠️ No cursor movement in {path}")
+            continue
+        results = evaluate(mode, segments, specs)
+        print(format_results(mode, path, samples, results))
+        reports.append({"mode": mode, "trace": path, "samples": samples, "results": results})
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import math
+
+# Cursor filters shared by the hand and eye controllers. Each one smooths a 2D
+# screen position sample by sample in O(1): filter(t, x, y) -> (x, y), with t in
+# seconds (media time). reset() forgets the history, e.g. when tracking is lost.
+
+DEFAULT_DT = 1 / 30
+
+
+class PassThrough:
+    def filter(self, t, x, y):
+        return x, y
+
+    def reset(self):
+        pass
+
+
+class EmaFilter:
+    # Plain exponential moving average; alpha is the weight of the new sample
+    def __init__(self, alpha=0.5):
+        self.alpha = alpha
+        self.x = None
+        self.y = None
+
+    def filter(self, t, x, y):
+        if self.x is None:
+            self.x, self.y = x, y
+        else:
+            a = self.alpha
+            self.x += a * (x - self.x)
+            self.y += a * (y - self.y)
+        return self.x, self.y
+
+    def reset(self):
+        self.x = self.y = None
+
+
+def _smoothing_factor(dt, cutoff):
+    r = 2 * math.pi * cutoff * dt
+    return r / (r + 1)
+
+
+class OneEuroFilter:
+    # Casiez et al.: a low-pass whose cutoff rises with speed, so the cursor is
+    # steady when the hand or eye holds still and lags little when it moves.
+    #   min_cutoff: cutoff (Hz) at rest; lower means less jitter
+    #   beta:       cutoff increase per px/s of speed; higher means less lag
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def filter(self, t, x, y):
+        if self.t is None:
+            self.t, self.x, self.y = t, x, y
+            return x, y
+        dt = t - self.t
+        if dt <= 0:
+            dt = DEFAULT_DT
+        self.t = t
+
+        # Filtered speed drives the cutoff
+        a_d = _smoothing_factor(dt, self.d_cutoff)
+        self.dx += a_d * ((x - self.x) / dt - self.dx)
+        self.dy += a_d * ((y - self.y) / dt - self.dy)
+        speed = math.hypot(self.dx, self.dy)
+
+        a = _smoothing_factor(dt, self.min_cutoff + self.beta * speed)
+        self.x += a * (x - self.x)
+        self.y += a * (y - self.y)
+        return self.x, self.y
+
+    def reset(self):
+        self.t = self.x = self.y = None
+        self.dx = self.dy = 0.0
+
+
+class _KalmanAxis:
+    # Position/velocity state with its 2x2 covariance as plain floats
+    __slots__ = ("p", "v", "pp", "pv", "vv")
+
+    def __init__(self, p):
+        self.p = p
+        self.v = 0.0
+        self.pp = self.vv = 1e4
+        self.pv = 0.0
+
+    def step(self, z, dt, q, r):
+        # Predict with a constant-velocity model and white-noise acceleration q
+        self.p += self.v * dt
+        dt2 = dt * dt
+        pp = self.pp + 2 * dt * self.pv + dt2 * self.vv + q * dt2 * dt2 / 4
+        pv = self.pv + dt * self.vv + q * dt2 * dt / 2
+        vv = self.vv + q * dt2
+        # Update with the measured position, noise variance r
+        s = pp + r
+        kp = pp / s
+        kv = pv / s
+        innovation = z - self.p
+        self.p += kp * innovation
+        self.v += kv * innovation
+        self.pp = (1 - kp) * pp
+        self.pv = (1 - kp) * pv
+        self.vv = vv - kv * pv
+        return self.p
+
+
+class KalmanFilter:
+    # Constant-velocity Kalman filter, independent per axis.
+    #   process_noise:     acceleration variance (px/s^2)^2; higher follows faster
+    #   measurement_noise: landmark noise variance in px^2; higher smooths more
+    def __init__(self, process_noise=5e5, measurement_noise=40.0):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.reset()
+
+    def filter(self, t, x, y):
+        if self.t is None:
+            self.t = t
+            self.ax, self.ay = _KalmanAxis(x), _KalmanAxis(y)
+            return x, y
+        dt = t - self.t
+        if dt <= 0:
+            dt = DEFAULT_DT
+        self.t = t
+        q, r = self.process_noise, self.measurement_noise
+        return self.ax.step(x, dt, q, r), self.ay.step(y, dt, q, r)
+
+    def reset(self):
+        self.t = None
+        self.ax = self.ay = None
+
+
+FILTERS = {
+    "none": PassThrough,
+    "ema": EmaFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+# Per-mode defaults, in screen pixels. The iris signal is amplified by the eye
+# sensitivity, so the eye cursor needs a lower resting cutoff than the hand.
+MODE_FILTERS = {
+    "hand": ("one_euro", {"min_cutoff": 1.5, "beta": 0.01}),
+    "eye": ("one_euro", {"min_cutoff": 0.4, "beta": 0.003}),
+}
+
+
+def create_filter(name, **params):
+    if name not in FILTERS:
+        raise ValueError(f"Unknown filter '{name}', expected one of {', '.join(FILTERS)}")
+    return FILTERS[name](**params)
+
+
+def parse_filter_spec(spec):
+    # "one_euro" or "one_euro:min_cutoff=1.0,beta=0.02"
+    name, _, options = spec.partition(":")
+    params = {}
+    for option in filter(None, options.split(",")):
+        key, _, value = option.partition("=")
+        params[key.strip()] = float(value)
+    return name.strip(), params
+
+
+def mode_filter(mode, spec=None):
+    # spec overrides the mode default; parameters not given keep the mode's values
+    name, params = MODE_FILTERS[mode]
+    if spec:
+        spec_name, spec_params = parse_filter_spec(spec)
+        params = dict(params, **spec_params) if spec_name == name else spec_params
+        name = spec_name
+    return create_filter(name, **params)
+
+
+def add_filter_args(parser):
+    parser.add_argument("--filter", metavar="SPEC",
+                        help="cursor filter, e.g. one_euro:min_cutoff=1.0,beta=0.01, kalman, ema:alpha=0.3 or none")
@@ -0,0 +1,322 @@
+from startup import StartupProfiler, Background, add_startup_args  # First: marks process start
+
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from actuators import add_actuator_args, actuator_from_args, format_actuator_stats, TimedActuator
+from calibration import add_calibration_args, load_model, model_path
+from config import add_config_args, config_from_args, merge_layers, watch_config, Config
+from eye_control import create_face_mesh, EyeController
+from feedback import FeedbackService
+from gestures import ActionQueue, GestureEvent, MOVE
+from hand_control import create_hand_detector, HandController, MAX_HANDS
+from head_pose import add_head_pose_args
+from metrics import add_metrics_args, exporter_from_args, Hud, Metrics
+from pipeline import FramePacket, LatencyMonitor, run_sequential, run_threaded
+from propagate import add_propagate_args, propagate_overrides
+from quality import add_quality_args, quality_overrides
+from sources import open_source
+
+# Hand and eye control on one capture. Every frame goes to Hands and FaceMesh at
+# once: FaceMesh on a helper thread, Hands on the inference thread (both release the
+# GIL while they run), so inference takes as long as the slower model, not the sum.
+# Both results belong to the same frame by construction.
+#
+# Pointer: the gaze places the cursor coarsely, the hand refines it. While both are
+# tracked the cursor is the gaze anchor plus the hand's movement since then, scaled
+# by fine_gain; looking warp_distance away from the cursor re-anchors it there.
+# Either one takes over alone when the other loses tracking. Clicks, drags, scrolling
+# and volume come from the hand; blink clicks only count while no hand is in view.
+# A side whose controller skips a frame (quality gate) keeps its last pointer target
+# and runs no gestures for that frame; the frame is dropped only when both skip.
+
+HAND = "hand"
+EYE = "eye"
+FUSED = "hand + eye"
+
+
+class EventTap:
+    # Stands in for a sub-controller's ActionQueue and keeps its events for the fusion step
+    def __init__(self):
+        self.pending = []
+        self.sent = 0
+        self.volume_step_db = None
+
+    def put(self, event):
+        self.pending.append(event)
+
+    def flush(self, now):
+        pass
+
+    def take(self):
+        events, self.pending = self.pending, []
+        return events
+
+
+def last_move(events):
+    for event in reversed(events):
+        if event.kind == MOVE:
+            return event.value
+    return None
+
+
+class FusionController:
+    window_name = "Hand + Eye Control"
+
+    def __init__(self, actuator, frame_size, timer=None, hand_detector=None, face_mesh=None, feedback=None,
+                 auto_calibrate=False, gaze_model=None, gaze_model_path=None, head_pose="compensate", draw=True,
+                 config=None):
+        self.config = config if config is not None else Config()
+        self.actuator = TimedActuator(actuator)
+        self.feedback = feedback
+        self.timer = timer if timer is not None else Metrics()
+        self.hud = Hud(self.timer)
+        self.latency_monitor = LatencyMonitor()
+        self.draw = draw
+        self.hand = HandController(actuator, frame_size, hand_detector=hand_detector, draw=draw, config=self.config)
+        self.eye = EyeController(actuator, frame_size, auto_calibrate=auto_calibrate, face_mesh=face_mesh,
+                                 draw=draw, gaze_model=gaze_model, gaze_model_path=gaze_model_path,
+                                 head_pose=head_pose, config=self.config)
+        # The sub-controllers run their gestures as usual; their events come back here
+        for controller in (self.hand, self.eye):
+            controller.actions = EventTap()
+            controller.latency_monitor.report_every = 0
+        self.cursor_filter = self.hand.cursor_filter
+        self.actions = ActionQueue(self.actuator, volume_step_db=self.config.hand.volume_step_db)
+        self.screen_w, self.screen_h = actuator.screen_size()
+        # On a single core the two models would only contend, so they run one after the other
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="facemesh") \
+            if (os.cpu_count() or 1) > 1 else None
+
+        self.state = None
+        # Last pointer targets of each side, held while that side skips frames
+        self.hand_move = None
+        self.gaze = None
+        # (gaze x, gaze y, hand x, hand y) when the gaze last placed the pointer
+        self.anchor = None
+        self.cursor = (self.screen_w // 2, self.screen_h // 2)
+        self.pending_config = None
+        self.exit_requested = False
+
+    def reconfigure(self, config):
+        # Called from the config watcher thread; each part applies it between frames
+        self.hand.reconfigure(config)
+        self.eye.reconfigure(config)
+        self.pending_config = config
+
+    def infer(self, packet):
+        if packet.results is not None:
+            raise ValueError("Fusion mode needs camera frames; landmark traces hold one model's results")
+        t0 = time.perf_counter()
+        hand_packet = FramePacket(packet.seq, packet.t_capture, packet.timestamp, packet.frame)
+        eye_packet = FramePacket(packet.seq, packet.t_capture, packet.timestamp, packet.frame)
+        if self.executor is not None:
+            face = self.executor.submit(self.infer_part, self.eye, eye_packet)
+            hand_time = self.infer_part(self.hand, hand_packet)
+            eye_time = face.result()
+        else:
+            hand_time = self.infer_part(self.hand, hand_packet)
+            eye_time = self.infer_part(self.eye, eye_packet)
+        t1 = time.perf_counter()
+        if hand_packet.results is None and eye_packet.results is None:
+            # Both skipped (e.g. a black frame): nothing to actuate
+            return None
+        self.timer.add("process", t1 - t0)
+        if hand_time is not None:
+            self.timer.add("hand_model", hand_time)
+        if eye_time is not None:
+            self.timer.add("eye_model", eye_time)
+        self.timer.mark("inferred", t1)
+        packet.results = (hand_packet, eye_packet)
+        packet.t_inferred = t1
+        return packet
+
+    @staticmethod
+    def infer_part(controller, packet):
+        # Runs one side on its packet. Returns the seconds its model ran, or None when it
+        # did not (a skipped frame leaves packet.results None; a propagated one is no inference).
+        propagated = controller.timer.counters.get("propagated", 0)
+        t0 = time.perf_counter()
+        if controller.infer(packet) is None or controller.timer.counters.get("propagated", 0) != propagated:
+            return None
+        return time.perf_counter() - t0
+
+    def actuate(self, packet):
+        t0 = time.perf_counter()
+        if self.pending_config is not None:
+            self.config, self.pending_config = self.pending_config, None
+            self.actions.volume_step_db = self.config.hand.volume_step_db
+        hand_packet, eye_packet = packet.results
+        now = packet.timestamp
+        hand_events = eye_events = ()
+        hand_move, gaze = self.hand_move, self.gaze
+        if hand_packet.results is not None:
+            self.hand.actuate(hand_packet)
+            hand_events = self.hand.actions.take()
+            hand_move = last_move(hand_events) if self.hand.pointer_id is not None else None
+        eye = self.eye
+        if eye_packet.results is not None:
+            eye.actuate(eye_packet)
+            eye_events = eye.actions.take()
+            gaze = None
+            if eye_packet.results.multi_face_landmarks and eye.calibration is None and (
+                    eye.gaze_model is not None or eye.eye_ref_x is not None or eye.head_mode == "pointer"):
+                gaze = (eye.cursor_x, eye.cursor_y)
+        self.hand_move, self.gaze = hand_move, gaze
+        self.timer.mark("detected", 1.0 if hand_move is not None or gaze is not None else 0.0)
+
+        target = self.fuse(hand_move, gaze)
+        if target is not None and target != self.cursor:
+            self.cursor = target
+            self.actions.put(GestureEvent(MOVE, now, target))
+        for event in hand_events:
+            if event.kind != MOVE:
+                self.actions.put(event)
+        if hand_move is None:
+            for event in eye_events:
+                if event.kind != MOVE:
+                    self.actions.put(event)
+        if self.hand.exit_requested or self.eye.exit_requested:
+            # Open palm or open mouth
+            self.exit_requested = True
+            if self.feedback is not None:
+                self.feedback.say("Exiting hand and eye control", interrupt=True)
+        self.actions.flush(now)
+
+        packet.t_actuated = time.perf_counter()
+        actuation_time = self.actuator.take_elapsed()
+        self.timer.add("gesture", packet.t_actuated - t0 - actuation_time)
+        self.timer.add("actuation", actuation_time)
+        self.timer.add("latency", packet.t_actuated - packet.t_capture)
+        self.timer.mark("actuated", packet.t_actuated)
+        self.timer.set("actions", self.actions.sent)
+        self.latency_monitor.record(packet)
+        return packet
+
+    def fuse(self, hand, gaze):
+        # Screen position for this frame from the hand's and the gaze's targets (either may be None)
+        if hand is not None and gaze is not None:
+            self.state = FUSED
+            settings = self.config.fusion
+            cx, cy = self.cursor
+            far = math.hypot(gaze[0] - cx, gaze[1] - cy) > settings.warp_distance * math.hypot(self.screen_w,
+                                                                                               self.screen_h)
+            # Never re-anchor mid-drag: the drop point is the hand's
+            if self.anchor is None or (far and not self.hand.pinch.active):
+                self.anchor = (gaze[0], gaze[1], hand[0], hand[1])
+            gx, gy, hx, hy = self.anchor
+            x = gx + (hand[0] - hx) * settings.fine_gain
+            y = gy + (hand[1] - hy) * settings.fine_gain
+            return int(min(max(x, 0), self.screen_w - 1)), int(min(max(y, 0), self.screen_h - 1))
+        self.anchor = None
+        if hand is not None:
+            self.state = HAND
+            return hand
+        if gaze is not None:
+            self.state = EYE
+            return gaze
+        self.state = None
+        return None
+
+    def render(self, packet):
+        hand_packet, eye_packet = packet.results
+        # Preview, hand landmarks and hand labels first, then the eye's labels on top
+        frame = self.hand.render(hand_packet)
+        if self.draw:
+            self.eye.draw_overlays(frame)
+        cv2.putText(frame, f"Pointer: {self.state or 'no tracking'}", (10, frame.shape[0] - 65),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+        self.eye.show_calibration()
+        return self.hud.draw(frame)
+
+    def handle_key(self, key):
+        if key == ord('h'):
+            self.hud.toggle()
+        else:
+            # 'c' recenters and 'k' calibrates the gaze
+            self.eye.handle_key(key)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hand and eye control together on one camera")
+    parser.add_argument("--source", default="0", help="camera index, video file or image directory")
+    add_actuator_args(parser)
+    parser.add_argument("--headless", action="store_true",
+                        help="do not open a preview window; calibrates the gaze on the first detected face")
+    parser.add_argument("--no-draw", action="store_true", help="show the preview without landmarks and labels")
+    parser.add_argument("--sequential", action="store_true",
+                        help="process every frame on one thread instead of the latest-frame pipeline")
+    add_calibration_args(parser)
+    add_head_pose_args(parser)
+    add_propagate_args(parser)
+    add_quality_args(parser)
+    add_metrics_args(parser)
+    add_startup_args(parser)
+    add_config_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiler = StartupProfiler("fusion", args.profile_startup, args.startup_log)
+    # Command-line flags win over the profile files
+    overrides = merge_layers(propagate_overrides(args), quality_overrides(args))
+    config = config_from_args(args, args.source, overrides)
+    # Build both MediaPipe graphs while the camera opens
+    hand_detector = Background(create_hand_detector, MAX_HANDS, config.hand, profiler=profiler, label="create Hands")
+    face_mesh = Background(create_face_mesh, config.eye, profiler=profiler, label="create FaceMesh")
+    with profiler.step("open source"):
+        source = open_source(args.source, realtime=not args.sequential)
+    if source.provides_landmarks:
+        raise SystemExit("Fusion mode needs camera frames or video, not a landmark trace")
+    with profiler.step("create actuator"):
+        actuator = actuator_from_args(args)
+    feedback = None if args.headless else FeedbackService(sound=False).start()
+    gaze_model_path = model_path(args.user, args.source, source.frame_size())
+    gaze_model = None if args.calibrate else load_model(gaze_model_path)
+    controller = FusionController(actuator, source.frame_size(), hand_detector=hand_detector.result(),
+                                  face_mesh=face_mesh.result(), feedback=feedback, auto_calibrate=args.headless,
+                                  gaze_model=gaze_model, gaze_model_path=gaze_model_path,
+                                  head_pose=args.head_pose, draw=not args.no_draw, config=config)
+    controller.hud.enabled = args.hud
+    controller.eye.gaze_kind = args.gaze_model
+    if args.calibrate:
+        controller.eye.start_calibration()
+    exporter = exporter_from_args(args, controller.timer, "fusion")
+    watcher = watch_config(args, args.source, controller.reconfigure, overrides)
+
+    print("🟢 Hand + eye control started: look to place the pointer, move the hand to refine it")
+    try:
+        if args.sequential:
+            run_sequential(controller, source, headless=args.headless, on_actuated=profiler.mark_first_frame)
+        else:
+            run_threaded(controller, source, headless=args.headless, on_actuated=profiler.mark_first_frame)
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        controller.close()
+        print(controller.latency_monitor.summary())
+        if exporter is not None:
+            exporter.stop()
+        actuator.close()
+        if hasattr(actuator, "summary"):
+            print(format_actuator_stats(actuator.summary()))
+        source.release()
+        if not args.headless:
+            cv2.destroyAllWindows()
+
+    if feedback is not None:
+        feedback.close()
+
+
+if __name__ == "__main__":
+    main()
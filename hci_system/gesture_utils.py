@@ -1 +1,26 @@
+import math
 
+import numpy as np
+
+_screen_size = None
+
+
+def get_screen_size():
+    # pyautogui is only needed for the screen size, so import it on first use
+    global _screen_size
+    if _screen_size is None:
+        import pyautogui
+        _screen_size = tuple(pyautogui.size())
+    return _screen_size
+
+
+def map_to_screen(x, y, frame_w, frame_h, screen_w=None, screen_h=None):
+    if screen_w is None or screen_h is None:
+        screen_w, screen_h = get_screen_size()
+    screen_x = np.interp(x, (0, frame_w), (0, screen_w - 1))
+    screen_y = np.interp(y, (0, frame_h), (0, screen_h - 1))
+    return int(screen_x), int(screen_y)
+
+
+def calculate_distance(p1, p2):
+    return math.hypot(p1[0] - p2[0], p1[1] - p2[1])
@@ -0,0 +1,208 @@
+# Gesture state machines and the action queue between them and the actuator.
+# Each machine is fed one condition per frame (from the feature vector) and appends
+# GestureEvents to the frame's event list; the controller hands the actuation
+# events to an ActionQueue, which merges repeats and enforces per-action rate
+# limits so the OS input queue is never flooded.
+
+MOVE = "move"
+CLICK = "click"
+DOUBLE_CLICK = "double_click"
+DRAG_START = "drag_start"
+DRAG_END = "drag_end"
+SCROLL = "scroll"
+VOLUME = "volume"
+EXIT = "exit"
+
+# Minimum seconds between two dispatches of the same action. Merged kinds that come
+# too early wait for the next flush (and keep merging); the others are dropped.
+RATE_LIMITS = {
+    CLICK: 0.1,
+    DOUBLE_CLICK: 0.3,
+    SCROLL: 0.1,
+    VOLUME: 0.08,
+}
+
+# Consecutive events of these kinds collapse into one: the latest move, the summed scroll/volume
+COALESCED = (MOVE, SCROLL, VOLUME)
+
+
+class GestureEvent:
+    __slots__ = ("kind", "time", "value")
+
+    def __init__(self, kind, time, value=None):
+        self.kind = kind
+        self.time = time
+        self.value = value
+
+    def __repr__(self):
+        return f"GestureEvent({self.kind!r}, {self.time:.3f}, {self.value!r})"
+
+
+class HoldGesture:
+    # Fires once the condition has held for hold_frames consecutive frames and, when set,
+    # hold_time seconds, then every repeat seconds while it keeps holding (only once when
+    # repeat is None). Times are frame timestamps, so they hold at any frame rate.
+    def __init__(self, kind, value=None, hold_frames=1, repeat=None, hold_time=None):
+        self.kind = kind
+        self.value = value
+        self.hold_frames = hold_frames
+        self.hold_time = hold_time
+        self.repeat = repeat
+        self.count = 0
+        self.since = None
+        self.held = 0.0
+        self.last_fired = None
+
+    @property
+    def holding(self):
+        return self.count >= self.hold_frames and (self.hold_time is None or self.held >= self.hold_time)
+
+    def update(self, active, now, events):
+        if not active:
+            self.reset()
+            return False
+        self.count += 1
+        if self.since is None:
+            self.since = now
+        self.held = now - self.since
+        if not self.holding:
+            return False
+        if self.last_fired is None or (self.repeat is not None and now - self.last_fired >= self.repeat):
+            self.last_fired = now
+            events.append(GestureEvent(self.kind, now, self.value))
+            return True
+        return False
+
+    def reset(self):
+        self.count = 0
+        self.since = None
+        self.held = 0.0
+        self.last_fired = None
+
+
+class PinchGesture:
+    # open -> pinched -> (held past drag_hold) dragging; releasing a short pinch clicks
+    OPEN = "open"
+    PINCHED = "pinched"
+    DRAGGING = "dragging"
+
+    def __init__(self, drag_hold):
+        self.drag_hold = drag_hold
+        self.state = self.OPEN
+        self.start = 0.0
+
+    @property
+    def active(self):
+        return self.state != self.OPEN
+
+    def update(self, pinched, now, events):
+        if pinched:
+            if self.state == self.OPEN:
+                self.state = self.PINCHED
+                self.start = now
+            elif self.state == self.PINCHED and now - self.start > self.drag_hold:
+                self.state = self.DRAGGING
+                events.append(GestureEvent(DRAG_START, now))
+        elif self.state != self.OPEN:
+            if self.state == self.DRAGGING:
+                events.append(GestureEvent(DRAG_END, now))
+            elif now - self.start < self.drag_hold:
+                events.append(GestureEvent(CLICK, now))
+            self.state = self.OPEN
+
+    def cancel(self, now, events):
+        # Tracking lost: never leave the button held down
+        if self.state == self.DRAGGING:
+            events.append(GestureEvent(DRAG_END, now))
+        self.state = self.OPEN
+
+
+class BlinkGesture:
+    # A closure lasting at least min_time seconds (first closed to first open frame)
+    # clicks when the eye reopens; a second one within double_time turns into a double click.
+    # Closures longer than max_time are no blinks (e.g. an open level that drifted below the threshold).
+    def __init__(self, min_time, double_time, max_time=None):
+        self.min_time = min_time
+        self.double_time = double_time
+        self.max_time = max_time
+        self.closed_since = None
+        self.last_blink = None
+
+    def update(self, closed, now, events):
+        if closed:
+            if self.closed_since is None:
+                self.closed_since = now
+            return
+        if (self.closed_since is not None and now - self.closed_since >= self.min_time
+                and (self.max_time is None or now - self.closed_since <= self.max_time)):
+            if self.last_blink is not None and now - self.last_blink <= self.double_time:
+                events.append(GestureEvent(DOUBLE_CLICK, now))
+                self.last_blink = None
+            else:
+                events.append(GestureEvent(CLICK, now))
+                self.last_blink = now
+        self.closed_since = None
+
+
+class ActionQueue:
+    # Dispatches gesture events to the actuator.
+    # volume_step_db: dB per VOLUME step through adjust_volume, or None to press the media keys
+    def __init__(self, actuator, rate_limits=None, volume_step_db=None):
+        self.actuator = actuator
+        self.rate_limits = RATE_LIMITS if rate_limits is None else rate_limits
+        self.volume_step_db = volume_step_db
+        self.pending = []
+        self.last_sent = {}
+        self.sent = 0
+        self.dropped = 0
+
+    def put(self, event):
+        pending = self.pending
+        if event.kind in COALESCED and pending and pending[-1].kind == event.kind:
+            last = pending[-1]
+            last.value = event.value if event.kind == MOVE else last.value + event.value
+            last.time = event.time
+        else:
+            pending.append(event)
+
+    def flush(self, now):
+        deferred = []
+        for event in self.pending:
+            kind = event.kind
+            limit = self.rate_limits.get(kind)
+            last = self.last_sent.get(kind)
+            if limit and last is not None and now - last < limit:
+                if kind in COALESCED:
+                    deferred.append(event)
+                else:
+                    self.dropped += 1
+                continue
+            self.dispatch(event)
+            self.last_sent[kind] = now
+            self.sent += 1
+        self.pending = deferred
+
+    def dispatch(self, event):
+        kind = event.kind
+        actuator = self.actuator
+        if kind == MOVE:
+            actuator.move_to(*event.value)
+        elif kind == CLICK:
+            actuator.click()
+        elif kind == DOUBLE_CLICK:
+            actuator.double_click()
+        elif kind == DRAG_START:
+            actuator.mouse_down()
+        elif kind == DRAG_END:
+            actuator.mouse_up()
+        elif kind == SCROLL:
+            if event.value:
+                actuator.scroll(event.value)
+        elif kind == VOLUME:
+            if self.volume_step_db is not None:
+                if event.value:
+                    actuator.adjust_volume(event.value * self.volume_step_db)
+            else:
+                key = "volumeup" if event.value > 0 else "volumedown"
+                for _ in range(abs(event.value)):
+                    actuator.press(key)
@@ -0,0 +1,159 @@
+import time
+
+import cv2
+import numpy as np
+
+ACTIVE = "active"
+STILL = "still"
+IDLE = "idle"
+
+
+class CpuMeter:
+    # Process CPU time per wall-clock second, refreshed once a second
+    def __init__(self, period=1.0):
+        self.period = period
+        self.cpu_percent = 0.0
+        self.inference_fps = 0.0
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._inferences = 0
+
+    def tick(self, inferred):
+        if inferred:
+            self._inferences += 1
+        wall = time.perf_counter()
+        elapsed = wall - self._wall
+        if elapsed >= self.period:
+            cpu = time.process_time()
+            self.cpu_percent = (cpu - self._cpu) / elapsed * 100
+            self.inference_fps = self._inferences / elapsed
+            self._wall, self._cpu, self._inferences = wall, cpu, 0
+            return True
+        return False
+
+
+class FrameGovernor:
+    # Decides per frame whether the model runs, and at what input scale.
+    #   active: something detected and moving -> every frame (or active_fps), full resolution
+    #   still:  detected but not moving for still_after seconds -> still_fps
+    #   idle:   nothing detected for idle_after seconds -> idle_fps at idle_scale
+    # A cheap pixel difference on a tiny thumbnail wakes it back to active on the
+    # very frame something changes, so throttling adds no wake-up latency.
+    def __init__(self, active_fps=None, still_fps=15.0, idle_fps=4.0, idle_scale=0.5,
+                 still_after=2.0, idle_after=1.0, motion_threshold=0.004, wake_threshold=6.0,
+                 thumbnail_size=(64, 36)):
+        self.budgets = {ACTIVE: active_fps, STILL: still_fps, IDLE: idle_fps}
+        self.idle_scale = idle_scale
+        self.still_after = still_after
+        self.idle_after = idle_after
+        self.motion_threshold = motion_threshold
+        self.wake_threshold = wake_threshold
+        self.thumbnail_size = thumbnail_size
+
+        self.state = ACTIVE
+        self.last_inference = None
+        self.last_detection = None
+        self.last_motion = None
+        self.last_position = None
+        self.cpu = CpuMeter()
+        self._thumbnail = None
+        self._previous = None
+        self._diff = None
+
+    def _pixels_changed(self, frame):
+        # Mean absolute difference of a nearest-neighbour grayscale thumbnail
+        small = cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_NEAREST)
+        self._thumbnail = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._thumbnail)
+        if self._previous is None:
+            self._previous = self._thumbnail.copy()
+            self._diff = np.empty_like(self._thumbnail)
+            return True
+        cv2.absdiff(self._thumbnail, self._previous, dst=self._diff)
+        self._previous, self._thumbnail = self._thumbnail, self._previous
+        return float(self._diff.mean()) > self.wake_threshold
+
+    def should_infer(self, timestamp, frame=None):
+        # frame is the raw BGR frame, or None for landmark replay (always infers)
+        if frame is None:
+            return True
+        changed = self._pixels_changed(frame)
+        if self.state != ACTIVE and changed:
+            self._set_state(ACTIVE, timestamp)
+        budget = self.budgets[self.state]
+        if budget and self.last_inference is not None and timestamp - self.last_inference < 1.0 / budget:
+            self.cpu.tick(False)
+            return False
+        self.last_inference = timestamp
+        self.cpu.tick(True)
+        return True
+
+    def inference_scale(self):
+        return self.idle_scale if self.state == IDLE else 1.0
+
+    def configure(self, performance):
+        # performance: the config's performance section; takes effect on the next frame
+        self.budgets = {ACTIVE: performance.target_fps or None, STILL: performance.still_fps,
+                        IDLE: performance.idle_fps}
+        self.idle_scale = performance.idle_scale
+
+    def update(self, timestamp, detected, position=None):
+        # position: a few normalized coordinates of the tracked target, used as the motion signal
+        if self.last_detection is None:
+            self.last_detection = self.last_motion = timestamp
+
+        if detected:
+            self.last_detection = timestamp
+            if position is not None and self.last_position is not None:
+                moved = max(abs(a - b) for a, b in zip(position, self.last_position))
+                if moved > self.motion_threshold:
+                    self.last_motion = timestamp
+            self.last_position = position
+        else:
+            self.last_position = None
+
+        if not detected:
+            if timestamp - self.last_detection >= self.idle_after:
+                self._set_state(IDLE, timestamp)
+        elif timestamp - self.last_motion >= self.still_after:
+            self._set_state(STILL, timestamp)
+        else:
+            self._set_state(ACTIVE, timestamp)
+
+    def _set_state(self, state, timestamp):
+        if state == self.state:
+            return
+        if state == ACTIVE:
+            # Restart the timers so a wake-up is not immediately throttled again
+            self.last_detection = self.last_motion = timestamp
+        self.state = state
+        icon = {ACTIVE: "⚡", STILL: "🧘", IDLE: "💤"}[state]
+        print(f"{icon} Governor: {self.status()}")
+
+    def status(self):
+        return f"{self.state} | {self.cpu.inference_fps:.0f} inf/s | CPU {self.cpu.cpu_percent:.0f}%"
+
+
+def add_governor_args(parser):
+    # The budgets default to the tuning profile (config.py); flags given here override it
+    parser.add_argument("--no-governor", action="store_true",
+                        help="run inference on every frame even when nobody is in view")
+    parser.add_argument("--active-fps", type=float, help="inference budget while in use (default: every frame)")
+    parser.add_argument("--still-fps", type=float, help="inference budget while the target is still")
+    parser.add_argument("--idle-fps", type=float, help="inference budget while nothing is detected")
+    parser.add_argument("--idle-scale", type=float, help="inference input scale while idle")
+
+
+def governor_overrides(args):
+    # Config overrides for the governor flags that were given on the command line
+    names = {"active_fps": "target_fps", "still_fps": "still_fps", "idle_fps": "idle_fps",
+             "idle_scale": "idle_scale"}
+    return {"performance": {key: getattr(args, name) for name, key in names.items()
+                            if getattr(args, name) is not None}}
+
+
+def governor_from_args(args, performance):
+    if args.no_governor:
+        return None
+    governor = FrameGovernor()
+    governor.configure(performance)
+    return governor
@@ -1,173 +1,454 @@
+from startup import StartupProfiler, Background, add_startup_args  # First: marks process start
+
+import argparse
+import threading
+import time
+
 import cv2
 import numpy as np
-import pyautogui
 import mediapipe as mp
-import time
-import pyttsx3  # 🔈 For voice feedback
-
-from utils.gesture_utils import map_to_screen, calculate_distance
-
-# Volume control imports
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
-
-# Initialize TTS engine
-engine = pyttsx3.init()
-engine.setProperty('rate', 160)  # Optional: set speech rate
-
-# Initialize webcam
-cap = cv2.VideoCapture(0)
-
-# Initialize MediaPipe Hands
-hand_detector = mp.solutions.hands.Hands(
-    max_num_hands=1,
-    min_detection_confidence=0.8,
-    min_tracking_confidence=0.8
-)
-drawing_utils = mp.solutions.drawing_utils
-
-# Get frame and screen dimensions
-frame_w = int(cap.get(3))
-frame_h = int(cap.get(4))   
-screen_w, screen_h = pyautogui.size()
-
-# Gesture thresholds and timings
-LEFT_CLICK_THRESHOLD = 40
-DRAG_HOLD_TIME = 1.2
-SCROLL_COOLDOWN = 0.3
-SCROLL_UP_THRESHOLD = int(frame_h * 0.4)
-SCROLL_DOWN_THRESHOLD = int(frame_h * 0.6)
-SCROLL_AMOUNT = 100
-
-# State variables
-left_pinch_active = False
-drag_active = False
-pinch_start_time = 0
-last_scroll_time = 0
-
-# Palm detection tracking
-palm_detected_count = 0
-PALM_FRAMES_THRESHOLD = 15
-
-# Initialize volume control
-devices = AudioUtilities.GetSpeakers()
-interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-volume_ctrl = cast(interface, POINTER(IAudioEndpointVolume))
-
-print("🟢 Hand gesture control with palm-exit started...")
-
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    frame = cv2.flip(frame, 1)
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hand_detector.process(rgb_frame)
-    hands = results.multi_hand_landmarks
-
-    if hands:
-        for hand in hands:
-            drawing_utils.draw_landmarks(frame, hand, mp.solutions.hands.HAND_CONNECTIONS)
-            landmarks = hand.landmark
-
-            tip_ids = [4, 8, 12, 16, 20]
-            pip_ids = [3, 6, 10, 14, 18]
-            fingers_up = [landmarks[tip_ids[i]].y < landmarks[pip_ids[i]].y for i in range(5)]
-
-            if all(fingers_up):
-                palm_detected_count += 1
-                cv2.putText(frame, "👋 Palm Detected - Exiting...", (30, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-                if palm_detected_count >= PALM_FRAMES_THRESHOLD:
-                    print("👋 Palm detected for multiple frames. Exiting...")
-                    engine.say("Exiting hand gesture control")
-                    engine.runAndWait()
-                    cap.release()
-                    cv2.destroyAllWindows()
-                    exit()
-            else:
-                palm_detected_count = 0
-
-            # Landmark positions
-            index_tip = landmarks[8]
-            thumb_tip = landmarks[4]
-            thumb_mcp = landmarks[2]
-            middle_tip = landmarks[12]
-
-            ix = int(index_tip.x * frame_w)
-            iy = int(index_tip.y * frame_h)
-            tx = int(thumb_tip.x * frame_w)
-            ty = int(thumb_tip.y * frame_h)
-            mx = int(middle_tip.x * frame_w)
-            my = int(middle_tip.y * frame_h)
-
-            screen_x, screen_y = map_to_screen(ix, iy, frame_w, frame_h)
-            pyautogui.moveTo(screen_x, screen_y, duration=0.05)
-            cv2.circle(frame, (ix, iy), 8, (0, 255, 255), -1)
-
-            # Left click / drag
-            distance_left = calculate_distance((ix, iy), (tx, ty))
-            if distance_left < LEFT_CLICK_THRESHOLD:
-                if not left_pinch_active:
-                    left_pinch_active = True
-                    pinch_start_time = time.time()
-                else:
-                    hold_duration = time.time() - pinch_start_time
-                    if hold_duration > DRAG_HOLD_TIME and not drag_active:
-                        pyautogui.mouseDown()
-                        drag_active = True
-                        print("Drag started")
+
+from actuators import add_actuator_args, actuator_from_args, format_actuator_stats, TimedActuator
+from config import add_config_args, config_from_args, merge_layers, watch_config, Config, MODEL_KEYS
+from features import HandFeatureBatch, NUM_HAND_LANDMARKS
+from feedback import FeedbackService
+from filters import add_filter_args, mode_filter
+from gesture_utils import map_to_screen
+from gestures import (ActionQueue, GestureEvent, HoldGesture, PinchGesture,
+                      CLICK, DRAG_END, DRAG_START, EXIT, MOVE, SCROLL, VOLUME)
+from governor import add_governor_args, governor_from_args, governor_overrides
+from hand_tracks import HandTracker, BOTH, MODIFIER, POINTER
+from metrics import add_metrics_args, exporter_from_args, Hud, Metrics
+from pipeline import LatencyMonitor, run_sequential, run_threaded
+from preprocess import Preprocessor, mirror_landmarks, swap_handedness
+from propagate import add_propagate_args, propagate_overrides, LandmarkPropagator, NEAR_THRESHOLD
+from quality import add_quality_args, low_light_settings, quality_overrides, FrameQualityGate, ENHANCE, SKIP
+from sessions import add_extra_source_args, run_sessions, SessionManager
+from sources import open_source, LandmarkRecorder
+from tracefile import add_trace_args, TraceWriter, TracingActuator
+
+# Gesture thresholds and timings live in the tuning profile (config.py, section "hand")
+
+# Two hands: the pointer hand moves, clicks and drags, the other scrolls and sets the volume
+MAX_HANDS = 2
+POINTER_HAND = "Right"
+
+
+def create_hand_detector(max_hands=MAX_HANDS, settings=None):
+    # settings: the config's hand section (default: the built-in profile)
+    settings = settings or Config().hand
+    return mp.solutions.hands.Hands(
+        max_num_hands=max_hands,
+        model_complexity=settings.model_complexity,
+        min_detection_confidence=settings.min_detection_confidence,
+        min_tracking_confidence=settings.min_tracking_confidence
+    )
+
+
+class HandController:
+    window_name = "Hand Gesture Mouse Control"
+
+    def __init__(self, actuator, frame_size, timer=None, recorder=None, governor=None, hand_detector=None,
+                 feedback=None, cursor_filter=None, max_hands=MAX_HANDS, pointer_hand=POINTER_HAND, draw=True,
+                 config=None):
+        self.config = config if config is not None else Config()
+        self.actuator = TimedActuator(actuator)
+        self.feedback = feedback
+        self.timer = timer if timer is not None else Metrics()
+        self.hud = Hud(self.timer)
+        self.latency_monitor = LatencyMonitor()
+        self.recorder = recorder
+        self.governor = governor
+        # Created on the first inferred frame unless a preloaded one is passed in
+        self.hand_detector = hand_detector
+        # A replacement built in the background after the profile changed a model option
+        self.pending_detector = None
+        self.pending_config = None
+        self.max_hands = max_hands
+        self.features = HandFeatureBatch(max_hands)
+        self.tracker = HandTracker(pointer_hand)
+        self.pointer_id = None
+        # An explicitly passed filter wins over the profile's, also across reloads
+        self.fixed_filter = cursor_filter is not None
+        self.cursor_filter = cursor_filter if self.fixed_filter else mode_filter("hand", self.config.hand.filter)
+        # The model sees the raw frame; results are mirrored in landmark space
+        self.preprocess = Preprocessor()
+        # Carries the landmarks across frames the model skips (performance.skip_method)
+        self.propagator = LandmarkPropagator("hand")
+        self.propagator.configure(self.config.performance)
+        # Skips or enhances unusable frames before inference (config section "quality")
+        self.quality = FrameQualityGate()
+        self.quality.configure(self.config.quality)
+        # draw=False shows the bare preview, without landmarks and gesture overlays
+        self.draw = draw
+
+        # Get frame and screen dimensions
+        self.frame_w, self.frame_h = frame_size
+        self.screen_w, self.screen_h = actuator.screen_size()
+
+        # Gesture state machines, fed once per frame; their events go through the action queue
+        settings = self.config.hand
+        self.palm_exit = HoldGesture(EXIT, hold_frames=settings.palm_exit_frames)
+        self.pinch = PinchGesture(settings.drag_hold_time)
+        self.scroll_up = HoldGesture(SCROLL, settings.scroll_amount, repeat=settings.scroll_cooldown)
+        self.scroll_down = HoldGesture(SCROLL, -settings.scroll_amount, repeat=settings.scroll_cooldown)
+        self.volume_up = HoldGesture(VOLUME, 1, repeat=settings.volume_repeat)
+        self.volume_down = HoldGesture(VOLUME, -1, repeat=settings.volume_repeat)
+        self.actions = ActionQueue(self.actuator, volume_step_db=settings.volume_step_db)
+        self.events = []
+        self.exit_requested = False
+        if self.governor is not None:
+            self.governor.configure(self.config.performance)
+
+        # Labels and markers produced by the actuation stage, drawn by the render stage
+        self.overlays = []
+        self.overlay_lock = threading.Lock()
+
+    def reconfigure(self, config):
+        # Called from the config watcher thread; applied by the actuation stage between frames
+        current = self.pending_config or self.config
+        if config.changed(current, "hand", MODEL_KEYS["hand"]):
+            self.pending_detector = Background(create_hand_detector, self.max_hands, self.model_settings(config))
+        self.pending_config = config
+
+    def model_settings(self, config=None):
+        # The options the model is built with: the low-light confidences while the quality gate reports low light
+        config = config or self.config
+        if self.quality.low_light:
+            return low_light_settings(config.hand, config.quality)
+        return config.hand
+
+    def apply_config(self, config):
+        settings = config.hand
+        if config.changed(self.config, "hand", ("filter",)) and not self.fixed_filter:
+            self.cursor_filter = mode_filter("hand", settings.filter)
+        self.config = config
+        self.palm_exit.hold_frames = settings.palm_exit_frames
+        self.pinch.drag_hold = settings.drag_hold_time
+        for gesture, sign in ((self.scroll_up, 1), (self.scroll_down, -1)):
+            gesture.value = sign * settings.scroll_amount
+            gesture.repeat = settings.scroll_cooldown
+        self.volume_up.repeat = self.volume_down.repeat = settings.volume_repeat
+        self.actions.volume_step_db = settings.volume_step_db
+        self.propagator.configure(config.performance)
+        self.quality.configure(config.quality)
+        if self.governor is not None:
+            self.governor.configure(config.performance)
+
+    def infer(self, packet):
+        if self.pending_detector is not None and self.pending_detector.done():
+            # Swap in the rebuilt model between frames; the camera keeps running meanwhile
+            old, self.hand_detector = self.hand_detector, self.pending_detector.result()
+            self.pending_detector = None
+            if old is not None:
+                old.close()
+        if packet.results is None:
+            governor = self.governor
+            if governor is not None and not governor.should_infer(packet.timestamp, packet.frame):
+                self.timer.count("skipped")
+                return None
+            propagator = self.propagator
+            if not propagator.should_infer(packet.timestamp):
+                t0 = time.perf_counter()
+                packet.results = propagator.propagate(packet.frame, packet.timestamp)
+                if packet.results is not None:
+                    self.timer.add("propagate", time.perf_counter() - t0)
+                    self.timer.count("propagated")
+        if packet.results is None:
+            governor = self.governor
+            t0 = time.perf_counter()
+            frame = packet.frame
+            quality = self.quality
+            if quality.mode != "off":
+                verdict = quality.check(frame, packet.timestamp)
+                if quality.take_light_change():
+                    self.pending_detector = Background(create_hand_detector, self.max_hands, self.model_settings())
+                if verdict == SKIP:
+                    self.timer.count("unusable")
+                    return None
+                if verdict == ENHANCE:
+                    frame = quality.enhance(frame)
+            scale = self.config.performance.inference_scale
+            if governor is not None:
+                scale *= governor.inference_scale()
+            rgb_frame = self.preprocess.model_input(frame, scale)
+            t1 = time.perf_counter()
+            if self.hand_detector is None:
+                self.hand_detector = create_hand_detector(self.max_hands, self.model_settings())
+            packet.results = self.hand_detector.process(rgb_frame)
+            t2 = time.perf_counter()
+            # The selfie view: 21 points per hand instead of every pixel of the frame
+            mirror_landmarks(packet.results.multi_hand_landmarks)
+            swap_handedness(packet.results.multi_handedness)
+            t3 = time.perf_counter()
+            self.timer.add("preprocess", t1 - t0 + t3 - t2)
+            self.timer.add("process", t2 - t1)
+            self.timer.mark("inferred", t2)
+            self.propagator.observe(packet.frame, packet.results, None, packet.timestamp)
+            if governor is not None:
+                hands = packet.results.multi_hand_landmarks
+                position = None
+                if hands:
+                    index_tip = hands[0].landmark[8]
+                    thumb_tip = hands[0].landmark[4]
+                    position = (index_tip.x, index_tip.y, thumb_tip.x, thumb_tip.y)
+                governor.update(packet.timestamp, bool(hands), position)
+        if self.recorder is not None:
+            # Replayed landmarks are recorded too, so a replay can be re-saved with its actions
+            self.recorder.add(packet.timestamp, packet.results)
+        packet.t_inferred = time.perf_counter()
+        return packet
+
+    def actuate(self, packet):
+        t0 = time.perf_counter()
+        if self.pending_config is not None:
+            config, self.pending_config = self.pending_config, None
+            self.apply_config(config)
+        frame_overlays = []
+        hands = packet.results.multi_hand_landmarks
+        now = packet.timestamp
+
+        events = self.events
+        events.clear()
+        tracks = self.tracker.update(packet.results)[:self.max_hands]
+        self.timer.mark("detected", 1.0 if tracks else 0.0)
+        # All hands' features come from one matrix product
+        t_features = time.perf_counter()
+        features = self.features.update([hands[track.index].landmark for track in tracks],
+                                        self.frame_w, self.frame_h)
+        features_time = time.perf_counter() - t_features
+        pointer = next((track for track in tracks if track.role in (POINTER, BOTH)), None)
+        pointer_id = pointer.track_id if pointer is not None else None
+        if pointer_id != self.pointer_id:
+            # The pointer hand changed or left: drop its gestures and start the cursor fresh
+            self.palm_exit.reset()
+            self.pinch.cancel(now, events)
+            self.cursor_filter.reset()
+            self.pointer_id = pointer_id
+        if not any(track.role in (MODIFIER, BOTH) for track in tracks):
+            for gesture in (self.scroll_up, self.scroll_down, self.volume_up, self.volume_down):
+                gesture.reset()
+
+        # Landmarks carried forward between inferences move the cursor but decide no clicks
+        guessed = getattr(packet.results, "propagated", False)
+        for track, hand_features in zip(tracks, features):
+            self.handle_hand(track, hand_features, now, frame_overlays, events, guessed)
+            if self.exit_requested:
+                break
+        for event in events:
+            self.handle_event(event)
+        self.actions.flush(packet.timestamp)
+
+        with self.overlay_lock:
+            self.overlays = frame_overlays
+
+        packet.t_actuated = time.perf_counter()
+        actuation_time = self.actuator.take_elapsed()
+        if tracks:
+            self.timer.add("features", features_time)
+        self.timer.add("gesture", packet.t_actuated - t0 - actuation_time - features_time)
+        self.timer.add("actuation", actuation_time)
+        self.timer.add("latency", packet.t_actuated - packet.t_capture)
+        self.timer.mark("actuated", packet.t_actuated)
+        self.timer.set("actions", self.actions.sent)
+        self.latency_monitor.record(packet)
+        return packet
+
+    def handle_hand(self, track, features, now, frame_overlays, events, guessed=False):
+        role = track.role
+        # Landmark positions
+        ix, iy = features.index_px
+        settings = self.config.hand
+        if self.max_hands > 1:
+            frame_overlays.append(("text", f"#{track.track_id} {role}", (ix + 12, iy - 12), 0.5, (255, 255, 255)))
+
+        if role in (POINTER, BOTH):
+            palm_open = features.all_fingers_up()
+            if palm_open:
+                frame_overlays.append(("text", "👋 Palm Detected - Exiting...", (30, 50), 1, (0, 0, 255)))
+            if self.palm_exit.update(palm_open, now, events):
+                return
+
+            # No tween: the pipeline already delivers a new target every frame and the filter removes jitter
+            screen_x, screen_y = map_to_screen(ix, iy, self.frame_w, self.frame_h, self.screen_w, self.screen_h)
+            screen_x, screen_y = self.cursor_filter.filter(now, screen_x, screen_y)
+            events.append(GestureEvent(MOVE, now, (int(screen_x), int(screen_y))))
+            frame_overlays.append(("circle", (ix, iy), 8, (0, 255, 255)))
+
+            # Left click / drag, on inferred landmarks only; near or mid-pinch the model runs every frame
+            if not guessed:
+                self.pinch.update(features.pinch < settings.click_threshold, now, events)
+            if self.pinch.active or features.pinch < settings.click_threshold * NEAR_THRESHOLD:
+                self.propagator.hold()
+
+        if role in (MODIFIER, BOTH):
+            # Scroll while the middle finger is in the top or bottom band, except mid-pinch of the same hand
+            pinching = role == BOTH and self.pinch.active
+            middle_y = features.middle[1]
+            self.scroll_up.update(not pinching and middle_y < settings.scroll_up_band, now, events)
+            self.scroll_down.update(not pinching and middle_y > settings.scroll_down_band, now, events)
+
+            # Volume control: thumb up or down with the other fingers folded
+            thumb_gesture = (features.other_fingers_folded()
+                             and abs(features.thumb_extension) > settings.thumb_threshold)
+            self.volume_up.update(thumb_gesture and features.thumb_extension < 0, now, events)
+            self.volume_down.update(thumb_gesture and features.thumb_extension > 0, now, events)
+            if self.volume_up.holding:
+                frame_overlays.append(("text", "🔊 Volume Up", (50, 120), 1, (0, 255, 0)))
+            elif self.volume_down.holding:
+                frame_overlays.append(("text", "🔉 Volume Down", (50, 120), 1, (0, 0, 255)))
+
+    def handle_event(self, event):
+        if event.kind == EXIT:
+            print("👋 Palm detected for multiple frames. Exiting...")
+            self.exit_requested = True
+            if self.feedback is not None:
+                self.feedback.say("Exiting hand gesture control", interrupt=True)
+            return
+        if event.kind == DRAG_START:
+            print("Drag started")
+        elif event.kind == DRAG_END:
+            print("Drag ended")
+        elif event.kind == CLICK:
+            print("Single Click")
+        self.actions.put(event)
+
+    def render(self, packet):
+        if packet.frame is None:
+            # Landmark replay has no pixels; draw on a blank canvas
+            frame = np.zeros((self.frame_h, self.frame_w, 3), dtype=np.uint8)
+        else:
+            frame = self.preprocess.preview(packet.frame)
+        # No results when the frame was skipped (fusion mode renders the eye's side anyway)
+        hands = packet.results.multi_hand_landmarks if packet.results is not None else None
+        if hands and self.draw:
+            for hand in hands:
+                mp.solutions.drawing_utils.draw_landmarks(frame, hand, mp.solutions.hands.HAND_CONNECTIONS)
+
+        with self.overlay_lock:
+            frame_overlays = self.overlays if self.draw else ()
+        for overlay in frame_overlays:
+            if overlay[0] == "text":
+                _, text, pos, scale, color = overlay
+                cv2.putText(frame, text, pos, cv2.FONT_HERSHEY_SIMPLEX, scale, color, 2)
             else:
-                if left_pinch_active:
-                    hold_duration = time.time() - pinch_start_time
-                    if drag_active:
-                        pyautogui.mouseUp()
-                        drag_active = False
-                        print("Drag ended")
-                    elif hold_duration < DRAG_HOLD_TIME:
-                        pyautogui.click()
-                        print("Single Click")
-                    left_pinch_active = False
-
-            # Scroll logic
-            current_time = time.time()
-            if current_time - last_scroll_time > SCROLL_COOLDOWN and not left_pinch_active:
-                if my < SCROLL_UP_THRESHOLD:
-                    pyautogui.scroll(SCROLL_AMOUNT)
-                    last_scroll_time = current_time
-                elif my > SCROLL_DOWN_THRESHOLD:
-                    pyautogui.scroll(-SCROLL_AMOUNT)
-                    last_scroll_time = current_time
-
-            # Volume control
-            thumb_tip_y = thumb_tip.y
-            thumb_mcp_y = thumb_mcp.y
-
-            index_folded = landmarks[8].y > landmarks[6].y
-            middle_folded = landmarks[12].y > landmarks[10].y
-            ring_folded = landmarks[16].y > landmarks[14].y
-            pinky_folded = landmarks[20].y > landmarks[18].y
-
-            other_fingers_folded = all([index_folded, middle_folded, ring_folded, pinky_folded])
-            thumb_extended = abs(thumb_tip_y - thumb_mcp_y) > 0.05
-
-            if other_fingers_folded and thumb_extended:
-                current_volume = volume_ctrl.GetMasterVolumeLevel()
-                if thumb_tip_y < thumb_mcp_y:
-                    new_volume = min(current_volume + 1.5, 0.0)
-                    volume_ctrl.SetMasterVolumeLevel(new_volume, None)
-                    cv2.putText(frame, "🔊 Volume Up", (50, 120), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                elif thumb_tip_y > thumb_mcp_y:
-                    new_volume = max(current_volume - 1.5, -65.25)
-                    volume_ctrl.SetMasterVolumeLevel(new_volume, None)
-                    cv2.putText(frame, "🔉 Volume Down", (50, 120), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-    else:
-        palm_detected_count = 0
-
-    cv2.imshow("Hand Gesture Mouse Control", frame)
-    if cv2.waitKey(1) & 0xFF == 27:
-        break
-
-cap.release()
-cv2.destroyAllWindows()
+                _, center, radius, color = overlay
+                cv2.circle(frame, center, radius, color, -1)
+
+        last_latency = self.latency_monitor.last_latency
+        if last_latency is not None:
+            cv2.putText(frame, f"Latency: {last_latency * 1000:.0f} ms", (10, frame.shape[0] - 15),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+        if self.governor is not None:
+            cv2.putText(frame, self.governor.status(), (10, frame.shape[0] - 40),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+        return self.hud.draw(frame)
+
+    def handle_key(self, key):
+        if key == ord('h'):
+            self.hud.toggle()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hand gesture mouse control")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file, image directory or recorded landmark .npz")
+    add_actuator_args(parser)
+    parser.add_argument("--max-hands", type=int, default=MAX_HANDS, help="hands tracked in one inference pass")
+    parser.add_argument("--pointer-hand", default=POINTER_HAND, choices=["Right", "Left"],
+                        help="hand that moves the cursor when two are in view")
+    parser.add_argument("--headless", action="store_true", help="do not open a preview window")
+    parser.add_argument("--no-draw", action="store_true",
+                        help="show the preview without hand landmarks and gesture overlays")
+    parser.add_argument("--sequential", action="store_true",
+                        help="process every frame on one thread instead of the latest-frame pipeline")
+    parser.add_argument("--record-landmarks", metavar="PATH", help="save detected landmarks to an .npz file")
+    add_governor_args(parser)
+    add_propagate_args(parser)
+    add_quality_args(parser)
+    add_filter_args(parser)
+    add_trace_args(parser)
+    add_metrics_args(parser)
+    add_startup_args(parser)
+    add_config_args(parser)
+    add_extra_source_args(parser)
+    args = parser.parse_args(argv)
+    if args.extra_sources and (args.record_landmarks or args.record_trace or args.sequential):
+        parser.error("--extra-source cannot be combined with --record-landmarks, --record-trace or --sequential")
+    return args
+
+
+def run_extra_sources(args, config, overrides):
+    # --source plus every --extra-source as hand sessions of one SessionManager
+    manager = SessionManager(args.workers or 1 + len(args.extra_sources), config, actuator_from_args(args))
+    for spec in dict.fromkeys([args.source] + args.extra_sources):
+        manager.add_session("hand", spec, governor=governor_from_args(args, config.performance),
+                            max_hands=args.max_hands, pointer_hand=args.pointer_hand, draw=not args.no_draw)
+    return run_sessions(manager, args, args.source, overrides)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiler = StartupProfiler("hand_control", args.profile_startup, args.startup_log)
+    # Command-line flags win over the profile files
+    overrides = merge_layers(governor_overrides(args), propagate_overrides(args), quality_overrides(args),
+                             {"hand": {"filter": args.filter}} if args.filter else {})
+    config = config_from_args(args, args.source, overrides)
+    if args.extra_sources:
+        run_extra_sources(args, config, overrides)
+        return
+    # Build the MediaPipe graph while the camera opens
+    hand_detector = Background(create_hand_detector, args.max_hands, config.hand, profiler=profiler,
+                               label="create Hands")
+    with profiler.step("open source"):
+        # The latest-frame pipeline drops whatever it cannot keep up with, so recorded
+        # sources are paced at their own frame rate unless every frame is processed
+        source = open_source(args.source, realtime=not args.sequential)
+    with profiler.step("create actuator"):
+        actuator = actuator_from_args(args)
+    recorder = None
+    if args.record_trace:
+        recorder = TraceWriter(args.record_trace, "hand", source.frame_size(), args.max_hands,
+                               NUM_HAND_LANDMARKS, args.trace_dtype)
+        actuator = TracingActuator(actuator, recorder)
+    elif args.record_landmarks:
+        recorder = LandmarkRecorder(args.record_landmarks, "hand", source.frame_size(), args.max_hands,
+                                    NUM_HAND_LANDMARKS)
+    # Speech runs on its own worker so the exit phrase never stalls the loop
+    feedback = None if args.headless else FeedbackService(sound=False).start()
+    controller = HandController(actuator, source.frame_size(), recorder=recorder,
+                                governor=governor_from_args(args, config.performance),
+                                hand_detector=hand_detector.result(), feedback=feedback,
+                                max_hands=args.max_hands, pointer_hand=args.pointer_hand,
+                                draw=not args.no_draw, config=config)
+    controller.hud.enabled = args.hud
+    exporter = exporter_from_args(args, controller.timer, "hand")
+    watcher = watch_config(args, args.source, controller.reconfigure, overrides)
+
+    print("🟢 Hand gesture control with palm-exit started...")
+    try:
+        if args.sequential:
+            run_sequential(controller, source, headless=args.headless, on_actuated=profiler.mark_first_frame)
+        else:
+            run_threaded(controller, source, headless=args.headless, on_actuated=profiler.mark_first_frame)
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        print(controller.latency_monitor.summary())
+        if exporter is not None:
+            exporter.stop()
+        actuator.close()
+        if hasattr(actuator, "summary"):
+            print(format_actuator_stats(actuator.summary()))
+        if recorder is not None:
+            recorder.save()
+        source.release()
+        if not args.headless:
+            cv2.destroyAllWindows()
+
+    if feedback is not None:
+        feedback.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import math
+
+# Persistent IDs and roles for the hands in view.
+# Detections are matched to last frame's tracks by wrist position; roles come from
+# MediaPipe's handedness label, so the same physical hand keeps the same job.
+
+POINTER = "pointer"     # cursor, click/drag and the palm exit
+MODIFIER = "modifier"   # scroll and volume
+BOTH = "both"           # the only hand in view does everything
+
+WRIST = 0
+MIDDLE_MCP = 9
+MAX_MATCH_DISTANCE = 0.25  # normalized frame units
+MAX_MISSED = 5  # frames a track survives without a matching detection
+
+
+class HandTrack:
+    __slots__ = ("track_id", "handedness", "x", "y", "missed", "role", "index")
+
+    def __init__(self, track_id, x, y):
+        self.track_id = track_id
+        self.handedness = None
+        self.x = x
+        self.y = y
+        self.missed = 0
+        self.role = BOTH
+        # Position of this track's hand in the current results, None when not seen
+        self.index = None
+
+
+def _handedness_label(results, i):
+    multi_handedness = getattr(results, "multi_handedness", None)
+    if not multi_handedness or i >= len(multi_handedness):
+        return None
+    return multi_handedness[i].classification[0].label
+
+
+class HandTracker:
+    # pointer_hand: the user's "Right" or "Left" hand (results are mirrored into the selfie
+    # view after inference, handedness labels included; see preprocess.py)
+    def __init__(self, pointer_hand="Right"):
+        self.pointer_hand = pointer_hand
+        self.tracks = []
+        self.next_id = 1
+        self.pointer_id = None
+
+    def update(self, results):
+        # Returns the tracks seen this frame, each with .index into multi_hand_landmarks and a role
+        hands = results.multi_hand_landmarks or []
+        centers = []
+        for hand in hands:
+            wrist, mcp = hand.landmark[WRIST], hand.landmark[MIDDLE_MCP]
+            centers.append(((wrist.x + mcp.x) * 0.5, (wrist.y + mcp.y) * 0.5))
+
+        # Greedy nearest-first matching; there are at most a handful of hands
+        pairs = sorted(
+            (math.hypot(cx - track.x, cy - track.y), t, d)
+            for t, track in enumerate(self.tracks)
+            for d, (cx, cy) in enumerate(centers)
+        )
+        matched_tracks, matched_hands = set(), set()
+        for distance, t, d in pairs:
+            if distance > MAX_MATCH_DISTANCE:
+                break
+            if t in matched_tracks or d in matched_hands:
+                continue
+            matched_tracks.add(t)
+            matched_hands.add(d)
+            track = self.tracks[t]
+            track.x, track.y = centers[d]
+            track.index = d
+            track.missed = 0
+
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.index = None
+                track.missed += 1
+        self.tracks = [track for track in self.tracks if track.missed <= MAX_MISSED]
+
+        for d, (cx, cy) in enumerate(centers):
+            if d not in matched_hands:
+                track = HandTrack(self.next_id, cx, cy)
+                track.index = d
+                self.next_id += 1
+                self.tracks.append(track)
+
+        seen = [track for track in self.tracks if track.index is not None]
+        for track in seen:
+            label = _handedness_label(results, track.index)
+            if label is not None:
+                track.handedness = label
+        self._assign_roles(seen)
+        seen.sort(key=lambda track: track.index)
+        return seen
+
+    def _assign_roles(self, seen):
+        if len(seen) == 1:
+            seen[0].role = BOTH
+            self.pointer_id = seen[0].track_id
+            return
+        if not seen:
+            return
+        # Handedness first, then whoever held the pointer, then the hand furthest to the pointer side
+        candidates = [track for track in seen if track.handedness == self.pointer_hand]
+        if len(candidates) != 1:
+            candidates = [track for track in seen if track.track_id == self.pointer_id]
+        if len(candidates) != 1:
+            side = 1 if self.pointer_hand == "Right" else -1
+            candidates = [max(seen, key=lambda track: track.x * side)]
+        pointer = candidates[0]
+        self.pointer_id = pointer.track_id
+        for track in seen:
+            track.role = POINTER if track is pointer else MODIFIER
@@ -0,0 +1,204 @@
+import argparse
+import math
+import os
+import time
+
+import numpy as np
+
+from features import FaceFeatures, landmark_view, landmarks_to_array
+
+# Head pose from the FaceMesh landmarks already computed each frame.
+# A rigid (Kabsch) fit of a fixed set of landmarks that barely move with expressions
+# gives the head rotation relative to a reference pose, taken when the user
+# calibrates. Landmarks are used as weak-perspective 3D points in pixels (x*w, y*h,
+# z*w), so the fit is one 3x3 SVD per frame.
+#
+# Compensation: the iris offset (FaceFeatures.iris_offset, in eye widths) measures the
+# eye's rotation in the head, so the on-screen gaze is the sum of that angle and the
+# head's. compensate() turns both into the iris offset the user would show if the
+# head had stayed in the reference pose, which is what the cursor mappings expect.
+
+# Forehead, nose bridge and tip, eye corners, cheeks and temples: no jaw or lips
+POSE_POINTS = [10, 168, 6, 1, 33, 133, 362, 263, 234, 454, 127, 356]
+
+# Eye width over eyeball radius (~30 mm / 12 mm): converts iris offsets (eye widths) to sines of eye rotation
+EYE_RATIO = 2.5
+
+# Head pointer: degrees of yaw / pitch that move the cursor from the centre to the screen edge
+POINTER_YAW = 20.0
+POINTER_PITCH = 12.0
+
+MODES = ("off", "compensate", "pointer")
+
+
+class HeadPose:
+    __slots__ = ("yaw", "pitch", "roll", "scale")
+
+    def __init__(self, yaw=0.0, pitch=0.0, roll=0.0, scale=1.0):
+        # Degrees; yaw > 0 turns the nose to the right of the (mirrored) image, i.e. towards the
+        # screen's right, pitch > 0 down. With x right, y down and z away from the camera that is
+        # a negative rotation about y for yaw and a positive one about x for pitch.
+        self.yaw = yaw
+        self.pitch = pitch
+        self.roll = roll
+        self.scale = scale
+
+    def __repr__(self):
+        return f"HeadPose(yaw={self.yaw:.1f}, pitch={self.pitch:.1f}, roll={self.roll:.1f}, scale={self.scale:.2f})"
+
+
+class HeadPoseEstimator:
+    def __init__(self, indices=POSE_POINTS):
+        self.indices = indices
+        self.points = np.zeros((len(indices), 3), dtype=np.float32)
+        self._view = landmark_view(self.points)
+        self._pixels = np.zeros((len(indices), 3), dtype=np.float64)
+        # Centred reference points, or None until set_reference()
+        self.reference = None
+        self._reference_norm = 1.0
+        self.pose = HeadPose()
+
+    def _gather(self, landmarks, w, h, region):
+        landmarks_to_array(landmarks, self._view, self.indices)
+        if region is not None:
+            region.to_frame(self.points)
+        pixels = self._pixels
+        pixels[:] = self.points
+        pixels *= (w, h, w)
+        pixels -= pixels.mean(axis=0)
+        return pixels
+
+    def set_reference(self, landmarks, w, h, region=None):
+        self.reference = self._gather(landmarks, w, h, region).copy()
+        self._reference_norm = float(np.linalg.norm(self.reference)) or 1e-6
+        self.pose = HeadPose()
+
+    def update(self, landmarks, w, h, region=None):
+        # Pose relative to the reference; the first face seen becomes the reference
+        if self.reference is None:
+            self.set_reference(landmarks, w, h, region)
+            return self.pose
+        current = self._gather(landmarks, w, h, region)
+        u, _, vt = np.linalg.svd(self.reference.T @ current)
+        r = (u @ vt).T
+        if np.linalg.det(r) < 0:
+            # Reflection: flip the least significant axis
+            vt[2] *= -1
+            r = (u @ vt).T
+        # The face looks along -z (towards the camera); yaw and pitch follow where that direction turns
+        pose = self.pose
+        pose.yaw = math.degrees(math.atan2(-r[0, 2], r[2, 2]))
+        pose.pitch = math.degrees(math.atan2(-r[1, 2], r[2, 2]))
+        pose.roll = math.degrees(math.atan2(r[1, 0], r[0, 0]))
+        pose.scale = float(np.linalg.norm(current)) / self._reference_norm
+        return pose
+
+    def to_dict(self):
+        return None if self.reference is None else self.reference.tolist()
+
+    def load_reference(self, data):
+        if data is not None:
+            self.reference = np.array(data, dtype=np.float64)
+            self._reference_norm = float(np.linalg.norm(self.reference)) or 1e-6
+
+
+def _eye_angle(offset):
+    return math.asin(min(max(offset * EYE_RATIO, -1.0), 1.0))
+
+
+def compensate(iris_offset, pose):
+    # ((lx, ly), (rx, ry)) in eye widths -> the same for the reference head pose
+    roll = math.radians(pose.roll)
+    cos_r, sin_r = math.cos(-roll), math.sin(-roll)
+    yaw, pitch = math.radians(pose.yaw), math.radians(pose.pitch)
+    out = []
+    for x, y in iris_offset:
+        # Into the head's frame first, so a tilted head does not mix the axes
+        x, y = x * cos_r - y * sin_r, x * sin_r + y * cos_r
+        out.append((math.sin(yaw + _eye_angle(x)) / EYE_RATIO, math.sin(pitch + _eye_angle(y)) / EYE_RATIO))
+    return tuple(out)
+
+
+def pointer_position(pose):
+    # Normalized screen position (0..1) for the head pointer
+    x = 0.5 + pose.yaw / (2 * POINTER_YAW)
+    y = 0.5 + pose.pitch / (2 * POINTER_PITCH)
+    return min(max(x, 0.0), 1.0), min(max(y, 0.0), 1.0)
+
+
+def add_head_pose_args(parser):
+    parser.add_argument("--head-pose", default="compensate", choices=MODES,
+                        help="compensate gaze for head rotation, or point with the head instead of the eyes")
+
+
+# Benchmark: per-frame cost and how much head rotation leaks into the cursor signal
+
+def _leakage(signal, angle):
+    # Least-squares slope of a cursor coordinate against a head angle, in px per degree
+    angle = angle - angle.mean()
+    denominator = float(angle @ angle)
+    return float(abs((signal - signal.mean()) @ angle) / denominator) if denominator > 1e-9 else 0.0
+
+
+def benchmark(path, sensitivity, gaze_sensitivity):
+    from sources import open_source
+
+    source = open_source(path)
+    w, h = source.frame_size()
+    features = FaceFeatures()
+    estimator = HeadPoseEstimator()
+    rows = []
+    pose_times = []
+    while True:
+        ok, results, _ = source.read()
+        if not ok:
+            break
+        if not getattr(results, "multi_face_landmarks", None):
+            continue
+        face = results.multi_face_landmarks[0].landmark
+        features.update(face, w, h)
+        t0 = time.perf_counter()
+        pose = estimator.update(face, w, h)
+        (lx, ly), (rx, ry) = compensate(features.iris_offset, pose)
+        pose_times.append(time.perf_counter() - t0)
+        rows.append((*features.iris_position, (lx + rx) * 0.5, (ly + ry) * 0.5, pose.yaw, pose.pitch))
+    source.release()
+    if not rows:
+        print(f"⚠️ No faces in {path}")
+        return None
+
+    data = np.array(rows, dtype=np.float64)
+    yaw, pitch = data[:, 4], data[:, 5]
+    # Both mappings in screen pixels relative to the first frame, as the cursor would see them
+    current = (data[:, 0:2] - data[0, 0:2]) * sensitivity
+    compensated = (data[:, 2:4] - data[0, 2:4]) * gaze_sensitivity
+    times_us = np.array(pose_times) * 1e6
+    report = {
+        "trace": path, "frames": len(rows),
+        "yaw_range_deg": float(np.ptp(yaw)), "pitch_range_deg": float(np.ptp(pitch)),
+        "pose_p50_us": float(np.percentile(times_us, 50)), "pose_p95_us": float(np.percentile(times_us, 95)),
+        "current_px_per_deg": (_leakage(current[:, 0], yaw), _leakage(current[:, 1], pitch)),
+        "compensated_px_per_deg": (_leakage(compensated[:, 0], yaw), _leakage(compensated[:, 1], pitch)),
+    }
+    print(f"[head pose] {os.path.basename(path)}: {len(rows)} frames, yaw range {report['yaw_range_deg']:.1f}°, "
+          f"pitch range {report['pitch_range_deg']:.1f}°")
+    print(f"    pose + compensation  p50 {report['pose_p50_us']:.0f} µs  p95 {report['pose_p95_us']:.0f} µs")
+    for name in ("current", "compensated"):
+        x, y = report[f"{name}_px_per_deg"]
+        print(f"    {name:<12} cursor drift {x:6.1f} px/° yaw  {y:6.1f} px/° pitch")
+    return report
+
+
+def main(argv=None):
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Head-pose cost and gaze drift on recorded face traces")
+    parser.add_argument("traces", nargs="+", help="recorded face landmark .npz / .trace files")
+    args = parser.parse_args(argv)
+    settings = Config().eye
+    for path in args.traces:
+        benchmark(path, settings.sensitivity, settings.gaze_sensitivity)
+
+
+if __name__ == "__main__":
+    main()
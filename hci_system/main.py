@@ -1,16 +1,18 @@
 # main.py
 
 import cv2
-import numpy as np
 import pyautogui
 import mediapipe as mp
-from utils.gesture_utils import map_to_screen
+from gesture_utils import map_to_screen
+from hand_tracks import HandTracker, BOTH, POINTER
 
 def hand_gesture_mouse_control():
     cap = cv2.VideoCapture(0)
 
     hand_detector = mp.solutions.hands.Hands()
     drawing_utils = mp.solutions.drawing_utils
+    # The frame is flipped before inference, so MediaPipe's labels are the user's own hands
+    tracker = HandTracker(pointer_hand="Right")
 
     screen_w, screen_h = pyautogui.size()
 
@@ -26,19 +28,22 @@ def hand_gesture_mouse_control():
         output = hand_detector.process(rgb_frame)
 
         hands = output.multi_hand_landmarks
+        tracks = tracker.update(output)
         if hands:
             for hand in hands:
                 drawing_utils.draw_landmarks(frame, hand, mp.solutions.hands.HAND_CONNECTIONS)
 
-                landmarks = hand.landmark
-                index_finger = landmarks[8]
-                x = int(index_finger.x * frame_w)
-                y = int(index_finger.y * frame_h)
+        # Only the pointer hand drives the cursor, whatever order MediaPipe lists the hands in
+        pointer = next((track for track in tracks if track.role in (POINTER, BOTH)), None)
+        if pointer is not None:
+            index_finger = hands[pointer.index].landmark[8]
+            x = int(index_finger.x * frame_w)
+            y = int(index_finger.y * frame_h)
 
-                screen_x, screen_y = map_to_screen(x, y, frame_w, frame_h)
-                pyautogui.moveTo(screen_x, screen_y)
+            screen_x, screen_y = map_to_screen(x, y, frame_w, frame_h)
+            pyautogui.moveTo(screen_x, screen_y)
 
-                cv2.circle(frame, (x, y), 10, (0, 255, 255), -1)
+            cv2.circle(frame, (x, y), 10, (0, 255, 255), -1)
 
         cv2.imshow('Hand Control', frame)
         if cv2.waitKey(1) == 27:
@@ -0,0 +1,220 @@
+import csv
+import json
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Per-frame instrumentation shared by both control loops. Every series is a fixed-size
+# ring written by a single stage thread, so recording is one array store and no lock;
+# readers (HUD, exporter, GUI panel) copy the rings when they build a snapshot.
+
+# Stages in pipeline order, as shown on the HUD and in exports
+STAGES = ["decode", "preprocess", "process", "propagate", "features", "gesture", "actuation", "render", "latency"]
+
+
+class RingBuffer:
+    __slots__ = ("data", "index")
+
+    def __init__(self, capacity):
+        self.data = np.zeros(capacity, dtype=np.float64)
+        self.index = 0
+
+    def append(self, value):
+        self.data[self.index % len(self.data)] = value
+        self.index += 1
+
+    def values(self):
+        # Unordered copy of the samples currently held
+        return self.data[:min(self.index, len(self.data))].copy()
+
+
+class GrowingBuffer:
+    # Unbounded stand-in for RingBuffer, for benchmarks that keep every sample
+    __slots__ = ("data",)
+
+    def __init__(self):
+        self.data = []
+
+    def append(self, value):
+        self.data.append(value)
+
+    def values(self):
+        return np.array(self.data, dtype=np.float64)
+
+
+class Metrics:
+    # add(stage, seconds) times a stage; mark(series, value) samples anything else
+    # (detection flags, frame times); count(name) keeps running totals.
+    # window=None keeps every sample (benchmarks).
+    def __init__(self, window=300):
+        self.window = window
+        self.samples = {}
+        self.series = {}
+        self.counters = {}
+        self.started = time.perf_counter()
+
+    def _buffer(self, table, name):
+        buffer = table.get(name)
+        if buffer is None:
+            buffer = table[name] = RingBuffer(self.window) if self.window else GrowingBuffer()
+        return buffer
+
+    def add(self, stage, seconds):
+        self._buffer(self.samples, stage).append(seconds)
+
+    def mark(self, series, value=1.0):
+        self._buffer(self.series, series).append(value)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, name, value):
+        self.counters[name] = value
+
+    def percentiles(self, percents=(50, 95, 99)):
+        # {stage: {"p50": ms, ...}} for every stage seen so far
+        report = {}
+        for stage, buffer in list(self.samples.items()):
+            values = buffer.values()
+            if len(values):
+                report[stage] = {f"p{p}": float(v) for p, v in zip(percents, np.percentile(values * 1000, percents))}
+        return report
+
+    def rate(self, series):
+        # Events per second from a series of perf_counter() marks
+        buffer = self.series.get(series)
+        if buffer is None:
+            return 0.0
+        times = buffer.values()
+        if len(times) < 2:
+            return 0.0
+        span = times.max() - times.min()
+        return float((len(times) - 1) / span) if span > 0 else 0.0
+
+    def mean(self, series):
+        buffer = self.series.get(series)
+        if buffer is None:
+            return None
+        values = buffer.values()
+        return float(values.mean()) if len(values) else None
+
+    def snapshot(self):
+        # Plain dict (picklable, JSON-ready) of everything recorded so far
+        stages = {}
+        for stage, stats in self.percentiles((50, 95)).items():
+            stages[stage] = {"p50_ms": stats["p50"], "p95_ms": stats["p95"]}
+        detection_rate = self.mean("detected")
+        return {
+            "time": time.time(),
+            "uptime_s": time.perf_counter() - self.started,
+            "fps": self.rate("actuated"),
+            "inference_fps": self.rate("inferred"),
+            "detection_rate": detection_rate if detection_rate is not None else 0.0,
+            "counters": dict(self.counters),
+            "stages": stages,
+        }
+
+
+def format_snapshot(snapshot, stages=STAGES):
+    # Short text lines for the HUD and the GUI panel
+    counters = snapshot["counters"]
+    lines = [f"{snapshot['fps']:.0f} fps | inference {snapshot['inference_fps']:.0f}/s | "
+             f"detected {snapshot['detection_rate'] * 100:.0f}%",
+             f"dropped {counters.get('dropped', 0)} | skipped {counters.get('skipped', 0)} | "
+             f"unusable {counters.get('unusable', 0)} | propagated {counters.get('propagated', 0)} | "
+             f"actions {counters.get('actions', 0)}"]
+    for stage in stages:
+        stats = snapshot["stages"].get(stage)
+        if stats is not None:
+            lines.append(f"{stage:<12} {stats['p50_ms']:6.2f} / {stats['p95_ms']:6.2f} ms")
+    return lines
+
+
+class Hud:
+    # On-frame metrics overlay, toggled with 'h'; the snapshot is refreshed twice a second
+    def __init__(self, metrics, enabled=False, refresh=0.5):
+        self.metrics = metrics
+        self.enabled = enabled
+        self.refresh = refresh
+        self._lines = []
+        self._updated = 0.0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    def draw(self, frame):
+        if not self.enabled:
+            return frame
+        now = time.perf_counter()
+        if now - self._updated >= self.refresh:
+            self._lines = format_snapshot(self.metrics.snapshot())
+            self._updated = now
+        x = max(frame.shape[1] - 330, 10)
+        # Dim the panel background so the text stays readable over the video
+        height = 20 * len(self._lines) + 10
+        panel = frame[5:5 + height, x - 10:frame.shape[1] - 5]
+        panel //= 2
+        for i, line in enumerate(self._lines):
+            cv2.putText(frame, line, (x, 22 + 20 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
+        return frame
+
+
+class MetricsExporter(threading.Thread):
+    # Appends a snapshot to path every `every` seconds: one JSON object per line for
+    # .json/.jsonl, one row per stage and snapshot for .csv
+    def __init__(self, metrics, path, every=5.0, labels=None):
+        super().__init__(name="metrics-export", daemon=True)
+        self.metrics = metrics
+        self.path = path
+        self.every = every
+        self.labels = labels or {}
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.wait(self.every):
+            self.export()
+
+    def stop(self):
+        self.stop_event.set()
+        self.join(timeout=1.0)
+        self.export()
+
+    def export(self):
+        snapshot = dict(self.labels, **self.metrics.snapshot())
+        if self.path.endswith(".csv"):
+            self._write_csv(snapshot)
+        else:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(snapshot) + "\n")
+
+    def _write_csv(self, snapshot):
+        fields = list(self.labels) + ["time", "fps", "inference_fps", "detection_rate", "dropped", "skipped",
+                                      "stage", "p50_ms", "p95_ms"]
+        new_file = not os.path.exists(self.path)
+        with open(self.path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            if new_file:
+                writer.writeheader()
+            counters = snapshot["counters"]
+            base = {key: snapshot[key] for key in list(self.labels) + ["time", "fps", "inference_fps",
+                                                                         "detection_rate"]}
+            base.update(dropped=counters.get("dropped", 0), skipped=counters.get("skipped", 0))
+            for stage, stats in snapshot["stages"].items():
+                writer.writerow(dict(base, stage=stage, **stats))
+
+
+def add_metrics_args(parser):
+    parser.add_argument("--hud", action="store_true", help="start with the metrics overlay on (toggle with 'h')")
+    parser.add_argument("--metrics-export", metavar="PATH", help="append metrics snapshots to a .jsonl or .csv file")
+    parser.add_argument("--metrics-every", type=float, default=5.0, help="seconds between metrics exports")
+
+
+def exporter_from_args(args, metrics, mode):
+    if not args.metrics_export:
+        return None
+    exporter = MetricsExporter(metrics, args.metrics_export, args.metrics_every, labels={"mode": mode})
+    exporter.start()
+    return exporter
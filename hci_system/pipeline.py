@@ -0,0 +1,259 @@
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class FramePacket:
+    # One camera frame travelling through the capture -> inference -> actuation stages.
+    # t_* fields are perf_counter() readings for latency; timestamp is the source's
+    # media time in seconds and is what gesture timings are measured against.
+    # region is set when the model saw a crop of the frame (see roi.Region).
+    __slots__ = ("seq", "t_capture", "timestamp", "frame", "results", "region", "t_inferred", "t_actuated")
+
+    def __init__(self, seq, t_capture, timestamp, frame):
+        self.seq = seq
+        self.t_capture = t_capture
+        self.timestamp = timestamp
+        self.frame = frame
+        self.results = None
+        self.region = None
+        self.t_inferred = None
+        self.t_actuated = None
+
+
+class LatestQueue:
+    # Bounded queue that drops the oldest item instead of blocking the producer,
+    # so a slow consumer always picks up the newest frame
+    def __init__(self, maxsize=1):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        # Raises queue.Empty on timeout
+        return self._queue.get(timeout=timeout)
+
+
+def read_packet(source, seq, timer=None):
+    # Returns None when the source is exhausted. Landmark sources hand over their
+    # results directly, so the packet skips the inference stage.
+    t0 = time.perf_counter()
+    ret, frame, timestamp = source.read()
+    t_capture = time.perf_counter()
+    if not ret:
+        return None
+    if timer is not None:
+        timer.add("decode", t_capture - t0)
+    packet = FramePacket(seq, t_capture, timestamp, frame)
+    if source.provides_landmarks:
+        packet.results = frame
+        packet.frame = None
+    return packet
+
+
+class CaptureThread(threading.Thread):
+    def __init__(self, source, out_queue, stop_event, monitor=None, timer=None):
+        super().__init__(name="capture", daemon=True)
+        self.source = source
+        self.out_queue = out_queue
+        self.stop_event = stop_event
+        self.monitor = monitor
+        self.timer = timer
+        self.error = None
+
+    def run(self):
+        seq = 0
+        try:
+            while not self.stop_event.is_set():
+                seq += 1
+                packet = read_packet(self.source, seq, self.timer)
+                if packet is None:
+                    break
+                if self.monitor is not None:
+                    self.monitor.mark_capture(packet.t_capture)
+                self.out_queue.put(packet)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.stop_event.set()
+
+
+class StageThread(threading.Thread):
+    # Runs fn on every packet from in_queue and forwards the result to out_queues.
+    # fn may return None to swallow a packet.
+    def __init__(self, name, fn, in_queue, out_queues, stop_event, on_start=None):
+        super().__init__(name=name, daemon=True)
+        self.fn = fn
+        self.in_queue = in_queue
+        self.out_queues = out_queues
+        self.stop_event = stop_event
+        self.on_start = on_start
+        self.error = None
+
+    def run(self):
+        try:
+            if self.on_start is not None:
+                self.on_start()
+            while not self.stop_event.is_set():
+                try:
+                    packet = self.in_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                packet = self.fn(packet)
+                if packet is None:
+                    continue
+                for out_queue in self.out_queues:
+                    out_queue.put(packet)
+        except Exception as e:
+            self.error = e
+            self.stop_event.set()
+
+
+class LatencyMonitor:
+    # Tracks capture -> actuation latency per frame and compares it with the camera frame interval
+    def __init__(self, window=300, report_every=120):
+        self.latencies = deque(maxlen=window)
+        self.intervals = deque(maxlen=window)
+        self.report_every = report_every
+        self.last_capture = None
+        self.last_latency = None
+        self.count = 0
+
+    def mark_capture(self, t_capture):
+        if self.last_capture is not None:
+            self.intervals.append(t_capture - self.last_capture)
+        self.last_capture = t_capture
+
+    def record(self, packet):
+        self.last_latency = packet.t_actuated - packet.t_capture
+        self.latencies.append(self.last_latency)
+        self.count += 1
+        if self.report_every and self.count % self.report_every == 0:
+            print(self.summary())
+
+    def frame_interval(self):
+        if not self.intervals:
+            return None
+        return float(np.median(self.intervals))
+
+    def summary(self):
+        if not self.latencies:
+            return "⏱️ No frames actuated yet"
+        latencies_ms = np.array(self.latencies) * 1000
+        p50, p95 = np.percentile(latencies_ms, [50, 95])
+        text = (f"⏱️ Latency over {len(latencies_ms)} frames: "
+                f"p50 {p50:.1f} ms, p95 {p95:.1f} ms, max {latencies_ms.max():.1f} ms")
+        interval = self.frame_interval()
+        if interval:
+            within = np.mean(latencies_ms <= interval * 1000) * 100
+            text += f" | camera {1 / interval:.1f} fps, {within:.0f}% within one frame"
+        return text
+
+
+def show(controller, packet):
+    # Render stage of both controllers; returns the key code (255 when none)
+    t0 = time.perf_counter()
+    frame = controller.render(packet)
+    cv2.imshow(controller.window_name, frame)
+    key = cv2.waitKey(1) & 0xFF
+    controller.timer.add("render", time.perf_counter() - t0)
+    return key
+
+
+def run_sequential(controller, source, headless=False, max_frames=None, stop_event=None, on_actuated=None):
+    # Runs every frame through all stages on the calling thread. Nothing is
+    # dropped, which is what offline replay and benchmarks need.
+    # stop_event lets another thread end the run; on_actuated(packet) runs after each actuation.
+    frames = 0
+    while not controller.exit_requested and (max_frames is None or frames < max_frames):
+        if stop_event is not None and stop_event.is_set():
+            break
+        packet = read_packet(source, frames + 1, controller.timer)
+        if packet is None:
+            break
+        frames += 1
+        controller.latency_monitor.mark_capture(packet.t_capture)
+        # infer() returns None for frames the governor decided to skip
+        packet = controller.infer(packet)
+        if packet is not None:
+            controller.actuate(packet)
+            if on_actuated is not None:
+                on_actuated(packet)
+        if not headless:
+            key = show(controller, packet) if packet is not None else cv2.waitKey(1) & 0xFF
+            controller.handle_key(key)
+            if key == 27:  # ESC key
+                break
+    return frames
+
+
+def run_threaded(controller, source, headless=False, stop_event=None, on_actuated=None):
+    # capture -> inference -> actuation on worker threads, rendering on the calling thread.
+    # Every queue keeps only the newest packet, so a stalled stage skips stale frames
+    # instead of building up latency. The source is left open for the caller, and only
+    # handed back once every thread has stopped.
+    if stop_event is None:
+        stop_event = threading.Event()
+    capture_queue = LatestQueue()
+    actuation_queue = LatestQueue()
+    render_queue = LatestQueue()
+    out_queues = [actuation_queue] if headless else [actuation_queue, render_queue]
+
+    def actuate(packet):
+        controller.actuate(packet)
+        # Frames replaced in a queue before the next stage picked them up
+        controller.timer.set("dropped", capture_queue.dropped + actuation_queue.dropped)
+        if on_actuated is not None:
+            on_actuated(packet)
+        if controller.exit_requested:
+            stop_event.set()
+
+    threads = [
+        CaptureThread(source, capture_queue, stop_event,
+                      monitor=controller.latency_monitor, timer=controller.timer),
+        StageThread("inference", controller.infer, capture_queue, out_queues, stop_event),
+        StageThread("actuation", actuate, actuation_queue, [], stop_event),
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while not stop_event.is_set():
+            if headless:
+                stop_event.wait(0.1)
+                continue
+            try:
+                packet = render_queue.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            key = show(controller, packet)
+            controller.handle_key(key)
+            if key == 27:  # ESC key
+                break
+    finally:
+        stop_event.set()
+        for thread in threads:
+            thread.join(timeout=1.0)
+            while thread.is_alive():
+                # The caller may start the next pipeline on the same source: never while a thread still reads it
+                print(f"⏳ Waiting for the {thread.name} thread to stop...")
+                thread.join(timeout=1.0)
+
+    for thread in threads:
+        if thread.error is not None:
+            raise thread.error
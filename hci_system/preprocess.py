@@ -0,0 +1,64 @@
+import cv2
+import numpy as np
+
+# Frame preparation for the models without per-frame allocations.
+# Camera frames are never flipped in place: hands are mirrored in landmark space
+# after inference (x -> 1 - x, handedness swapped), and where the model's output is
+# not mirror-symmetric (FaceMesh numbers its points by side) only the small,
+# already cropped and converted model input is flipped. Downscale, conversion and
+# flip write into buffers kept from frame to frame, and the model input is handed
+# over read-only so MediaPipe can wrap it without copying. The full frame is only
+# flipped for the preview window, when there is one.
+
+
+class FrameBuffers:
+    # Output arrays reused across frames; one is reallocated only when its shape changes
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, name, shape):
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = self._buffers[name] = np.empty(shape, dtype=np.uint8)
+        buffer.flags.writeable = True
+        return buffer
+
+
+class Preprocessor:
+    # Every array it returns is overwritten by the next call of the same method, so
+    # each method must only be used from one stage thread
+    def __init__(self):
+        self.buffers = FrameBuffers()
+
+    def model_input(self, image, scale=1.0, mirror=False):
+        # Read-only RGB version of a BGR image (or a crop view of one), downscaled by scale
+        if scale != 1.0:
+            h, w = image.shape[:2]
+            size = (max(int(round(w * scale)), 1), max(int(round(h * scale)), 1))
+            small = self.buffers.get("resized", (size[1], size[0], 3))
+            image = cv2.resize(image, size, dst=small, interpolation=cv2.INTER_AREA)
+        rgb = self.buffers.get("rgb", image.shape)
+        cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=rgb)
+        if mirror:
+            rgb = cv2.flip(rgb, 1, dst=self.buffers.get("mirrored", rgb.shape))
+        rgb.flags.writeable = False
+        return rgb
+
+    def preview(self, frame):
+        # Mirrored copy of the camera frame to draw on and show
+        return cv2.flip(frame, 1, dst=self.buffers.get("preview", frame.shape))
+
+
+def mirror_landmarks(landmark_lists):
+    # In place on MediaPipe landmark lists: turns results for the raw frame into
+    # results for the mirrored one
+    for landmarks in landmark_lists or []:
+        for lm in landmarks.landmark:
+            lm.x = 1.0 - lm.x
+
+
+def swap_handedness(multi_handedness):
+    # MediaPipe labels hands assuming a mirrored (selfie) input; for a raw frame they come out swapped
+    for hand in multi_handedness or []:
+        for classification in hand.classification:
+            classification.label = "Left" if classification.label == "Right" else "Right"
@@ -0,0 +1,416 @@
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from features import FACE_POINTS, INDEX_MCP, MIDDLE_MCP, PINKY_MCP, PIP_IDS, THUMB_MCP, TIP_IDS, WRIST
+from sources import ReplayResults, HANDEDNESS_CODES
+
+# Skip-frame inference: the model runs on every k-th frame only, and the landmarks of
+# the frames in between are carried forward from the last inference, so the cursor
+# still updates at the full camera rate. Click decisions (pinch, blink, eye holds) are
+# only taken on inferred frames; propagated results carry propagated = True. While a
+# gesture is close to firing (within NEAR_THRESHOLD of its threshold, or under way)
+# the controller calls hold(), and the model runs on every frame until it is decided.
+# A closure or pinch that begins and ends between two inferences is still missed, so
+# max_skip must stay below the shortest gesture (a blink is about 7 frames at 30 fps).
+#   flow:        pyramidal Lucas-Kanade optical flow on a few tracked points (fingertips
+#                and knuckles; irises, eye corners, eyelids and lips). Tracked points
+#                move by their own flow, every other landmark by their mean.
+#   extrapolate: constant velocity from the last two inferences; needs no pixels.
+# k adapts: after each inference the propagated estimate for that frame is compared
+# with the model's, k grows by one while the error stays within skip_tolerance (frame
+# heights) and halves when it does not. With infer_fps set the model runs on that
+# fixed time budget instead. Lost flow or a change in the number of hands or faces
+# brings the model back on the next frame.
+
+METHODS = ("off", "flow", "extrapolate")
+# A gesture measure within this factor of its threshold keeps the model running
+NEAR_THRESHOLD = 1.5
+HAND_TRACK_POINTS = sorted({WRIST, THUMB_MCP, INDEX_MCP, MIDDLE_MCP, PINKY_MCP, *TIP_IDS, *PIP_IDS})
+FACE_TRACK_POINTS = sorted(FACE_POINTS)
+LK_PARAMS = dict(winSize=(15, 15), maxLevel=2,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+
+class LandmarkPropagator:
+    # Landmarks are kept like the controllers hold them after inference: normalized,
+    # in full-frame coordinates, mirrored when mirror is set (frames arrive unflipped)
+    def __init__(self, kind, method="off", max_skip=2, infer_fps=0.0, tolerance=0.01, mirror=True):
+        self.kind = kind
+        self.track_points = np.array(HAND_TRACK_POINTS if kind == "hand" else FACE_TRACK_POINTS)
+        self.mirror = mirror
+        self.method = method
+        self.max_skip = max_skip
+        self.infer_fps = infer_fps
+        self.tolerance = tolerance
+        # Frames propagated after each inference (k - 1), adapted as it goes
+        self.skip = min(1, max_skip)
+        self.error = None
+        # Frame width over height, for errors measured on landmarks without a frame
+        self.aspect = 4 / 3
+        self._spare = None
+        self.reset()
+
+    def reset(self):
+        self.points = None
+        self.anchor = None
+        self.handedness = None
+        self.scores = None
+        self.velocity = None
+        self.timestamp = None
+        self.inferred_at = None
+        self.gray = None
+        self.skipped = 0
+        self.force = False
+
+    def configure(self, performance):
+        # performance: the config's performance section; takes effect on the next frame
+        if performance.skip_method != self.method:
+            self.reset()
+        self.method = performance.skip_method
+        self.max_skip = performance.max_skip
+        self.infer_fps = performance.infer_fps
+        self.tolerance = performance.skip_tolerance
+        self.skip = min(self.skip, self.max_skip)
+
+    def should_infer(self, timestamp):
+        if self.method == "off" or self.points is None or self.force:
+            return True
+        if self.infer_fps:
+            return timestamp - self.inferred_at >= 1.0 / self.infer_fps
+        return self.skipped >= self.skip
+
+    def hold(self):
+        # A gesture is close to a decision: the model runs on the next frame
+        if self.method != "off":
+            self.force = True
+
+    def _gray(self, frame):
+        # Written into the buffer the previous frame's image is not using
+        if frame is None or self.method != "flow":
+            return None
+        shape = frame.shape[:2]
+        gray = self._spare if self._spare is not None and self._spare.shape == shape else np.empty(shape, np.uint8)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+
+    def _keep(self, gray, timestamp):
+        self._spare, self.gray = self.gray, gray
+        self.timestamp = timestamp
+
+    def _predict(self, gray, timestamp):
+        # The current landmarks carried forward to this frame, or None when they cannot be
+        points = self.points.copy()
+        if self.method == "extrapolate":
+            if self.velocity is not None:
+                points += self.velocity * (timestamp - self.timestamp)
+            return points
+        if gray is None or self.gray is None:
+            return None
+        h, w = gray.shape
+        tracked = points[:, self.track_points, :2]
+        start = tracked * (w, h)
+        if self.mirror:
+            start[..., 0] = w - start[..., 0]
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self.gray, gray, start.reshape(-1, 1, 2).astype(np.float32),
+                                                    None, **LK_PARAMS)
+        if moved is None:
+            return None
+        good = status.reshape(tracked.shape[:2]).astype(bool)
+        if (good.sum(axis=1) * 2 < good.shape[1]).any():
+            # Most of a hand or face lost
+            return None
+        shift = (moved.reshape(start.shape) - start) / (w, h)
+        if self.mirror:
+            shift[..., 0] = -shift[..., 0]
+        # Points flow lost follow the mean of the others, like the untracked landmarks
+        mean = (shift * good[..., None]).sum(axis=1) / good.sum(axis=1)[:, None]
+        shift = np.where(good[..., None], shift, mean[:, None])
+        points[:, :, :2] += mean[:, None]
+        points[:, self.track_points, :2] = tracked + shift
+        return points
+
+    def propagate(self, frame, timestamp):
+        # Results for a frame the model skips (ReplayResults), or None if the model has to run
+        gray = self._gray(frame)
+        points = self._predict(gray, timestamp)
+        if points is None:
+            self.force = True
+            return None
+        self.points = points
+        self._keep(gray, timestamp)
+        self.skipped += 1
+        results = ReplayResults(self.kind, points, self.handedness, self.scores)
+        results.propagated = True
+        return results
+
+    def observe(self, frame, results, region, timestamp):
+        # After every inference: adapts k and restarts propagation from the model's landmarks.
+        # region: the crop the landmarks are relative to (eye ROI tracking), or None
+        if self.method == "off":
+            return
+        items = results.multi_hand_landmarks if self.kind == "hand" else results.multi_face_landmarks
+        if not items:
+            self.reset()
+            return
+        points = np.array([[(lm.x, lm.y, lm.z) for lm in item.landmark] for item in items], dtype=np.float32)
+        if region is not None:
+            for item_points in points:
+                region.to_frame(item_points)
+        gray = self._gray(frame)
+        if self.points is not None and len(points) == len(self.points):
+            predicted = self._predict(gray, timestamp)
+            if predicted is None:
+                self.error = None
+                self.skip //= 2
+            else:
+                offset = (predicted - points)[:, self.track_points, :2]
+                offset[..., 0] *= frame.shape[1] / frame.shape[0] if frame is not None else self.aspect
+                self.error = float(np.sqrt((offset ** 2).sum(axis=-1)).max())
+                self.skip = min(self.skip + 1, self.max_skip) if self.error <= self.tolerance else self.skip // 2
+            dt = timestamp - self.inferred_at
+            self.velocity = (points - self.anchor) / dt if dt > 0 else None
+        else:
+            self.velocity = None
+        handedness = getattr(results, "multi_handedness", None)
+        if handedness:
+            self.handedness = np.array([HANDEDNESS_CODES.get(hand.classification[0].label, -1)
+                                        for hand in handedness])
+            self.scores = np.array([hand.classification[0].score for hand in handedness])
+        else:
+            self.handedness = self.scores = None
+        self.points = self.anchor = points
+        self.inferred_at = timestamp
+        self._keep(gray, timestamp)
+        self.skipped = 0
+        self.force = False
+
+    def status(self):
+        error = f"{self.error * 100:.1f}%" if self.error is not None else "-"
+        budget = f"{self.infer_fps:.0f} inf/s" if self.infer_fps else f"k={self.skip + 1}"
+        return f"{self.method} | {budget} | error {error}"
+
+
+class SkipReplaySource:
+    # A landmark replay where only every k-th recorded frame counts as inferred; the
+    # rest are extrapolated from those. Stands in for skip-frame inference on traces,
+    # which have no pixels for optical flow.
+    provides_landmarks = True
+
+    def __init__(self, source, propagator):
+        self.source = source
+        self.propagator = propagator
+        w, h = source.frame_size()
+        propagator.aspect = w / h
+        self.kind = source.kind
+        self.inferred = 0
+
+    def read(self):
+        ok, results, timestamp = self.source.read()
+        if not ok:
+            return ok, results, timestamp
+        propagator = self.propagator
+        if not propagator.should_infer(timestamp):
+            propagated = propagator.propagate(None, timestamp)
+            if propagated is not None:
+                return ok, propagated, timestamp
+        self.inferred += 1
+        propagator.observe(None, results, None, timestamp)
+        return ok, results, timestamp
+
+    def frame_size(self):
+        return self.source.frame_size()
+
+    def release(self):
+        self.source.release()
+
+
+def add_propagate_args(parser):
+    # Default to the tuning profile (config.py, section "performance"); flags given here override it
+    parser.add_argument("--skip-method", choices=METHODS,
+                        help="propagate landmarks between inferences by optical flow or extrapolation")
+    parser.add_argument("--max-skip", type=int, help="most frames propagated in a row (k adapts up to it + 1)")
+    parser.add_argument("--infer-fps", type=float, help="fixed inference budget instead of an adaptive k")
+
+
+def propagate_overrides(args):
+    names = ("skip_method", "max_skip", "infer_fps")
+    return {"performance": {name: getattr(args, name) for name in names if getattr(args, name) is not None}}
+
+
+# Accuracy-vs-CPU benchmark: every clip runs once with full inference and once per
+# setting; cursor targets are compared frame by frame against the full run.
+
+class CursorProbe:
+    # Wraps the controller's cursor filter and keeps each frame's output by timestamp
+    def __init__(self, inner):
+        self.inner = inner
+        self.samples = {}
+
+    def filter(self, t, x, y):
+        x, y = self.inner.filter(t, x, y)
+        self.samples[t] = (x, y)
+        return x, y
+
+    def reset(self):
+        self.inner.reset()
+
+
+def run_clip(mode, clip, performance, max_frames=None):
+    # Lazy: only the mode being evaluated is imported
+    from actuators import RecordingActuator
+    from config import Config
+    from filters import mode_filter
+    from metrics import Metrics
+    from pipeline import run_sequential
+    from sources import open_source
+
+    config = Config({"performance": performance})
+    source = open_source(clip)
+    replay = source.provides_landmarks
+    if replay and performance.get("skip_method", "off") != "off":
+        # Traces hold no pixels: extrapolation only
+        settings = config.performance
+        source = SkipReplaySource(source, LandmarkPropagator(source.kind, "extrapolate", settings.max_skip,
+                                                             settings.infer_fps, settings.skip_tolerance))
+    if mode == "hand":
+        from hand_control import HandController as controller_class
+        kwargs = {}
+    else:
+        from eye_control import EyeController as controller_class
+        kwargs = {"auto_calibrate": True}
+    actuator = RecordingActuator()
+    timer = Metrics(window=None)
+    probe = CursorProbe(mode_filter(mode))
+    controller = controller_class(actuator, source.frame_size(), timer=timer, cursor_filter=probe, config=config,
+                                  **kwargs)
+    controller.latency_monitor.report_every = 0
+    if isinstance(source, SkipReplaySource):
+        # The replay stands in for the controller's own skipping, so its gestures hold() this one
+        controller.propagator = source.propagator
+    cpu = time.process_time()
+    try:
+        frames = run_sequential(controller, source, headless=True, max_frames=max_frames)
+    finally:
+        source.release()
+    cpu = time.process_time() - cpu
+    if replay:
+        # No model runs on a trace; its recorded frames stand in for the inferences
+        inferences = source.inferred if isinstance(source, SkipReplaySource) else frames
+        model_ms = None
+    else:
+        model = timer.samples["process"].values() if "process" in timer.samples else np.zeros(0)
+        inferences = len(model)
+        model_ms = float(model.sum() * 1000)
+    return {
+        "frames": frames,
+        "inferences": inferences,
+        "model_ms": model_ms,
+        "cpu_s": cpu,
+        "cursor": probe.samples,
+        "actions": actuator.counts(),
+    }
+
+
+def cursor_error(samples, reference):
+    # Per-frame distance (screen px) to the full-inference cursor, over frames both have
+    common = [t for t in samples if t in reference]
+    if not common:
+        return None
+    a = np.array([samples[t] for t in common], dtype=np.float64)
+    b = np.array([reference[t] for t in common], dtype=np.float64)
+    distance = np.hypot(*(a - b).T)
+    return {"mean": float(distance.mean()), "p95": float(np.percentile(distance, 95)),
+            "coverage": len(common) / len(reference) if reference else 0.0}
+
+
+def settings_from_args(args):
+    # (label, performance overrides) per evaluated setting
+    settings = []
+    for method in args.methods:
+        for max_skip in args.max_skip:
+            settings.append((f"{method} k<={max_skip + 1}", {"skip_method": method, "max_skip": max_skip}))
+        for fps in args.infer_fps:
+            settings.append((f"{method} {fps:g} inf/s", {"skip_method": method, "infer_fps": fps}))
+    return settings
+
+
+def action_mismatch(run, reference):
+    # {action: (count, full-inference count)} for the discrete actions whose counts differ;
+    # cursor moves are left out, they follow the frame count
+    names = (set(run["actions"]) | set(reference["actions"])) - {"move_to"}
+    counts = {name: (run["actions"].get(name, 0), reference["actions"].get(name, 0)) for name in sorted(names)}
+    return {name: pair for name, pair in counts.items() if pair[0] != pair[1]}
+
+
+def format_row(label, run, reference):
+    inferred = run["inferences"] / max(reference["inferences"], 1)
+    model = f"{run['model_ms']:8.0f} ms" if run["model_ms"] is not None else "       - ms"
+    error = cursor_error(run["cursor"], reference["cursor"])
+    error = (f"{error['mean']:6.1f} / {error['p95']:6.1f} px" if error is not None else "      - /      - px")
+    actions = ", ".join(f"{name}={count}" for name, count in sorted(run["actions"].items()))
+    mismatch = action_mismatch(run, reference)
+    if mismatch:
+        actions += "  ⚠️ vs full: " + ", ".join(f"{name} {count} != {full}" for name, (count, full) in mismatch.items())
+    return (f"    {label:<20} inferences {run['inferences']:5d} ({inferred * 100:3.0f}%)  model {model}  "
+            f"CPU {run['cpu_s']:6.2f} s  cursor error {error}  actions: {actions or 'none'}")
+
+
+def parse_args(argv=None):
+    from benchmark import CLIPS_DIR
+
+    parser = argparse.ArgumentParser(description="Accuracy vs CPU of skip-frame inference against full inference")
+    parser.add_argument("--clips", default=CLIPS_DIR,
+                        help="directory with hand/ and eye/ clip folders (videos, image folders or traces; "
+                             "default: the committed synthetic set, whose landmark traces only replay "
+                             "with extrapolate)")
+    parser.add_argument("--mode", default="both", choices=["hand", "eye", "both"])
+    parser.add_argument("--methods", nargs="+", default=["flow", "extrapolate"], choices=METHODS[1:])
+    parser.add_argument("--max-skip", nargs="*", type=int, default=[1, 2, 4],
+                        help="adaptive settings to compare: most frames propagated in a row")
+    parser.add_argument("--infer-fps", nargs="*", type=float, default=[],
+                        help="fixed inference budgets to compare")
+    parser.add_argument("--max-frames", type=int, help="stop each clip after this many frames")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from benchmark import list_clips
+
+    args = parse_args(argv)
+    modes = ["hand", "eye"] if args.mode == "both" else [args.mode]
+    settings = settings_from_args(args)
+    reports = []
+    for mode in modes:
+        clips = list_clips(args.clips, mode)
+        if not clips:
+            print(f"⚠️ No {mode} clips in {os.path.join(args.clips, mode)} "
+                  f"(python benchmarks/make_clips.py --out {args.clips} writes the synthetic set)")
+        for clip in clips:
+            reference = run_clip(mode, clip, {}, args.max_frames)
+            print(f"[{mode}] {os.path.basename(clip)}: {reference['frames']} frames")
+            print(format_row("full inference", reference, reference))
+            report = {"mode": mode, "clip": os.path.basename(clip), "frames": reference["frames"], "runs": []}
+            for label, performance in settings:
+                if os.path.splitext(clip)[1] in (".npz", ".trace") and performance["skip_method"] == "flow":
+                    continue
+                run = run_clip(mode, clip, performance, args.max_frames)
+                print(format_row(label, run, reference))
+                report["runs"].append(dict(label=label, inferences=run["inferences"], model_ms=run["model_ms"],
+                                           cpu_s=run["cpu_s"], actions=run["actions"],
+                                           action_mismatch=action_mismatch(run, reference),
+                                           cursor_error=cursor_error(run["cursor"], reference["cursor"])))
+            reports.append(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import math
+
+import cv2
+import numpy as np
+
+from config import Section
+from preprocess import FrameBuffers
+
+# Frame quality gate, run before inference on a small grayscale thumbnail:
+#   brightness: mean level (0-255)
+#   contrast:   standard deviation of the level
+#   sharpness:  variance of the Laplacian, against its running average for the scene
+#   motion:     mean absolute difference to the previous thumbnail
+# Frames too dark to show a hand or face, or far blurrier than usual (motion blur at
+# the long exposures of a dark room), are skipped instead of handed to a model that
+# would lose tracking on them and pay for a full redetection; at most max_skip_time
+# in a row is skipped. "enhance" also brightens dark frames with a gamma curve and
+# applies CLAHE to the luma of flat ones, written into reused buffers.
+# After low_light_after seconds of dark frames the models are rebuilt (in the
+# background) with the lower low-light confidences, and back once the light returns.
+
+OK = "ok"
+ENHANCE = "enhance"
+SKIP = "skip"
+MODES = ("off", "skip", "enhance")
+# Mean level dark frames are brought up to
+TARGET_BRIGHTNESS = 110.0
+
+
+class FrameQualityGate:
+    def __init__(self, mode="off", dark_level=50.0, black_level=15.0, contrast_level=15.0, blur_ratio=0.35,
+                 max_skip_time=0.25, low_light_after=2.0, thumbnail_size=(160, 120), baseline_rate=0.05):
+        self.mode = mode
+        self.dark_level = dark_level
+        self.black_level = black_level
+        self.contrast_level = contrast_level
+        self.blur_ratio = blur_ratio
+        self.max_skip_time = max_skip_time
+        self.low_light_after = low_light_after
+        self.thumbnail_size = thumbnail_size
+        self.baseline_rate = baseline_rate
+        # False where the models are shared and must not be rebuilt per stream
+        self.adapt_models = True
+
+        self.brightness = self.contrast = self.sharpness = self.motion = 0.0
+        self.baseline = None
+        self.reason = None
+        self.last_passed = None
+        self.low_light = False
+        self.light_changed = False
+        self._light_since = None
+        self.buffers = FrameBuffers()
+        self._gray = None
+        self._previous = None
+        self._diff = None
+        self._laplacian = None
+        self._gamma = None
+        self._lut = None
+        self._clahe = None
+
+    def configure(self, quality):
+        # quality: the config's quality section; takes effect on the next frame
+        self.mode = quality.mode
+        self.dark_level = quality.dark_level
+        self.black_level = quality.black_level
+        self.contrast_level = quality.contrast_level
+        self.blur_ratio = quality.blur_ratio
+        self.max_skip_time = quality.max_skip_time
+        self.low_light_after = quality.low_light_after
+
+    def measure(self, frame):
+        small = cv2.resize(frame, self.thumbnail_size, dst=self.buffers.get("small", self.thumbnail_size[::-1] + (3,)),
+                           interpolation=cv2.INTER_AREA)
+        self._gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        mean, std = cv2.meanStdDev(self._gray)
+        self.brightness, self.contrast = float(mean[0, 0]), float(std[0, 0])
+        self._laplacian = cv2.Laplacian(self._gray, cv2.CV_16S, dst=self._laplacian)
+        self.sharpness = float(cv2.meanStdDev(self._laplacian)[1][0, 0]) ** 2
+        if self._previous is None:
+            self._previous = self._gray.copy()
+            self._diff = np.empty_like(self._gray)
+            self.motion = 0.0
+        else:
+            cv2.absdiff(self._gray, self._previous, dst=self._diff)
+            self.motion = float(self._diff.mean())
+            self._previous, self._gray = self._gray, self._previous
+
+    def check(self, frame, timestamp):
+        # OK, ENHANCE or SKIP for a frame about to be inferred
+        self.measure(frame)
+        self._track_light(timestamp)
+        if self.last_passed is None:
+            self.last_passed = timestamp
+        self.reason = None
+        if self.brightness < self.black_level:
+            self.reason = "too dark"
+        elif self.baseline is not None and self.sharpness < self.blur_ratio * self.baseline:
+            self.reason = "blurred"
+        # Follows slow changes of the scene; a single blurred frame barely moves it
+        if self.baseline is None:
+            self.baseline = self.sharpness
+        else:
+            self.baseline += self.baseline_rate * (self.sharpness - self.baseline)
+        if self.reason is not None and timestamp - self.last_passed < self.max_skip_time:
+            return SKIP
+        self.last_passed = timestamp
+        if self.mode == "enhance" and (self.brightness < self.dark_level or self.contrast < self.contrast_level):
+            return ENHANCE
+        return OK
+
+    def _track_light(self, timestamp):
+        # Low light switches on and off only after low_light_after seconds on the other side
+        dark = self.brightness < self.dark_level
+        if dark == self.low_light:
+            self._light_since = None
+            return
+        if self._light_since is None:
+            self._light_since = timestamp
+        if timestamp - self._light_since >= self.low_light_after:
+            self.low_light = dark
+            self._light_since = None
+            if self.adapt_models:
+                self.light_changed = True
+            print(f"{'🌙 Low light' if dark else '☀️ Light back'}: {self.status()}")
+
+    def enhance(self, frame):
+        # Brightened and/or contrast-stretched copy of frame; overwritten by the next call
+        out = self.buffers.get("enhanced", frame.shape)
+        image = frame
+        if self.brightness < self.dark_level:
+            # Gamma that maps the mean level to TARGET_BRIGHTNESS, in steps of 0.05 so the table is reused
+            mean = min(max(self.brightness, 1.0), 254.0) / 255.0
+            gamma = round(min(math.log(TARGET_BRIGHTNESS / 255.0) / math.log(mean), 1.0) * 20) / 20
+            if gamma != self._gamma:
+                self._gamma = gamma
+                self._lut = np.clip(((np.arange(256) / 255.0) ** max(gamma, 0.05)) * 255.0, 0, 255).astype(np.uint8)
+            image = cv2.LUT(image, self._lut, dst=out)
+        if self.contrast < self.contrast_level:
+            if self._clahe is None:
+                self._clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+            ycrcb = cv2.cvtColor(image, cv2.COLOR_BGR2YCrCb, dst=self.buffers.get("ycrcb", frame.shape))
+            luma = cv2.extractChannel(ycrcb, 0, dst=self.buffers.get("luma", frame.shape[:2]))
+            self._clahe.apply(luma, dst=luma)
+            cv2.insertChannel(luma, ycrcb, 0)
+            image = cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR, dst=out)
+        return image
+
+    def take_light_change(self):
+        # True once after each low-light switch the controller should rebuild its model for
+        changed, self.light_changed = self.light_changed, False
+        return changed
+
+    def status(self):
+        light = "low light" if self.low_light else "normal light"
+        return (f"{light} | level {self.brightness:.0f} | contrast {self.contrast:.0f} | "
+                f"sharpness {self.sharpness:.0f} | motion {self.motion:.1f}")
+
+
+def low_light_settings(settings, quality):
+    # A copy of a model's config section with the low-light confidences (never raising them)
+    values = settings.to_dict()
+    values["min_detection_confidence"] = min(values["min_detection_confidence"],
+                                             quality.low_light_detection_confidence)
+    values["min_tracking_confidence"] = min(values["min_tracking_confidence"], quality.low_light_tracking_confidence)
+    return Section(values)
+
+
+def add_quality_args(parser):
+    # Defaults to the tuning profile (config.py, section "quality"); the flag overrides it
+    parser.add_argument("--quality-gate", choices=MODES,
+                        help="skip unusable frames before inference, or also enhance dark and flat ones")
+
+
+def quality_overrides(args):
+    return {"quality": {"mode": args.quality_gate}} if args.quality_gate else {}
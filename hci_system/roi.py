@@ -0,0 +1,96 @@
+import numpy as np
+
+from preprocess import Preprocessor
+
+# Forehead, chin and both cheeks: enough to bound the face without touching all 478 landmarks
+FACE_BOX_POINTS = [10, 152, 234, 454]
+# Crop sides are rounded up to this many pixels so the preprocessing buffers keep their shape
+BOX_STEP = 32
+
+
+class Region:
+    # Crop of the full frame the model actually saw, in full-frame pixels.
+    # Landmarks from the model are normalized to the crop; these helpers map them
+    # back to normalized full-frame coordinates.
+    __slots__ = ("x0", "y0", "w", "h", "sx", "sy", "ox", "oy")
+
+    def __init__(self, x0, y0, w, h, frame_w, frame_h):
+        self.x0 = x0
+        self.y0 = y0
+        self.w = w
+        self.h = h
+        self.sx = w / frame_w
+        self.sy = h / frame_h
+        self.ox = x0 / frame_w
+        self.oy = y0 / frame_h
+
+    def to_frame(self, points):
+        # In place on an (N, 3) array of crop-normalized landmarks; z follows x (image width)
+        points[:, 0] *= self.sx
+        points[:, 0] += self.ox
+        points[:, 1] *= self.sy
+        points[:, 1] += self.oy
+        points[:, 2] *= self.sx
+        return points
+
+    def landmarks_to_frame(self, landmarks):
+        # In place on MediaPipe landmark objects; only used when every point is needed (recording)
+        for lm in landmarks:
+            lm.x = lm.x * self.sx + self.ox
+            lm.y = lm.y * self.sy + self.oy
+            lm.z = lm.z * self.sx
+
+
+class FaceRoiTracker:
+    # Runs FaceMesh on a padded square around last frame's face instead of the whole
+    # frame, optionally downscaled. Falls back to the full frame when the face is lost.
+    # mirror: frames arrive unflipped; the box is kept in mirrored pixels, the matching
+    # crop is taken from the raw frame and only the small model input is flipped.
+    def __init__(self, padding=0.35, scale=1.0, min_size=96, enabled=True, mirror=False, preprocessor=None):
+        self.padding = padding
+        self.scale = scale
+        self.min_size = min_size
+        self.enabled = enabled
+        self.mirror = mirror
+        self.preprocessor = preprocessor if preprocessor is not None else Preprocessor()
+        self.box = None
+        self._points = np.zeros((len(FACE_BOX_POINTS), 3), dtype=np.float32)
+
+    def prepare(self, frame, scale=1.0):
+        # Returns the RGB model input and its Region (None when it is the full frame).
+        # scale multiplies the tracker's own downscale factor. The input is a reused buffer.
+        frame_h, frame_w = frame.shape[:2]
+        scale *= self.scale
+        region = None
+        image = frame
+        if self.box is not None:
+            x0, y0, x1, y1 = self.box
+            region = Region(x0, y0, x1 - x0, y1 - y0, frame_w, frame_h)
+            if self.mirror:
+                x0, x1 = frame_w - x1, frame_w - x0
+            # A view: the crop is copied only by the conversion
+            image = frame[y0:y1, x0:x1]
+        return self.preprocessor.model_input(image, scale, self.mirror), region
+
+    def update(self, results, region, frame_w, frame_h):
+        # Sets next frame's crop from the face found in this one
+        if not self.enabled or not results.multi_face_landmarks:
+            self.box = None
+            return
+        landmarks = results.multi_face_landmarks[0].landmark
+        points = self._points
+        points[:] = [(landmarks[i].x, landmarks[i].y, landmarks[i].z) for i in FACE_BOX_POINTS]
+        if region is not None:
+            region.to_frame(points)
+
+        x_min, y_min = points[:, :2].min(axis=0)
+        x_max, y_max = points[:, :2].max(axis=0)
+        cx = (x_min + x_max) * 0.5 * frame_w
+        cy = (y_min + y_max) * 0.5 * frame_h
+        side = max((x_max - x_min) * frame_w, (y_max - y_min) * frame_h) * (1 + 2 * self.padding)
+        side = -(-int(max(side, self.min_size)) // BOX_STEP) * BOX_STEP
+        side = min(side, frame_w, frame_h)
+
+        x0 = int(min(max(cx - side / 2, 0), frame_w - side))
+        y0 = int(min(max(cy - side / 2, 0), frame_h - side))
+        self.box = (x0, y0, x0 + side, y0 + side)
@@ -0,0 +1,452 @@
+import argparse
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from actuators import add_actuator_args, actuator_from_args, format_actuator_stats
+from config import add_config_args, config_from_args, watch_config, Config, MODEL_KEYS
+from pipeline import read_packet, show, FramePacket
+from sources import open_source
+
+# Several capture sources and control modes in one process ("sessions"), e.g. two
+# cameras, or hand and eye control on the same camera at once.
+#   One capture thread per source; sessions on the same source share its frames.
+#   A fixed pool of worker threads runs inference and actuation for all sessions,
+#   always serving the ready session that waited longest, within its own FPS target.
+#   Models live in a ModelPool: at most one Hands / FaceMesh per worker, borrowed for
+#   one frame at a time, so a second stream adds neither a model nor a core.
+# Each session keeps only its newest frame; frames that arrive while it waits are dropped.
+# Entry points: this module's CLI (--session mode:source, any mix), and --extra-source
+# of hand_control.py and eye_control.py (one mode on several sources).
+# The controllers are imported on first use, so those scripts can import this module.
+
+MODES = ("hand", "eye")
+# Controller attribute that holds the model during infer()
+MODEL_ATTRS = {"hand": "hand_detector", "eye": "face_mesh"}
+REPORT_EVERY = 5.0
+
+
+class ModelPool:
+    # Reusable model instances per mode, created on demand up to size each.
+    # MediaPipe tracks between frames, so a session gets back the instance it used
+    # last whenever that one is free; handing it to another stream costs that stream
+    # one full detection.
+    def __init__(self, factories, size):
+        self.factories = factories
+        self.size = size
+        self.free = {mode: [] for mode in factories}
+        self.created = {mode: 0 for mode in factories}
+        self.handoffs = 0
+        self._owners = {}
+        # Bumped by refresh(); instances from an older generation are closed when returned
+        self._generation = {mode: 0 for mode in factories}
+        self._generations = {}
+        self._condition = threading.Condition()
+
+    def acquire(self, mode, session):
+        with self._condition:
+            while True:
+                free = self.free[mode]
+                for i, model in enumerate(free):
+                    if self._owners.get(id(model)) == session:
+                        return free.pop(i)
+                if free:
+                    self.handoffs += 1
+                    return free.pop()
+                if self.created[mode] < self.size:
+                    self.created[mode] += 1
+                    generation = self._generation[mode]
+                    break
+                self._condition.wait()
+        # Built outside the lock so other workers keep running meanwhile
+        model = self.factories[mode]()
+        with self._condition:
+            self._generations[id(model)] = generation
+        return model
+
+    def release(self, mode, session, model):
+        with self._condition:
+            if self._generations[id(model)] != self._generation[mode]:
+                del self._generations[id(model)]
+                self._owners.pop(id(model), None)
+                self.created[mode] -= 1
+                model.close()
+            else:
+                self._owners[id(model)] = session
+                self.free[mode].append(model)
+            self._condition.notify()
+
+    def refresh(self, mode):
+        # Replaces every instance of mode, e.g. after its model options changed; busy ones on return
+        with self._condition:
+            self._generation[mode] += 1
+            for model in self.free[mode]:
+                self._generations.pop(id(model), None)
+                self._owners.pop(id(model), None)
+                model.close()
+            self.created[mode] -= len(self.free[mode])
+            self.free[mode].clear()
+            self._condition.notify_all()
+
+    def close(self):
+        with self._condition:
+            for models in self.free.values():
+                for model in models:
+                    model.close()
+                models.clear()
+
+
+class Feed(threading.Thread):
+    # Reads one source and hands every frame to each session attached to it
+    def __init__(self, spec, manager, realtime=True):
+        super().__init__(name=f"capture {spec}", daemon=True)
+        self.spec = spec
+        self.source = open_source(spec, realtime=realtime)
+        self.manager = manager
+        self.sessions = []
+        self.ended = False
+        self.error = None
+
+    def run(self):
+        seq = 0
+        try:
+            while not self.manager.stop_event.is_set():
+                seq += 1
+                packet = read_packet(self.source, seq)
+                if packet is None:
+                    break
+                self.manager.offer(self, packet)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.manager.feed_ended(self)
+
+
+class Session:
+    def __init__(self, name, mode, controller, feed, target_fps=None):
+        self.name = name
+        self.mode = mode
+        self.controller = controller
+        self.feed = feed
+        self.period = 1.0 / target_fps if target_fps else 0.0
+        # Newest unprocessed packet, and the packet last actuated (for the preview)
+        self.packet = None
+        self.rendered = None
+        self.busy = False
+        self.finished = False
+        self.due = 0.0
+        self.served_at = 0.0
+        self.frames = 0
+        self.dropped = 0
+        self.busy_time = 0.0
+
+    def ready(self, now):
+        return self.packet is not None and not self.busy and not self.finished and now >= self.due
+
+    def process(self, packet, pool):
+        # Runs on a worker; frames of one session never overlap, so the controller needs no locking
+        controller = self.controller
+        t0 = time.perf_counter()
+        model = None
+        if packet.results is None:
+            model = pool.acquire(self.mode, self.name)
+            setattr(controller, MODEL_ATTRS[self.mode], model)
+        try:
+            controller.latency_monitor.mark_capture(packet.t_capture)
+            packet = controller.infer(packet)
+        finally:
+            if model is not None:
+                setattr(controller, MODEL_ATTRS[self.mode], None)
+                pool.release(self.mode, self.name, model)
+        if packet is not None:
+            controller.actuate(packet)
+            self.rendered = packet
+        self.frames += 1
+        self.busy_time += time.perf_counter() - t0
+
+
+class SessionManager:
+    def __init__(self, workers=2, config=None, actuator=None, realtime=True, report_every=REPORT_EVERY):
+        self.config = config if config is not None else Config()
+        self.actuator = actuator
+        self.realtime = realtime
+        self.workers = workers
+        self.pool = ModelPool({"hand": self._create_hand_detector, "eye": self._create_face_mesh}, size=workers)
+        self.feeds = {}
+        self.sessions = []
+        self.report_every = report_every
+        self.stop_event = threading.Event()
+        self._condition = threading.Condition()
+        self._threads = []
+        self._started = None
+        self._last_report = None
+        self.errors = []
+
+    def _create_hand_detector(self):
+        from hand_control import create_hand_detector, MAX_HANDS
+        return create_hand_detector(MAX_HANDS, self.config.hand)
+
+    def _create_face_mesh(self):
+        from eye_control import create_face_mesh
+        return create_face_mesh(self.config.eye)
+
+    def feed(self, spec):
+        # The capture of spec, opened on first use; every session on spec shares it
+        feed = self.feeds.get(spec)
+        if feed is None:
+            feed = self.feeds[spec] = Feed(spec, self, self.realtime)
+        return feed
+
+    def add_session(self, mode, spec, target_fps=None, **options):
+        # options go to the controller (e.g. governor=..., head_pose=...)
+        if mode == "hand":
+            from hand_control import HandController as controller_class
+        else:
+            from eye_control import EyeController as controller_class
+        feed = self.feed(spec)
+        name = f"{mode}:{spec}"
+        controller = controller_class(self.actuator, feed.source.frame_size(), config=self.config, **options)
+        # The low-light switch rebuilds a controller's own model with other confidences. Pooled
+        # models are borrowed per frame by every session of the mode, so one dark camera would
+        # rebuild (and mistune) them for all streams: pooled sessions skip and enhance frames
+        # but keep the profile's confidences.
+        controller.quality.adapt_models = False
+        # One preview window per session
+        controller.window_name = f"{controller.window_name} [{name}]"
+        session = Session(name, mode, controller, feed, target_fps)
+        feed.sessions.append(session)
+        self.sessions.append(session)
+        return session
+
+    def offer(self, feed, packet):
+        # Called by a feed for each frame; sessions on one source see the same pixels
+        with self._condition:
+            for i, session in enumerate(feed.sessions):
+                if session.finished:
+                    continue
+                if i:
+                    shared = packet
+                    packet = FramePacket(shared.seq, shared.t_capture, shared.timestamp, shared.frame)
+                    packet.results = shared.results
+                if session.packet is not None:
+                    session.dropped += 1
+                session.packet = packet
+            self._condition.notify_all()
+
+    def feed_ended(self, feed):
+        with self._condition:
+            feed.ended = True
+            for session in feed.sessions:
+                # Whatever was already captured still gets processed
+                if session.packet is None and not session.busy:
+                    session.finished = True
+            self._condition.notify_all()
+
+    def _next_session(self, now):
+        # The ready session served longest ago; None plus how long to wait otherwise
+        best, wait = None, 0.05
+        for session in self.sessions:
+            if session.ready(now):
+                if best is None or session.served_at < best.served_at:
+                    best = session
+            elif session.packet is not None and not session.busy and not session.finished:
+                wait = min(wait, session.due - now)
+        return best, max(wait, 0.001)
+
+    def _work(self):
+        try:
+            while not self.stop_event.is_set():
+                with self._condition:
+                    now = time.perf_counter()
+                    session, wait = self._next_session(now)
+                    if session is None:
+                        if all(s.finished for s in self.sessions):
+                            self.stop_event.set()
+                            self._condition.notify_all()
+                            return
+                        self._condition.wait(wait)
+                        continue
+                    packet, session.packet = session.packet, None
+                    session.busy = True
+                    session.served_at = now
+                    session.due = max(session.due + session.period, now) if session.period else now
+                try:
+                    session.process(packet, self.pool)
+                finally:
+                    with self._condition:
+                        session.busy = False
+                        if session.controller.exit_requested or (session.packet is None and session.feed.ended):
+                            session.finished = True
+                        self._condition.notify_all()
+        except Exception as e:
+            self.errors.append(e)
+            self.stop_event.set()
+
+    def reconfigure(self, config):
+        # Config watcher callback: models with changed options are rebuilt through the pool,
+        # everything else reaches the controllers between frames
+        changed = [mode for mode in MODES if config.changed(self.config, mode, MODEL_KEYS[mode])]
+        self.config = config
+        for mode in changed:
+            self.pool.refresh(mode)
+        for session in self.sessions:
+            # Not controller.reconfigure(): the pool, not the controller, owns the models
+            session.controller.pending_config = config
+
+    def start(self):
+        self._started = self._last_report = time.perf_counter()
+        for feed in self.feeds.values():
+            feed.start()
+        self._threads = [threading.Thread(target=self._work, name=f"worker {i}", daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def run(self, headless=False):
+        # Blocks until every session ended or ESC; previews and reports run on this thread
+        self.start()
+        try:
+            while not self.stop_event.is_set():
+                if headless:
+                    self.stop_event.wait(0.1)
+                else:
+                    self._show()
+                if self.report_every and time.perf_counter() - self._last_report >= self.report_every:
+                    self._last_report = time.perf_counter()
+                    print(self.format_report(self.report()))
+        finally:
+            self.stop()
+        for feed in self.feeds.values():
+            if feed.error is not None:
+                raise feed.error
+        if self.errors:
+            raise self.errors[0]
+
+    def _show(self):
+        shown = False
+        for session in self.sessions:
+            packet, session.rendered = session.rendered, None
+            if packet is None:
+                continue
+            key = show(session.controller, packet)
+            shown = True
+            if key == 27:  # ESC key
+                self.stop_event.set()
+                return
+            # Keys go to every session ('h' toggles all HUDs)
+            for other in self.sessions:
+                other.controller.handle_key(key)
+        if not shown:
+            time.sleep(0.005)
+
+    def stop(self):
+        self.stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        for feed in self.feeds.values():
+            feed.join(timeout=1.0)
+            feed.source.release()
+        self.pool.close()
+
+    def report(self):
+        elapsed = max(time.perf_counter() - self._started, 1e-6)
+        sessions = {}
+        for session in self.sessions:
+            latencies = session.controller.latency_monitor.latencies
+            sessions[session.name] = {
+                "frames": session.frames,
+                "fps": session.frames / elapsed,
+                "dropped": session.dropped,
+                "busy_ms": session.busy_time / max(session.frames, 1) * 1000,
+                "latency_p50_ms": float(np.percentile(latencies, 50)) * 1000 if latencies else None,
+            }
+        frames = sum(session.frames for session in self.sessions)
+        return {"elapsed": elapsed, "workers": self.workers, "frames": frames, "fps": frames / elapsed,
+                "models": dict(self.pool.created), "handoffs": self.pool.handoffs, "sessions": sessions}
+
+    def format_report(self, report):
+        models = ", ".join(f"{mode}={count}" for mode, count in report["models"].items() if count)
+        lines = [f"📊 {len(report['sessions'])} sessions on {report['workers']} workers: "
+                 f"{report['fps']:.1f} frames/s total | models {models or 'none'} | "
+                 f"{report['handoffs']} model handoffs"]
+        for name, stats in report["sessions"].items():
+            latency = stats["latency_p50_ms"]
+            lines.append(f"    {name:<24} {stats['fps']:6.1f} fps  {stats['busy_ms']:6.2f} ms/frame  "
+                         f"{stats['dropped']:5d} dropped  latency p50 "
+                         + (f"{latency:.1f} ms" if latency is not None else "-"))
+        return "\n".join(lines)
+
+
+def parse_session(spec):
+    # "mode:source[@fps]", e.g. hand:0, eye:1@15, hand:clip.mp4
+    mode, _, rest = spec.partition(":")
+    if mode not in MODES or not rest:
+        raise argparse.ArgumentTypeError(f"expected mode:source[@fps] with mode in {MODES}, got '{spec}'")
+    source, _, fps = rest.rpartition("@") if "@" in rest else (rest, "", "")
+    try:
+        return mode, source, float(fps) if fps else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad FPS target in '{spec}'") from None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run several camera / control-mode sessions on one worker pool")
+    parser.add_argument("--session", dest="sessions", action="append", type=parse_session, required=True,
+                        metavar="MODE:SOURCE[@FPS]",
+                        help="a session, e.g. hand:0 or eye:1@15; repeat for more (same source = shared capture)")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="inference threads, and the most Hands / FaceMesh instances kept per mode")
+    parser.add_argument("--headless", action="store_true", help="do not open preview windows")
+    parser.add_argument("--report-every", type=float, default=REPORT_EVERY,
+                        help="seconds between throughput reports (0: only at the end)")
+    add_actuator_args(parser)
+    add_config_args(parser)
+    return parser.parse_args(argv)
+
+
+def add_extra_source_args(parser):
+    parser.add_argument("--extra-source", dest="extra_sources", action="append", default=[], metavar="SOURCE",
+                        help="also control from this source (repeatable); all sources then share one "
+                             "worker pool and model pool (see sessions.py)")
+    parser.add_argument("--workers", type=int,
+                        help="inference threads with --extra-source (default: one per source)")
+
+
+def run_sessions(manager, args, camera=None, overrides=None):
+    # Runs the manager's sessions to the end with reloads, reports and cleanup.
+    # args: parsed flags with headless and the config flags
+    watcher = watch_config(args, camera, manager.reconfigure, overrides)
+    print(f"🟢 {len(manager.sessions)} sessions on {len(manager.feeds)} sources, {manager.workers} workers")
+    try:
+        manager.run(headless=args.headless)
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        print(manager.format_report(manager.report()))
+        manager.actuator.close()
+        if hasattr(manager.actuator, "summary"):
+            print(format_actuator_stats(manager.actuator.summary()))
+        if not args.headless:
+            cv2.destroyAllWindows()
+    return manager
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # One profile for every session; per-camera profiles do not apply here
+    config = config_from_args(args, None)
+    actuator = actuator_from_args(args)
+    manager = SessionManager(args.workers, config, actuator, report_every=args.report_every)
+    for mode, source, fps in args.sessions:
+        # Headless eye sessions have no 'c' key, so they set the reference on the first face seen
+        options = {"auto_calibrate": args.headless} if mode == "eye" else {}
+        manager.add_session(mode, source, fps, **options)
+    return run_sessions(manager, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class CameraSource:
+    # Live webcam; timestamps are wall-clock seconds
+    provides_landmarks = False
+
+    def __init__(self, index=0):
+        self.cap = cv2.VideoCapture(index)
+
+    def read(self):
+        ret, frame = self.cap.read()
+        return ret, frame, time.time()
+
+    def frame_size(self):
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource:
+    # Recorded clip; timestamps come from the container so replay speed does not matter
+    provides_landmarks = False
+
+    def __init__(self, path, realtime=False):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise FileNotFoundError(f"Cannot open video: {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.realtime = realtime
+        self._start = None
+
+    def read(self):
+        ret, frame = self.cap.read()
+        timestamp = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        if ret and self.realtime:
+            _pace(self, timestamp)
+        return ret, frame, timestamp
+
+    def frame_size(self):
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource:
+    # Directory of still images played back in name order at a fixed frame rate
+    provides_landmarks = False
+
+    def __init__(self, path, fps=30.0, realtime=False):
+        self.paths = sorted(p for p in glob.glob(os.path.join(path, "*"))
+                            if p.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise FileNotFoundError(f"No images found in {path}")
+        self.fps = fps
+        self.realtime = realtime
+        self.index = 0
+        self._start = None
+        self._size = None
+
+    def read(self):
+        if self.index >= len(self.paths):
+            return False, None, None
+        frame = cv2.imread(self.paths[self.index])
+        timestamp = self.index / self.fps
+        self.index += 1
+        if frame is None:
+            return False, None, None
+        if self.realtime:
+            _pace(self, timestamp)
+        return True, frame, timestamp
+
+    def frame_size(self):
+        if self._size is None:
+            h, w = cv2.imread(self.paths[0]).shape[:2]
+            self._size = (w, h)
+        return self._size
+
+    def release(self):
+        pass
+
+
+class Landmark:
+    # Stand-in for a MediaPipe NormalizedLandmark
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def HasField(self, name):
+        # drawing_utils checks for the optional visibility/presence fields
+        return False
+
+
+class LandmarkList:
+    __slots__ = ("landmark",)
+
+    def __init__(self, points):
+        # tolist() converts the whole array (float16 included) to Python floats in one go
+        self.landmark = [Landmark(x, y, z) for x, y, z in points.tolist()]
+
+
+class Classification:
+    __slots__ = ("label", "score")
+
+    def __init__(self, label, score=1.0):
+        self.label = label
+        self.score = score
+
+
+class ClassificationList:
+    __slots__ = ("classification",)
+
+    def __init__(self, label, score=1.0):
+        self.classification = [Classification(label, score)]
+
+
+# Handedness codes stored by LandmarkRecorder
+HANDEDNESS_LABELS = {0: "Left", 1: "Right"}
+HANDEDNESS_CODES = {"Left": 0, "Right": 1}
+
+
+class ReplayResults:
+    # Mimics the parts of the Hands / FaceMesh result objects the controllers read
+    # True on landmarks carried forward by propagate.LandmarkPropagator instead of inferred
+    propagated = False
+
+    def __init__(self, kind, items, handedness=None, scores=None):
+        lists = [LandmarkList(points) for points in items] or None
+        self.multi_hand_landmarks = lists if kind == "hand" else None
+        self.multi_face_landmarks = lists if kind == "face" else None
+        self.multi_handedness = None
+        if lists and handedness is not None and kind == "hand" and all(code >= 0 for code in handedness):
+            scores = scores.tolist() if scores is not None else [1.0] * len(handedness)
+            self.multi_handedness = [ClassificationList(HANDEDNESS_LABELS[code], score)
+                                     for code, score in zip(handedness.tolist(), scores)]
+
+
+class LandmarkReplaySource:
+    # Replays a landmark stream saved by LandmarkRecorder, so MediaPipe is skipped entirely.
+    # read() returns a ReplayResults object in place of a frame.
+    provides_landmarks = True
+
+    def __init__(self, path, realtime=False):
+        data = np.load(path)
+        self.kind = str(data["kind"])
+        self.timestamps = data["timestamps"]
+        self.landmarks = data["landmarks"]
+        self.counts = data["counts"]
+        # Older recordings have no handedness
+        self.handedness = data["handedness"] if "handedness" in data.files else None
+        self.width, self.height = (int(v) for v in data["frame_size"])
+        self.realtime = realtime
+        self.index = 0
+        self._start = None
+
+    def read(self):
+        if self.index >= len(self.timestamps):
+            return False, None, None
+        i = self.index
+        self.index += 1
+        timestamp = float(self.timestamps[i])
+        if self.realtime:
+            _pace(self, timestamp)
+        count = self.counts[i]
+        handedness = self.handedness[i, :count] if self.handedness is not None else None
+        return True, ReplayResults(self.kind, self.landmarks[i, :count], handedness), timestamp
+
+    def frame_size(self):
+        return self.width, self.height
+
+    def release(self):
+        pass
+
+
+class TraceReplaySource:
+    # Replays a binary .trace written by tracefile.TraceWriter straight from a memory map
+    provides_landmarks = True
+
+    def __init__(self, path, realtime=False):
+        from tracefile import TraceReader
+        self.reader = TraceReader(path)
+        self.kind = self.reader.kind
+        self.width, self.height = self.reader.frame_size
+        self.realtime = realtime
+        self._frames = self.reader.iter_frames()
+        self._start = None
+
+    def read(self):
+        frame = next(self._frames, None)
+        if frame is None:
+            return False, None, None
+        timestamp, landmarks, handedness, scores = frame
+        if self.realtime:
+            _pace(self, timestamp)
+        return True, ReplayResults(self.kind, landmarks, handedness, scores), timestamp
+
+    def frame_size(self):
+        return self.width, self.height
+
+    def release(self):
+        pass
+
+
+class LandmarkRecorder:
+    # Collects per-frame landmarks from MediaPipe results and saves them for LandmarkReplaySource
+    def __init__(self, path, kind, frame_size, max_items, num_landmarks):
+        self.path = path
+        self.kind = kind
+        self.frame_size = frame_size
+        self.max_items = max_items
+        self.num_landmarks = num_landmarks
+        self.timestamps = []
+        self.frames = []
+        self.counts = []
+        self.handedness = []
+
+    def add(self, timestamp, results):
+        items = results.multi_hand_landmarks if self.kind == "hand" else results.multi_face_landmarks
+        points = np.zeros((self.max_items, self.num_landmarks, 3), dtype=np.float32)
+        # -1 where MediaPipe gave no handedness (always for faces)
+        handedness = np.full(self.max_items, -1, dtype=np.int8)
+        labels = getattr(results, "multi_handedness", None) or []
+        count = 0
+        for item in (items or [])[:self.max_items]:
+            points[count] = [(lm.x, lm.y, lm.z) for lm in item.landmark[:self.num_landmarks]]
+            if count < len(labels):
+                handedness[count] = HANDEDNESS_CODES.get(labels[count].classification[0].label, -1)
+            count += 1
+        self.timestamps.append(timestamp)
+        self.frames.append(points)
+        self.counts.append(count)
+        self.handedness.append(handedness)
+
+    def save(self):
+        np.savez_compressed(
+            self.path,
+            kind=self.kind,
+            frame_size=np.array(self.frame_size),
+            timestamps=np.array(self.timestamps, dtype=np.float64),
+            landmarks=np.array(self.frames, dtype=np.float32).reshape(-1, self.max_items, self.num_landmarks, 3),
+            counts=np.array(self.counts, dtype=np.int32),
+            handedness=np.array(self.handedness, dtype=np.int8).reshape(-1, self.max_items),
+        )
+        print(f"💾 Saved {len(self.timestamps)} landmark frames to {self.path}")
+
+
+def _pace(source, timestamp):
+    # Sleep so that replay follows the recorded timestamps
+    now = time.perf_counter()
+    if source._start is None:
+        source._start = now - timestamp
+    delay = source._start + timestamp - now
+    if delay > 0:
+        time.sleep(delay)
+
+
+def open_source(spec, realtime=False):
+    # "0" / 0 -> webcam, directory -> images, .npz / .trace -> landmark stream, anything else -> video file
+    if spec is None:
+        return CameraSource(0)
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec))
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, realtime=realtime)
+    if str(spec).endswith(".npz"):
+        return LandmarkReplaySource(spec, realtime=realtime)
+    if str(spec).endswith(".trace"):
+        return TraceReplaySource(spec, realtime=realtime)
+    return VideoFileSource(spec, realtime=realtime)
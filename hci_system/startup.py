@@ -0,0 +1,147 @@
+import argparse
+import importlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Imported first by every entry point, so this is close to interpreter start
+PROCESS_START = time.perf_counter()
+
+# Heavy imports in the order the entry points pull them in
+PROFILED_IMPORTS = ["numpy", "cv2", "mediapipe", "pyautogui", "pyttsx3", "pygame", "PyQt5.QtWidgets"]
+
+
+class StartupProfiler:
+    # Records how long each startup step took and when the first frame was actuated.
+    # Disabled profilers still time time-to-first-frame, which is always reported.
+    def __init__(self, name, enabled=False, log_path=None):
+        self.name = name
+        self.enabled = enabled
+        self.log_path = log_path
+        self.steps = [("imports", (time.perf_counter() - PROCESS_START) * 1000)]
+        self.first_frame_ms = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, label):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(label, (time.perf_counter() - t0) * 1000)
+
+    def add(self, label, ms):
+        with self._lock:
+            self.steps.append((label, ms))
+
+    def import_module(self, name):
+        with self.step(f"import {name}"):
+            return importlib.import_module(name)
+
+    def mark_first_frame(self, packet=None):
+        # Usable as the runners' on_actuated callback
+        if self.first_frame_ms is None:
+            self.first_frame_ms = (time.perf_counter() - PROCESS_START) * 1000
+            print(f"⏱️ {self.name}: time to first frame {self.first_frame_ms:.0f} ms")
+            if self.enabled:
+                print(self.report())
+            if self.log_path:
+                self.save(self.log_path)
+
+    def report(self):
+        lines = [f"🚀 Startup profile: {self.name}"]
+        with self._lock:
+            steps = list(self.steps)
+        for label, ms in steps:
+            lines.append(f"    {label:<28} {ms:8.1f} ms")
+        if self.first_frame_ms is not None:
+            lines.append(f"    {'time to first frame':<28} {self.first_frame_ms:8.1f} ms")
+        return "\n".join(lines)
+
+    def save(self, path):
+        # One JSON line per run, so the file can be tracked over releases
+        with self._lock:
+            steps = dict(self.steps)
+        record = {"entry": self.name, "time": time.time(), "steps_ms": steps,
+                  "time_to_first_frame_ms": self.first_frame_ms}
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+class Background:
+    # Runs fn(*args) on a daemon thread so it overlaps with other startup work
+    def __init__(self, fn, *args, profiler=None, label=None):
+        self._value = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(fn, args, profiler, label), daemon=True)
+        self._thread.start()
+
+    def _run(self, fn, args, profiler, label):
+        t0 = time.perf_counter()
+        try:
+            self._value = fn(*args)
+        except Exception as e:
+            self._error = e
+        if profiler is not None:
+            profiler.add(label or fn.__name__, (time.perf_counter() - t0) * 1000)
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def result(self):
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+def add_startup_args(parser):
+    parser.add_argument("--profile-startup", action="store_true", help="print per-step startup timings")
+    parser.add_argument("--startup-log", metavar="PATH", help="append startup timings as a JSON line to PATH")
+
+
+def profile_cold_start(camera_index=0):
+    # Standalone profile of every heavy import and initialization, in startup order
+    profiler = StartupProfiler("cold start", enabled=True)
+    for name in PROFILED_IMPORTS:
+        try:
+            profiler.import_module(name)
+        except Exception as e:
+            print(f"⚠️ import {name} failed: {e}")
+
+    steps = [
+        ("pygame.mixer.init", lambda: importlib.import_module("pygame").mixer.init()),
+        ("pyttsx3.init", lambda: importlib.import_module("pyttsx3").init()),
+        ("Hands()", lambda: importlib.import_module("hand_control").create_hand_detector()),
+        ("FaceMesh()", lambda: importlib.import_module("eye_control").create_face_mesh()),
+    ]
+    for label, fn in steps:
+        try:
+            with profiler.step(label):
+                fn()
+        except Exception as e:
+            print(f"⚠️ {label} failed: {e}")
+
+    cv2 = importlib.import_module("cv2")
+    with profiler.step("VideoCapture open"):
+        cap = cv2.VideoCapture(camera_index)
+    with profiler.step("first camera frame"):
+        cap.read()
+    cap.release()
+    return profiler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile cold-start cost of imports and initialization")
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--startup-log", metavar="PATH", help="append the profile as a JSON line to PATH")
+    args = parser.parse_args(argv)
+    profiler = profile_cold_start(args.camera)
+    print(profiler.report())
+    if args.startup_log:
+        profiler.save(args.startup_log)
+
+
+if __name__ == "__main__":
+    main()
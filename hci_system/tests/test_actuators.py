@@ -0,0 +1,67 @@
+import time
+
+from actuators import RecordingActuator, ThreadedActuator
+
+
+def calls(backend):
+    return [(name, args) for _, name, args in backend.actions]
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate() and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_small_final_move_is_sent_once_the_pointer_settles():
+    backend = RecordingActuator()
+    actuator = ThreadedActuator(backend, rate=0.0, min_move=5, settle=0.05)
+    actuator.move_to(100, 100)
+    assert wait_for(lambda: len(backend.actions) == 1)
+    # The gesture ends with a step smaller than min_move
+    actuator.move_to(102, 101)
+    assert wait_for(lambda: len(backend.actions) == 2)
+    assert calls(backend)[-1] == ("move_to", (102, 101))
+    actuator.close()
+    assert calls(backend) == [("move_to", (100, 100)), ("move_to", (102, 101))]
+
+
+def test_jitter_below_min_move_is_not_sent_while_moves_keep_coming():
+    backend = RecordingActuator()
+    actuator = ThreadedActuator(backend, rate=0.0, min_move=5, settle=0.5)
+    actuator.move_to(100, 100)
+    assert wait_for(lambda: len(backend.actions) == 1)
+    for i in range(10):
+        actuator.move_to(100 + i % 2, 100)
+        time.sleep(0.01)
+    assert calls(backend) == [("move_to", (100, 100))]
+    assert actuator.moves_skipped >= 1
+    actuator.close()
+    # Closing still lands on the last target
+    assert calls(backend)[-1] == ("move_to", (101, 100))
+
+
+def test_click_lands_on_the_last_target():
+    backend = RecordingActuator()
+    actuator = ThreadedActuator(backend, rate=0.0, min_move=5, settle=10.0)
+    actuator.move_to(100, 100)
+    assert wait_for(lambda: len(backend.actions) == 1)
+    actuator.move_to(103, 100)
+    actuator.mouse_up()
+    actuator.close()
+    assert calls(backend) == [("move_to", (100, 100)), ("move_to", (103, 100)), ("mouse_up", ())]
+
+
+def test_scrolls_are_summed_and_clicks_kept():
+    backend = RecordingActuator()
+    actuator = ThreadedActuator(backend, rate=2.0)
+    # The first flush is immediate; the calls below wait for the next tick together
+    actuator.move_to(0, 0)
+    assert wait_for(lambda: len(backend.actions) == 1)
+    actuator.scroll(50)
+    actuator.scroll(25)
+    actuator.click()
+    actuator.click()
+    actuator.close()
+    assert calls(backend)[1:] == [("scroll", (75,)), ("click", ()), ("click", ())]
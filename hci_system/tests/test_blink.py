@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+import pytest
+
+from blink import WARMUP, BlinkThresholds, EyeLevels, ear_series, label_blinks, replay_clicks, score
+from config import Config
+
+FPS = 30
+CLIPS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "clips")
+
+
+def feed(levels, ears, start=0.0):
+    # Thresholds returned for ears sampled at FPS
+    return [levels.update(ear, start + i / FPS) for i, ear in enumerate(ears)]
+
+
+def open_eye(seconds, level, noise=0.005, seed=0):
+    return level + np.random.default_rng(seed).normal(0.0, noise, int(seconds * FPS))
+
+
+def test_learning_never_reports_a_closed_eye():
+    levels = EyeLevels()
+    thresholds = feed(levels, open_eye(WARMUP - 0.1, 0.3))
+    assert thresholds == [0.0] * len(thresholds)
+    assert levels.threshold is None
+
+
+@pytest.mark.parametrize("open_level", [0.15, 0.3, 0.45])
+def test_threshold_scales_with_the_users_open_level(open_level):
+    levels = EyeLevels(blink_level=0.5)
+    threshold = feed(levels, open_eye(2.0, open_level))[-1]
+    assert 0.3 * open_level < threshold < open_level
+    # A blink of this eye gets below it, open-eye noise does not
+    assert open_level * 0.2 < threshold
+    assert threshold < open_level - 3 * 0.005
+
+
+def test_closures_measure_the_closed_level():
+    levels = EyeLevels(blink_level=0.5)
+    feed(levels, open_eye(2.0, 0.3))
+    before = levels.threshold
+    for blink in range(5):
+        start = 2.0 + blink
+        feed(levels, [0.12] * 4 + list(open_eye(0.9, 0.3, seed=blink)), start)
+    # Closures only as deep as 0.12 raise the closed level from the prior of 0.09
+    assert levels.closed_level == pytest.approx(0.12, abs=0.01)
+    assert levels.threshold > before
+
+
+def test_thresholds_fixed_mode_and_forgetting():
+    fixed = BlinkThresholds(Config({"eye": {"blink_mode": "fixed", "blink_threshold": 0.2}}).eye)
+    assert fixed.update(0.3, 0.3, 0.0) == (0.2, 0.2)
+
+    thresholds = BlinkThresholds(Config({"eye": {"blink_forget_after": 5.0}}).eye)
+    for i, ear in enumerate(open_eye(2.0, 0.3)):
+        left, right = thresholds.update(ear, ear, i / FPS)
+    assert left > 0.0 and right > 0.0
+    # Someone new after the face was gone for longer than forget_after: learned again
+    assert thresholds.update(0.2, 0.2, 10.0) == (0.0, 0.0)
+    assert thresholds.status() == "blink adaptive: learning"
+
+
+def blinking(seconds, level, start=0.0, seed=0):
+    # (times, EARs) at FPS of an open eye at level blinking to 0.03 for 4 frames every second
+    ears = open_eye(seconds, level, seed=seed)
+    for second in range(int(seconds)):
+        ears[second * FPS + FPS // 2:second * FPS + FPS // 2 + 4] = 0.03
+    return start + np.arange(len(ears)) / FPS, ears
+
+
+def test_an_open_level_that_drops_below_the_threshold_is_relearned():
+    levels = EyeLevels(recover_after=3.0)
+    times, ears = blinking(5.0, 0.3)
+    for t, ear in zip(times, ears):
+        levels.update(ear, t)
+    # Head lowered: the open eye now reads below the learned threshold
+    assert 0.15 < levels.threshold
+    times, ears = blinking(10.0, 0.13, start=5.0, seed=1)
+    closed = np.array([ear < levels.update(ear, t) for t, ear in zip(times, ears)])
+    assert levels.recoveries == 1
+    assert levels.open_mean == pytest.approx(0.13, abs=0.01)
+    # A second after recover_after, the open eye reads open again and blinks close it
+    late = times > 5.0 + 3.0 + 1.0
+    blink = ears == 0.03
+    assert not closed[late & ~blink].any()
+    assert closed[late & blink].all()
+
+
+def test_a_closure_shorter_than_recover_after_stays_closed():
+    levels = EyeLevels(recover_after=3.0)
+    feed(levels, open_eye(2.0, 0.3))
+    thresholds = feed(levels, [0.03] * int(2.5 * FPS), 2.0)
+    assert all(0.03 < threshold for threshold in thresholds)
+    assert levels.recoveries == 0
+
+
+def test_blinks_click_again_after_the_open_level_drifts_down():
+    times, ears = blinking(5.0, 0.3)
+    later, lower = blinking(15.0, 0.13, start=5.0, seed=1)
+    series = np.column_stack([np.concatenate([times, later]), np.concatenate([ears, lower]),
+                              np.concatenate([ears, lower])])
+    settings = Config({"eye": {"blink_recover_after": 3.0}}).eye
+    clicks = replay_clicks(series, settings)
+    # The stuck closure (5 s to 8 s) swallows its blinks and never clicks itself
+    assert not [t for t in clicks if 5.0 < t < 8.0 + 1.0 / FPS]
+    assert len([t for t in clicks if t > 9.0]) == 11
+
+
+def test_committed_blink_traces():
+    # benchmarks/clips/blink, written by benchmarks/make_clips.py
+    adaptive = Config().eye
+    fixed = Config({"eye": {"blink_mode": "fixed"}}).eye
+    results = {}
+    for name in ("typical", "narrow", "noisy", "wide", "drift"):
+        series = ear_series(os.path.join(CLIPS, "blink", f"{name}.npz"))
+        reference = label_blinks(series, adaptive.blink_time)
+        assert len(reference) == 10
+        for mode, settings in (("fixed", fixed), ("adaptive", adaptive)):
+            for step in (1, 2, 3):
+                results[name, mode, step] = score(replay_clicks(series, settings, step), reference)
+    for name in ("typical", "narrow", "noisy", "wide"):
+        for step in (1, 2, 3):
+            assert results[name, "adaptive", step]["false"] == 0
+            assert results[name, "adaptive", step]["missed"] == 0
+    # The fixed threshold misses every narrow-eyed blink and clicks on noisy eyes' noise
+    assert results["narrow", "fixed", 1]["missed"] == 10
+    assert results["noisy", "fixed", 1]["false"] > 0
+    # Drift: only the blinks during the stuck closure before recovery are lost
+    assert results["drift", "adaptive", 1] == {"blinks": 10, "clicks": 8, "hits": 8, "false": 0, "missed": 2}
+    assert results["drift", "fixed", 1]["missed"] == 7
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from calibration import CalibrationSession, GazeModel, calibration_targets, load_model, save_model
+
+
+def synthetic_gaze(targets, kind, noise=0.0, seed=0):
+    # Iris offsets (eye widths) that a known mapping turns into the targets
+    rng = np.random.default_rng(seed)
+    t = np.asarray(targets, dtype=np.float64) - 0.5
+    lx = 0.3 * t[:, 0] + (0.05 * t[:, 0] ** 2 if kind == "poly2" else 0.0)
+    ly = 0.2 * t[:, 1]
+    features = np.stack([lx, ly, lx + 0.01, ly - 0.02], axis=1)
+    return features + rng.normal(0.0, noise, features.shape)
+
+
+def grid(n=7):
+    values = np.linspace(0.1, 0.9, n)
+    return np.array([(x, y) for y in values for x in values])
+
+
+@pytest.mark.parametrize("kind", ["affine", "poly2"])
+def test_fit_recovers_the_mapping(kind):
+    targets = grid()
+    model = GazeModel(kind).fit(synthetic_gaze(targets, kind), targets)
+    np.testing.assert_allclose(model.predict_many(synthetic_gaze(targets, kind)), targets, atol=0.01)
+
+
+def test_poly2_fits_a_curved_mapping_better_than_affine():
+    targets = grid()
+    features = synthetic_gaze(targets, "poly2")
+    errors = {kind: np.abs(GazeModel(kind).fit(features, targets).predict_many(features) - targets).max()
+              for kind in ("affine", "poly2")}
+    assert errors["poly2"] < errors["affine"]
+
+
+def test_predict_matches_predict_many_and_recenter_removes_drift():
+    targets = grid()
+    features = synthetic_gaze(targets, "affine")
+    model = GazeModel("affine").fit(features, targets)
+    centre = synthetic_gaze([(0.5, 0.5)], "affine")[0]
+    drifted = ((centre[0] + 0.02, centre[1]), (centre[2] + 0.02, centre[3]))
+    x, y = model.predict(drifted)
+    assert x > 0.52
+    model.recenter(drifted)
+    assert model.predict(drifted) == pytest.approx((0.5, 0.5))
+
+
+def test_model_round_trips_through_its_cache_file(tmp_path):
+    targets = grid(5)
+    model = GazeModel("poly2", info={"points": 25}).fit(synthetic_gaze(targets, "poly2"), targets)
+    path = str(tmp_path / "gaze.json")
+    save_model(model, path)
+    loaded = load_model(path)
+    assert loaded.kind == "poly2" and loaded.info["points"] == 25
+    features = synthetic_gaze(targets, "poly2")
+    np.testing.assert_allclose(loaded.predict_many(features), model.predict_many(features))
+    assert load_model(str(tmp_path / "missing.json")) is None
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        GazeModel("cubic")
+
+
+def test_session_keeps_settled_open_eye_samples_and_fits():
+    targets = calibration_targets(9)
+    assert len(targets) == 9
+    session = CalibrationSession(targets, dwell=1.0, settle=0.5)
+    features = synthetic_gaze(targets, "affine")
+    closed = set(range(0, 200, 7))
+    frame = 0
+    while not session.done:
+        i = session.current
+        now = frame / 20
+        session.add(now, (tuple(features[i, :2]), tuple(features[i, 2:])), eyes_open=frame not in closed)
+        frame += 1
+    timestamps, _, index, _ = session.arrays()
+    assert len(timestamps) > 0
+    # Nothing from the settle time after each dot appeared, nor from closed-eye frames
+    assert (timestamps - index * 1.0 >= 0.5 - 1e-9).all()
+    assert not closed & {int(round(t * 20)) for t in timestamps}
+    model = session.fit("affine")
+    np.testing.assert_allclose(model.predict_many(features), np.asarray(targets), atol=0.01)
+
+
+def test_session_without_samples_for_every_dot_does_not_fit():
+    session = CalibrationSession(calibration_targets(4), dwell=1.0, settle=0.5)
+    for frame in range(20):
+        session.add(frame / 20, ((0.0, 0.0), (0.0, 0.0)))
+    assert session.fit() is None
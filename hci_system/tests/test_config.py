@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from config import Config, ConfigError, coerce, load_config, merge_layers, profile_paths, SCHEMA
+
+
+def test_defaults_come_from_the_schema():
+    config = Config()
+    for section, fields in SCHEMA.items():
+        for name, spec in fields.items():
+            assert getattr(getattr(config, section), name) == spec[1]
+
+
+def test_coerce_accepts_ints_for_floats_but_nothing_else_converts():
+    assert coerce("hand", "drag_hold_time", 2) == 2.0
+    assert isinstance(coerce("hand", "drag_hold_time", 2), float)
+    with pytest.raises(ConfigError):
+        coerce("hand", "scroll_amount", 1.5)
+    with pytest.raises(ConfigError):
+        coerce("hand", "drag_hold_time", "2")
+    # bool is an int subclass, but never a valid number here
+    with pytest.raises(ConfigError):
+        coerce("hand", "scroll_amount", True)
+
+
+def test_coerce_checks_ranges_and_choices():
+    assert coerce("hand", "click_threshold", 2.0) == 2.0
+    with pytest.raises(ConfigError, match="between"):
+        coerce("hand", "click_threshold", 2.5)
+    assert coerce("eye", "blink_mode", "fixed") == "fixed"
+    with pytest.raises(ConfigError, match="one of"):
+        coerce("eye", "blink_mode", "learned")
+    # Free-form strings have no choices
+    assert coerce("eye", "filter", "kalman") == "kalman"
+
+
+def test_coerce_rejects_unknown_names():
+    with pytest.raises(ConfigError, match="section"):
+        coerce("mouse", "speed", 1.0)
+    with pytest.raises(ConfigError, match="setting"):
+        coerce("hand", "speed", 1.0)
+
+
+def test_later_layers_win():
+    config = Config({"hand": {"scroll_amount": 50, "volume_repeat": 0.5}}, {"hand": {"scroll_amount": 20}})
+    assert config.hand.scroll_amount == 20
+    assert config.hand.volume_repeat == 0.5
+    assert config.eye.blink_threshold == SCHEMA["eye"]["blink_threshold"][1]
+    with pytest.raises(ConfigError):
+        Config({"hand": 3})
+
+
+def test_merge_layers():
+    merged = merge_layers({"hand": {"scroll_amount": 50}}, {"hand": {"filter": "ema"}, "eye": {"dead_zone": 5}},
+                          {"hand": {"scroll_amount": 10}})
+    assert merged == {"hand": {"scroll_amount": 10, "filter": "ema"}, "eye": {"dead_zone": 5}}
+
+
+def test_changed_compares_selected_keys():
+    base = Config()
+    edited = Config({"hand": {"scroll_amount": 1}})
+    assert edited.changed(base, "hand")
+    assert not edited.changed(base, "hand", ("model_complexity",))
+    assert not edited.changed(base, "eye")
+
+
+def test_profile_files_merge_in_order(tmp_path):
+    paths = profile_paths("alice smith", "/dev/video2", str(tmp_path / "extra.json"), profile_dir=str(tmp_path))
+    assert [p.rsplit("/", 1)[-1] for p in paths] == ["alice_smith.json", "alice_smith@video2.json", "extra.json"]
+    (tmp_path / "alice_smith.json").write_text(json.dumps({"hand": {"scroll_amount": 50, "filter": "ema"}}))
+    (tmp_path / "alice_smith@video2.json").write_text(json.dumps({"hand": {"scroll_amount": 70}}))
+    # extra.json does not exist and is skipped
+    config = load_config(paths, overrides={"eye": {"dead_zone": 3.0}})
+    assert config.hand.scroll_amount == 70
+    assert config.hand.filter == "ema"
+    assert config.eye.dead_zone == 3.0
+    assert config.sources == paths[:2]
+
+
+def test_broken_profile_raises_config_error(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text("{\"hand\": ")
+    with pytest.raises(ConfigError, match="broken.json"):
+        load_config([str(path)])
+    path.write_text(json.dumps({"hand": {"scroll_amount": "lots"}}))
+    with pytest.raises(ConfigError):
+        load_config([str(path)])
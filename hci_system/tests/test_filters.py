@@ -0,0 +1,65 @@
+import pytest
+
+from filters import EmaFilter, KalmanFilter, OneEuroFilter, create_filter, mode_filter, parse_filter_spec
+
+FILTERS = [EmaFilter, OneEuroFilter, KalmanFilter]
+
+
+def settle(cursor_filter, x, y, start=0.0, frames=90, dt=1 / 30):
+    for i in range(frames):
+        result = cursor_filter.filter(start + i * dt, x, y)
+    return result
+
+
+@pytest.mark.parametrize("cls", FILTERS)
+def test_first_sample_passes_through(cls):
+    assert cls().filter(0.0, 100.0, 200.0) == (100.0, 200.0)
+
+
+@pytest.mark.parametrize("cls", FILTERS)
+def test_converges_to_a_still_target(cls):
+    cursor_filter = cls()
+    cursor_filter.filter(0.0, 0.0, 0.0)
+    x, y = settle(cursor_filter, 500.0, -300.0, start=1 / 30)
+    assert x == pytest.approx(500.0, abs=1.0)
+    assert y == pytest.approx(-300.0, abs=1.0)
+
+
+@pytest.mark.parametrize("cls", [OneEuroFilter, KalmanFilter])
+def test_lags_behind_a_jump_before_converging(cls):
+    cursor_filter = cls()
+    settle(cursor_filter, 0.0, 0.0)
+    x, _ = cursor_filter.filter(3.0, 100.0, 0.0)
+    assert 0.0 < x < 100.0
+
+
+@pytest.mark.parametrize("cls", FILTERS)
+def test_reset_forgets_the_history(cls):
+    cursor_filter = cls()
+    settle(cursor_filter, 0.0, 0.0)
+    cursor_filter.reset()
+    assert cursor_filter.filter(5.0, 640.0, 480.0) == (640.0, 480.0)
+
+
+def test_one_euro_smooths_jitter_at_rest():
+    cursor_filter = OneEuroFilter(min_cutoff=1.0, beta=0.0)
+    outputs = [cursor_filter.filter(i / 30, 100.0 + (5.0 if i % 2 else -5.0), 0.0)[0] for i in range(60)]
+    assert max(outputs[30:]) - min(outputs[30:]) < 5.0
+
+
+def test_repeated_timestamps_do_not_divide_by_zero():
+    for cls in (OneEuroFilter, KalmanFilter):
+        cursor_filter = cls()
+        cursor_filter.filter(1.0, 0.0, 0.0)
+        x, y = cursor_filter.filter(1.0, 10.0, 10.0)
+        assert 0.0 <= x <= 10.0 and 0.0 <= y <= 10.0
+
+
+def test_filter_specs():
+    assert parse_filter_spec("one_euro:min_cutoff=1.0, beta=0.02") == ("one_euro", {"min_cutoff": 1.0, "beta": 0.02})
+    # Parameters not given keep the mode defaults
+    hand = mode_filter("hand", "one_euro:beta=0.5")
+    assert (hand.min_cutoff, hand.beta) == (1.5, 0.5)
+    assert isinstance(mode_filter("eye", "kalman"), KalmanFilter)
+    with pytest.raises(ValueError):
+        create_filter("median")
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from actuators import RecordingActuator
+from config import Config
+from fusion import FusionController, EYE, HAND
+from pipeline import FramePacket
+
+BLACK = np.zeros((240, 320, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def fusion():
+    controller = FusionController(RecordingActuator(), (320, 240), draw=False,
+                                  config=Config({"quality": {"mode": "skip"}}))
+    yield controller
+    controller.close()
+
+
+def packet(seq=1, timestamp=0.0, frame=BLACK):
+    return FramePacket(seq, 0.0, timestamp, frame)
+
+
+def test_frame_both_sides_skip_is_dropped(fusion):
+    # The first dark frame of --quality-gate skip used to crash on the missing inference time
+    assert fusion.infer(packet()) is None
+    assert "hand_model" not in fusion.timer.samples
+    assert "eye_model" not in fusion.timer.samples
+
+
+def test_skipped_eye_holds_the_gaze_and_runs_no_eye_gestures(fusion):
+    fusion.hand.quality.mode = "off"
+    fusion.gaze = (100, 100)
+    result = fusion.infer(packet())
+    hand_packet, eye_packet = result.results
+    assert hand_packet.results is not None and eye_packet.results is None
+    assert "hand_model" in fusion.timer.samples
+    assert "eye_model" not in fusion.timer.samples
+    fusion.actuate(result)
+    # No hand in the black frame; the held gaze keeps pointing
+    assert fusion.state == EYE
+    assert fusion.cursor == (100, 100)
+    assert fusion.gaze == (100, 100)
+
+
+def test_skipped_hand_holds_the_hand_target_and_still_renders(fusion):
+    fusion.eye.quality.mode = "off"
+    fusion.hand_move = (50, 60)
+    result = fusion.infer(packet())
+    hand_packet, eye_packet = result.results
+    assert hand_packet.results is None and eye_packet.results is not None
+    assert "eye_model" in fusion.timer.samples
+    assert "hand_model" not in fusion.timer.samples
+    fusion.actuate(result)
+    assert fusion.state == HAND
+    assert fusion.cursor == (50, 60)
+    assert fusion.render(result).shape == BLACK.shape
@@ -0,0 +1,144 @@
+from actuators import RecordingActuator
+from gestures import (ActionQueue, BlinkGesture, GestureEvent, HoldGesture, PinchGesture, CLICK, DOUBLE_CLICK,
+                      DRAG_END, DRAG_START, MOVE, SCROLL, VOLUME)
+
+
+def names(actuator):
+    return [(name, args) for _, name, args in actuator.actions]
+
+
+def test_queue_coalesces_consecutive_moves_and_sums_scrolls():
+    actuator = RecordingActuator()
+    queue = ActionQueue(actuator, rate_limits={})
+    queue.put(GestureEvent(MOVE, 0.0, (1, 1)))
+    queue.put(GestureEvent(MOVE, 0.01, (5, 7)))
+    queue.put(GestureEvent(SCROLL, 0.02, 100))
+    queue.put(GestureEvent(SCROLL, 0.03, -40))
+    queue.put(GestureEvent(MOVE, 0.04, (9, 9)))
+    queue.flush(0.05)
+    assert names(actuator) == [("move_to", (5, 7)), ("scroll", (60,)), ("move_to", (9, 9))]
+    assert queue.pending == []
+
+
+def test_queue_does_not_merge_across_other_kinds():
+    actuator = RecordingActuator()
+    queue = ActionQueue(actuator, rate_limits={})
+    for kind in (SCROLL, CLICK, SCROLL):
+        queue.put(GestureEvent(kind, 0.0, 10 if kind == SCROLL else None))
+    queue.flush(0.0)
+    assert names(actuator) == [("scroll", (10,)), ("click", ()), ("scroll", (10,))]
+
+
+def test_rate_limited_click_is_dropped():
+    actuator = RecordingActuator()
+    queue = ActionQueue(actuator, rate_limits={CLICK: 0.1})
+    queue.put(GestureEvent(CLICK, 0.0))
+    queue.flush(0.0)
+    queue.put(GestureEvent(CLICK, 0.05))
+    queue.flush(0.05)
+    assert actuator.counts() == {"click": 1}
+    assert queue.dropped == 1
+    assert queue.pending == []
+    # Once the limit has passed clicks go through again
+    queue.put(GestureEvent(CLICK, 0.2))
+    queue.flush(0.2)
+    assert actuator.counts() == {"click": 2}
+
+
+def test_rate_limited_scroll_is_deferred_and_keeps_merging():
+    actuator = RecordingActuator()
+    queue = ActionQueue(actuator, rate_limits={SCROLL: 0.1})
+    queue.put(GestureEvent(SCROLL, 0.0, 100))
+    queue.flush(0.0)
+    queue.put(GestureEvent(SCROLL, 0.03, 100))
+    queue.flush(0.03)
+    queue.put(GestureEvent(SCROLL, 0.06, 100))
+    queue.flush(0.06)
+    assert names(actuator) == [("scroll", (100,))]
+    assert queue.dropped == 0
+    queue.flush(0.12)
+    assert names(actuator) == [("scroll", (100,)), ("scroll", (200,))]
+    assert queue.pending == []
+
+
+def test_volume_steps_use_db_or_media_keys():
+    actuator = RecordingActuator()
+    ActionQueue(actuator, rate_limits={}, volume_step_db=1.5).dispatch(GestureEvent(VOLUME, 0.0, -2))
+    ActionQueue(actuator, rate_limits={}).dispatch(GestureEvent(VOLUME, 0.0, 2))
+    assert names(actuator) == [("adjust_volume", (-3.0,)), ("press", ("volumeup",)), ("press", ("volumeup",))]
+
+
+def run(gesture, samples):
+    # samples: (active, time) pairs; returns the events as (kind, time)
+    events = []
+    for active, now in samples:
+        gesture.update(active, now, events)
+    return [(event.kind, event.time) for event in events]
+
+
+def test_short_pinch_clicks_on_release():
+    assert run(PinchGesture(drag_hold=1.0), [(True, 0.0), (True, 0.3), (False, 0.5)]) == [(CLICK, 0.5)]
+
+
+def test_long_pinch_drags_and_drops_without_clicking():
+    samples = [(True, 0.0), (True, 0.6), (True, 1.1), (True, 1.5), (False, 2.0)]
+    assert run(PinchGesture(drag_hold=1.0), samples) == [(DRAG_START, 1.1), (DRAG_END, 2.0)]
+
+
+def test_cancel_releases_a_drag_and_forgets_a_pinch():
+    events = []
+    pinch = PinchGesture(drag_hold=1.0)
+    for now in (0.0, 1.2):
+        pinch.update(True, now, events)
+    pinch.cancel(1.3, events)
+    assert [event.kind for event in events] == [DRAG_START, DRAG_END]
+    assert not pinch.active
+
+    events = []
+    pinch.update(True, 2.0, events)
+    pinch.cancel(2.1, events)
+    # Reopening after a cancelled pinch must not click
+    pinch.update(False, 2.2, events)
+    assert events == []
+
+
+def test_blink_shorter_than_min_time_does_not_click():
+    blink = BlinkGesture(min_time=0.1, double_time=0.5)
+    assert run(blink, [(False, 0.0), (True, 1.0), (True, 1.05), (False, 1.08)]) == []
+
+
+def test_blink_clicks_on_reopening_after_min_time():
+    blink = BlinkGesture(min_time=0.1, double_time=0.5)
+    assert run(blink, [(True, 1.0), (True, 1.1), (False, 1.15)]) == [(CLICK, 1.15)]
+
+
+def test_closure_longer_than_max_time_does_not_click():
+    blink = BlinkGesture(min_time=0.05, double_time=0.5, max_time=2.0)
+    samples = [(True, 1.0), (False, 3.5), (True, 4.0), (False, 4.1)]
+    assert run(blink, samples) == [(CLICK, 4.1)]
+
+
+def test_two_blinks_within_double_time_double_click():
+    blink = BlinkGesture(min_time=0.05, double_time=0.5)
+    samples = [(True, 1.0), (False, 1.1), (True, 1.3), (False, 1.4),
+               # A third blink starts a new pair
+               (True, 1.6), (False, 1.7)]
+    assert run(blink, samples) == [(CLICK, 1.1), (DOUBLE_CLICK, 1.4), (CLICK, 1.7)]
+
+
+def test_blinks_further_apart_than_double_time_click_twice():
+    blink = BlinkGesture(min_time=0.05, double_time=0.5)
+    samples = [(True, 1.0), (False, 1.1), (True, 2.0), (False, 2.1)]
+    assert run(blink, samples) == [(CLICK, 1.1), (CLICK, 2.1)]
+
+
+def test_hold_fires_after_hold_time_then_repeats():
+    hold = HoldGesture(VOLUME, 1, hold_time=0.25, repeat=0.5)
+    samples = [(True, t / 8) for t in range(0, 10)]
+    assert run(hold, samples) == [(VOLUME, 0.25), (VOLUME, 0.75)]
+
+
+def test_hold_restarts_after_release():
+    hold = HoldGesture(VOLUME, 1, hold_frames=2)
+    assert run(hold, [(True, 0.0), (True, 0.1), (False, 0.2), (True, 0.3), (True, 0.4)]) == \
+        [(VOLUME, 0.1), (VOLUME, 0.4)]
@@ -0,0 +1,84 @@
+import numpy as np
+
+from hand_tracks import BOTH, MAX_MISSED, MODIFIER, POINTER, HandTracker
+from sources import HANDEDNESS_CODES, ReplayResults
+
+
+def results(*hands):
+    # hands: (x, y, handedness label or None), in MediaPipe's result order
+    points = np.zeros((len(hands), 21, 3), dtype=np.float32)
+    for i, (x, y, _) in enumerate(hands):
+        points[i, :, :2] = (x, y)
+    labels = [label for _, _, label in hands]
+    handedness = np.array([HANDEDNESS_CODES[label] if label else -1 for label in labels], dtype=np.int8)
+    return ReplayResults("hand", points, handedness)
+
+
+def roles(tracks):
+    return {track.track_id: track.role for track in tracks}
+
+
+def pointer(tracks):
+    return next(track for track in tracks if track.role in (POINTER, BOTH))
+
+
+def test_single_hand_does_everything():
+    tracks = HandTracker().update(results((0.5, 0.5, "Left")))
+    assert [track.role for track in tracks] == [BOTH]
+
+
+def test_handedness_picks_the_pointer_whatever_the_result_order():
+    tracker = HandTracker(pointer_hand="Right")
+    tracks = tracker.update(results((0.3, 0.5, "Left"), (0.7, 0.5, "Right")))
+    right = pointer(tracks)
+    assert right.index == 1 and right.handedness == "Right"
+    # MediaPipe lists the hands the other way round on the next frame
+    tracks = tracker.update(results((0.71, 0.5, "Right"), (0.31, 0.5, "Left")))
+    assert pointer(tracks).track_id == right.track_id
+    assert pointer(tracks).index == 0
+    assert sorted(roles(tracks).values()) == [MODIFIER, POINTER]
+
+
+def test_left_handed_pointer():
+    tracks = HandTracker(pointer_hand="Left").update(results((0.3, 0.5, "Left"), (0.7, 0.5, "Right")))
+    assert pointer(tracks).handedness == "Left"
+
+
+def test_pointer_stays_when_a_second_hand_enters():
+    tracker = HandTracker(pointer_hand="Right")
+    # No handedness: the only hand points, even though it is on the left
+    first = tracker.update(results((0.3, 0.5, None)))[0]
+    # A second, unlabelled hand enters on the pointer side and is listed first
+    tracks = tracker.update(results((0.8, 0.5, None), (0.31, 0.5, None)))
+    assert pointer(tracks).track_id == first.track_id
+    assert pointer(tracks).index == 1
+
+
+def test_ids_follow_positions_when_hands_cross_in_the_result_order():
+    tracker = HandTracker()
+    tracks = tracker.update(results((0.2, 0.5, "Left"), (0.8, 0.5, "Right")))
+    ids = {track.index: track.track_id for track in tracks}
+    tracks = tracker.update(results((0.79, 0.52, "Right"), (0.21, 0.49, "Left")))
+    assert {track.track_id: track.index for track in tracks} == {ids[0]: 1, ids[1]: 0}
+
+
+def test_a_briefly_lost_hand_keeps_its_id():
+    tracker = HandTracker()
+    track_id = tracker.update(results((0.5, 0.5, "Right")))[0].track_id
+    for _ in range(MAX_MISSED):
+        assert tracker.update(results()) == []
+    assert tracker.update(results((0.52, 0.5, "Right")))[0].track_id == track_id
+
+
+def test_a_hand_lost_for_too_long_gets_a_new_id():
+    tracker = HandTracker()
+    track_id = tracker.update(results((0.5, 0.5, "Right")))[0].track_id
+    for _ in range(MAX_MISSED + 1):
+        tracker.update(results())
+    assert tracker.update(results((0.5, 0.5, "Right")))[0].track_id != track_id
+
+
+def test_a_far_jump_is_a_new_hand():
+    tracker = HandTracker()
+    track_id = tracker.update(results((0.1, 0.5, "Right")))[0].track_id
+    assert tracker.update(results((0.9, 0.5, "Right")))[0].track_id != track_id
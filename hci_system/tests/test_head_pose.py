@@ -0,0 +1,93 @@
+import math
+
+import numpy as np
+import pytest
+
+from head_pose import HeadPose, HeadPoseEstimator, compensate, pointer_position
+from sources import LandmarkList
+
+W, H = 640, 480
+NOSE_TIP = 1
+
+
+def face_points():
+    # A rigid head in pixels (x right, y down, z away from the camera), nose towards the camera
+    points = np.random.default_rng(0).normal(0.0, 1.0, (478, 3)) * (50.0, 60.0, 30.0)
+    points[NOSE_TIP] = (0.0, 10.0, -70.0)
+    return points
+
+
+def rotation(yaw=0.0, pitch=0.0):
+    # Physical head turn: yaw > 0 swings the nose towards +x of the selfie image, pitch > 0 towards +y (down)
+    y, p = math.radians(yaw), math.radians(pitch)
+    turn = np.array([[math.cos(y), 0.0, -math.sin(y)], [0.0, 1.0, 0.0], [math.sin(y), 0.0, math.cos(y)]])
+    nod = np.array([[1.0, 0.0, 0.0], [0.0, math.cos(p), -math.sin(p)], [0.0, math.sin(p), math.cos(p)]])
+    return turn @ nod
+
+
+def landmarks(yaw=0.0, pitch=0.0):
+    # Normalized landmarks as the controllers hold them (mirrored into the selfie view)
+    points = face_points() @ rotation(yaw, pitch).T + (W / 2, H / 2, 0.0)
+    return LandmarkList(points / (W, H, W)).landmark
+
+
+def estimate(yaw=0.0, pitch=0.0):
+    estimator = HeadPoseEstimator()
+    estimator.set_reference(landmarks(), W, H)
+    return estimator.update(landmarks(yaw, pitch), W, H)
+
+
+def test_rotation_helper_moves_the_nose_the_stated_way():
+    nose = [landmarks(yaw, pitch)[NOSE_TIP] for yaw, pitch in ((0, 0), (10, 0), (0, 10))]
+    assert nose[1].x > nose[0].x
+    assert nose[2].y > nose[0].y
+
+
+@pytest.mark.parametrize("yaw", [-15.0, -10.0, 10.0, 15.0])
+def test_yaw_sign_and_size(yaw):
+    pose = estimate(yaw=yaw)
+    # yaw > 0: nose to the right of the mirrored image, i.e. the head turned towards the screen's right
+    assert pose.yaw == pytest.approx(yaw, abs=0.5)
+    assert pose.pitch == pytest.approx(0.0, abs=0.5)
+
+
+@pytest.mark.parametrize("pitch", [-10.0, 10.0])
+def test_pitch_sign_and_size(pitch):
+    pose = estimate(pitch=pitch)
+    # pitch > 0: nose down
+    assert pose.pitch == pytest.approx(pitch, abs=0.5)
+    assert pose.yaw == pytest.approx(0.0, abs=0.5)
+
+
+def test_reference_pose_is_zero():
+    pose = estimate()
+    assert (pose.yaw, pose.pitch, pose.roll) == pytest.approx((0.0, 0.0, 0.0), abs=1e-6)
+    assert pose.scale == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("yaw, pitch", [(10.0, 0.0), (-10.0, 0.0), (0.0, 8.0), (0.0, -8.0)])
+def test_compensate_moves_the_gaze_point_with_the_head(yaw, pitch):
+    # Eyes straight ahead in the head: the gaze follows the head turn
+    (lx, ly), (rx, ry) = compensate(((0.0, 0.0), (0.0, 0.0)), estimate(yaw, pitch))
+    expected = (math.sin(math.radians(yaw)) / 2.5, math.sin(math.radians(pitch)) / 2.5)
+    assert (lx, ly) == pytest.approx(expected, abs=2e-3)
+    assert (rx, ry) == pytest.approx(expected, abs=2e-3)
+    # The cursor mappings move right for a larger x offset and down for a larger y offset
+    assert lx * yaw >= 0 and ly * pitch >= 0
+
+
+@pytest.mark.parametrize("yaw", [-12.0, 12.0])
+def test_compensate_cancels_eyes_that_counter_rotate(yaw):
+    # Head turned while the eyes stay on the same screen point: the iris shifts the other way in the eye
+    offset = -math.sin(math.radians(yaw)) / 2.5
+    (lx, _), (rx, _) = compensate(((offset, 0.0), (offset, 0.0)), estimate(yaw=yaw))
+    assert lx == pytest.approx(0.0, abs=1e-3)
+    assert rx == pytest.approx(0.0, abs=1e-3)
+
+
+def test_head_pointer_follows_the_nose():
+    x, y = pointer_position(estimate(yaw=10.0, pitch=-6.0))
+    assert x > 0.5 and y < 0.5
+    x, y = pointer_position(estimate(yaw=-10.0, pitch=6.0))
+    assert x < 0.5 and y > 0.5
+    assert pointer_position(HeadPose(yaw=90.0, pitch=-90.0)) == (1.0, 0.0)
@@ -0,0 +1,152 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+from actuators import RecordingActuator
+from hand_control import HandController
+from pipeline import FramePacket
+from propagate import action_mismatch, format_row, LandmarkPropagator, HAND_TRACK_POINTS
+from sources import ReplayResults
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from make_clips import hand_trace  # noqa: E402
+
+FPS = 30
+RIGHT = np.array([1])
+
+
+def hand(dx=0.0, dy=0.0):
+    # One hand's (1, 21, 3) landmarks around the frame centre, shifted by (dx, dy)
+    points = np.zeros((1, 21, 3), dtype=np.float32)
+    points[0, :, 0] = np.linspace(0.4, 0.6, 21) + dx
+    points[0, :, 1] = np.linspace(0.35, 0.65, 21) + dy
+    return points
+
+
+def results(points, handedness=RIGHT):
+    return ReplayResults("hand", points, handedness)
+
+
+def test_extrapolate_carries_the_last_velocity_forward():
+    propagator = LandmarkPropagator("hand", "extrapolate", max_skip=2)
+    propagator.observe(None, results(hand()), None, 0.0)
+    propagator.observe(None, results(hand(0.005)), None, 1 / FPS)
+    assert not propagator.should_infer(2 / FPS)
+    guessed = propagator.propagate(None, 2 / FPS)
+    assert guessed.propagated
+    assert not results(hand()).propagated
+    landmarks = guessed.multi_hand_landmarks[0].landmark
+    assert landmarks[0].x == pytest.approx(0.4 + 0.01, abs=1e-5)
+    assert landmarks[0].y == pytest.approx(0.35, abs=1e-5)
+    # Handedness is carried along, so the tracker keeps the hand's role
+    assert guessed.multi_handedness[0].classification[0].label == "Right"
+
+
+def test_k_grows_while_predictions_hold_and_halves_on_a_miss():
+    propagator = LandmarkPropagator("hand", "extrapolate", max_skip=4, tolerance=0.01)
+    for i in range(60):
+        t = i / FPS
+        if propagator.should_infer(t):
+            # Steady motion: extrapolation predicts every inference
+            propagator.observe(None, results(hand(0.002 * i)), None, t)
+        else:
+            propagator.propagate(None, t)
+    assert propagator.skip == 4
+    # The hand jumps: the prediction misses by far more than the tolerance
+    propagator.observe(None, results(hand(0.3)), None, 60 / FPS)
+    assert propagator.error > 0.01
+    assert propagator.skip == 2
+
+
+def test_hand_count_change_resets_the_velocity_and_no_hands_resets_all():
+    propagator = LandmarkPropagator("hand", "extrapolate", max_skip=2)
+    propagator.observe(None, results(hand()), None, 0.0)
+    propagator.observe(None, results(np.concatenate([hand(), hand(0.2)]), np.array([1, 0])), None, 1 / FPS)
+    assert propagator.velocity is None
+    propagator.observe(None, results(np.zeros((0, 21, 3), np.float32), None), None, 2 / FPS)
+    assert propagator.points is None
+    assert propagator.should_infer(3 / FPS)
+
+
+def test_hold_forces_the_next_inference():
+    propagator = LandmarkPropagator("hand", "extrapolate", max_skip=4)
+    propagator.observe(None, results(hand()), None, 0.0)
+    assert not propagator.should_infer(1 / FPS)
+    propagator.hold()
+    assert propagator.should_infer(1 / FPS)
+    # Inference clears it
+    propagator.observe(None, results(hand()), None, 1 / FPS)
+    assert not propagator.should_infer(2 / FPS)
+    # Without skipping there is nothing to hold
+    off = LandmarkPropagator("hand", "off")
+    off.hold()
+    assert not off.force
+
+
+def test_flow_follows_the_pixels_in_mirrored_coordinates():
+    rng = np.random.default_rng(0)
+    texture = cv2.GaussianBlur(rng.integers(0, 256, (240, 320)).astype(np.uint8), (5, 5), 0)
+    frame = cv2.cvtColor(texture, cv2.COLOR_GRAY2BGR)
+    # The camera image moves 4 px right and 2 px down; the mirrored landmarks move left
+    moved = np.roll(frame, (2, 4), axis=(0, 1))
+    propagator = LandmarkPropagator("hand", "flow", max_skip=2)
+    propagator.observe(frame, results(hand()), None, 0.0)
+    guessed = propagator.propagate(moved, 1 / FPS)
+    assert guessed.propagated
+    points = np.array([(lm.x, lm.y) for lm in guessed.multi_hand_landmarks[0].landmark])
+    shift = points[HAND_TRACK_POINTS] - hand()[0, HAND_TRACK_POINTS, :2]
+    assert shift[:, 0] == pytest.approx(-4 / 320, abs=0.5 / 320)
+    assert shift[:, 1] == pytest.approx(2 / 240, abs=0.5 / 240)
+
+
+def test_flow_needs_a_previous_frame():
+    propagator = LandmarkPropagator("hand", "flow", max_skip=2)
+    propagator.observe(None, results(hand()), None, 0.0)
+    assert propagator.propagate(np.zeros((240, 320, 3), np.uint8), 1 / FPS) is None
+    assert propagator.should_infer(1 / FPS)
+
+
+def run_pinch(propagated_frames):
+    # The committed pinch clip through a HandController; frames in propagated_frames are marked guessed
+    actuator = RecordingActuator()
+    controller = HandController(actuator, (640, 480), draw=False)
+    controller.propagator.method = "extrapolate"
+    held = []
+    for t, points in enumerate(hand_trace()):
+        packet = FramePacket(t, 0.0, t / FPS, None)
+        packet.results = results(points)
+        packet.results.propagated = t in propagated_frames
+        controller.actuate(packet)
+        held.append(controller.propagator.force)
+        controller.propagator.force = False
+    return [name for _, name, _ in actuator.actions], held
+
+
+def test_pinches_are_decided_on_inferred_frames_only():
+    names, held = run_pinch(set())
+    assert names.count("click") == 1
+    # The pinch (frames 100-109) keeps the model running
+    assert all(held[100:110]) and not any(held[:100])
+    # A pinch seen only on guessed landmarks does not click
+    names, _ = run_pinch(set(range(95, 115)))
+    assert names.count("click") == 0
+    # Guessed frames mid-pinch neither end it nor click early
+    names, _ = run_pinch({103, 104, 105})
+    assert names.count("click") == 1
+
+
+def test_action_mismatch_ignores_cursor_moves():
+    reference = {"actions": {"click": 1, "move_to": 300}}
+    assert action_mismatch({"actions": {"click": 1, "move_to": 291}}, reference) == {}
+    assert action_mismatch({"actions": {"click": 2, "move_to": 300}}, reference) == {"click": (2, 1)}
+    assert action_mismatch({"actions": {"move_to": 300}}, reference) == {"click": (0, 1)}
+
+
+def test_format_row_flags_a_lost_click():
+    run = {"inferences": 150, "model_ms": None, "cpu_s": 1.0, "cursor": [], "actions": {"move_to": 300}}
+    reference = dict(run, inferences=300, actions={"click": 1, "move_to": 300})
+    assert "⚠️ vs full: click 0 != 1" in format_row("extrapolate k≤2", run, reference)
+    assert "⚠️" not in format_row("full", reference, reference)
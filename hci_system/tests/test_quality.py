@@ -0,0 +1,106 @@
+import cv2
+import numpy as np
+
+from quality import ENHANCE, OK, SKIP, FrameQualityGate
+
+FPS = 30
+
+
+def scene(level=120.0, blur=0, seed=0):
+    # 640x480 frame of 4x4 px blocks around the given mean level (the gate measures a
+    # 160x120 thumbnail, which keeps them), optionally blurred
+    texture = np.random.default_rng(seed).normal(0.0, 40.0, (120, 160))
+    gray = cv2.resize(texture, (640, 480), interpolation=cv2.INTER_NEAREST)
+    if blur:
+        gray = cv2.GaussianBlur(gray, (0, 0), blur)
+    gray = np.clip(gray * (level / 120.0) + level, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+
+def black():
+    return np.zeros((480, 640, 3), np.uint8)
+
+
+def test_black_frames_are_skipped_for_at_most_max_skip_time():
+    gate = FrameQualityGate("skip", max_skip_time=0.25)
+    assert gate.check(scene(), 0.0) == OK
+    verdicts = [gate.check(black(), i / FPS) for i in range(1, 31)]
+    assert gate.reason == "too dark"
+    # Frames 1-7 are within 0.25 s of the last pass, frame 8 goes through, then the next run of skips
+    assert verdicts[:7] == [SKIP] * 7
+    assert verdicts[7] == OK
+    passed = [i for i, verdict in enumerate(verdicts, 1) if verdict == OK]
+    assert all(b - a <= 0.25 * FPS + 1 for a, b in zip([0] + passed, passed))
+
+
+def test_a_frame_far_blurrier_than_the_scene_is_skipped():
+    gate = FrameQualityGate("skip", blur_ratio=0.35)
+    sharp = scene()
+    for i in range(10):
+        assert gate.check(sharp, i / FPS) == OK
+    assert gate.check(scene(blur=4), 10 / FPS) == SKIP
+    assert gate.reason == "blurred"
+    assert gate.sharpness < 0.35 * gate.baseline
+    # Slightly soft frames pass
+    assert gate.check(scene(blur=0.5), 11 / FPS) == OK
+
+
+def test_the_first_frame_sets_the_baseline_and_is_not_called_blurred():
+    gate = FrameQualityGate("skip")
+    assert gate.check(scene(blur=4), 0.0) == OK
+    assert gate.baseline == gate.sharpness
+
+
+def test_enhance_brightens_dark_frames_into_reused_buffers():
+    gate = FrameQualityGate("enhance")
+    dark = scene(level=30)
+    assert gate.check(dark, 0.0) == ENHANCE
+    out = gate.enhance(dark)
+    assert out.mean() > dark.mean() + 40
+    assert gate.check(dark, 1 / FPS) == ENHANCE
+    again = gate.enhance(dark)
+    assert again is out
+    assert not np.shares_memory(out, dark)
+
+
+def test_enhance_stretches_flat_frames():
+    gate = FrameQualityGate("enhance", contrast_level=15.0)
+    flat = scene(level=120) // 8 + 105
+    assert gate.check(flat, 0.0) == ENHANCE
+    out = gate.enhance(flat)
+    assert out.std() > flat.std()
+    assert gate.enhance(flat) is out
+    # Frames that are neither dark nor flat are left alone
+    assert FrameQualityGate("enhance").check(scene(), 0.0) == OK
+    assert FrameQualityGate("skip").check(scene(level=30), 0.0) == OK
+
+
+def test_low_light_switches_only_after_low_light_after():
+    gate = FrameQualityGate("skip", low_light_after=2.0)
+    dark = scene(level=30)
+    for i in range(60):
+        gate.check(dark, i / FPS)
+    assert not gate.low_light
+    assert not gate.take_light_change()
+    # A brief return of the light restarts the count
+    gate.check(scene(), 60 / FPS)
+    for i in range(61, 121):
+        gate.check(dark, i / FPS)
+    assert not gate.low_light
+    gate.check(dark, 121 / FPS)
+    assert gate.low_light
+    assert gate.take_light_change()
+    assert not gate.take_light_change()
+    for i in range(122, 200):
+        gate.check(scene(), i / FPS)
+    assert not gate.low_light
+    assert gate.take_light_change()
+
+
+def test_shared_models_are_not_rebuilt_for_low_light():
+    gate = FrameQualityGate("skip", low_light_after=1.0)
+    gate.adapt_models = False
+    for i in range(40):
+        gate.check(scene(level=30), i / FPS)
+    assert gate.low_light
+    assert not gate.take_light_change()
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import numpy as np
+
+from actuators import RecordingActuator
+from sessions import SessionManager
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from make_clips import face_trace, hand_trace, save_trace  # noqa: E402
+
+# The benchmark clips replayed at 100 FPS, paced, so a session keeps up with its feed
+FPS = 100.0
+FRAMES = 300
+
+
+def clips(tmp_path):
+    hand = str(tmp_path / "hand.npz")
+    eye = str(tmp_path / "eye.npz")
+    save_trace(hand, "hand", hand_trace(FRAMES), FPS, handedness=np.ones((FRAMES, 1), dtype=np.int8))
+    save_trace(eye, "face", face_trace(FRAMES, blink_every=100, blink_frames=10), FPS)
+    return hand, eye
+
+
+def names(actuator):
+    return [name for _, name, _ in actuator.actions]
+
+
+def run(*sessions):
+    actuator = RecordingActuator()
+    manager = SessionManager(2, actuator=actuator, report_every=0)
+    for mode, spec, options in sessions:
+        manager.add_session(mode, spec, **options)
+    manager.run(headless=True)
+    return manager, actuator
+
+
+def test_hand_and_eye_sessions_run_on_one_worker_pool(tmp_path):
+    hand, eye = clips(tmp_path)
+    manager, actuator = run(("hand", hand, {}), ("eye", eye, {"auto_calibrate": True}))
+    assert not manager.errors
+    assert len(manager.feeds) == 2
+    assert all(session.frames > FRAMES // 2 for session in manager.sessions)
+    assert "click" in names(actuator)
+    assert "move_to" in names(actuator)
+
+
+def test_sessions_on_one_source_share_its_capture(tmp_path):
+    hand, _ = clips(tmp_path)
+    manager, actuator = run(("hand", hand, {}), ("hand", hand, {"draw": False}))
+    assert not manager.errors
+    assert len(manager.feeds) == 1
+    assert all(session.frames > FRAMES // 2 for session in manager.sessions)
+    # Both sessions saw the pinch
+    assert names(actuator).count("click") == 2
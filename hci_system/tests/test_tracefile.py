@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from sources import ReplayResults, TraceReplaySource
+from tracefile import TraceReader, TraceWriter, TracingActuator
+from actuators import RecordingActuator
+
+FRAMES = 10
+CHUNK_FRAMES = 4
+
+
+def hand_frames(frames=FRAMES):
+    # Frame i has i % 3 hands; hand j of frame i sits at (i, j) / 100
+    rng = np.random.default_rng(0)
+    for i in range(frames):
+        count = i % 3
+        points = rng.random((count, 21, 3)).astype(np.float32)
+        points[:, 0, :2] = (i / 100, 0.5)
+        handedness = np.array([1, 0][:count], dtype=np.int8)
+        yield i / 30, points, handedness
+
+
+def write_trace(path, dtype="float32"):
+    writer = TraceWriter(str(path), "hand", (640, 480), 2, 21, dtype, chunk_frames=CHUNK_FRAMES)
+    frames = list(hand_frames())
+    for timestamp, points, handedness in frames:
+        writer.add(timestamp, ReplayResults("hand", points, handedness, np.full(len(handedness), 0.9)))
+        writer.add_action("move_to", (timestamp * 10, 5.0))
+    writer.add_action("click", ())
+    writer.close()
+    return frames
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "session.trace"
+    frames = write_trace(path)
+    reader = TraceReader(str(path))
+    assert (reader.kind, reader.frame_size, reader.frames) == ("hand", (640, 480), FRAMES)
+    assert len(reader.chunks) == 3
+    for (timestamp, points, handedness), (t, landmarks, labels, scores) in zip(frames, reader.iter_frames()):
+        assert t == timestamp
+        np.testing.assert_array_equal(landmarks, points)
+        np.testing.assert_array_equal(labels, handedness)
+        np.testing.assert_allclose(scores, 0.9)
+    assert reader.action_counts() == {"move_to": FRAMES, "click": 1}
+    actions = reader.actions()
+    assert actions["frame"][-1] == FRAMES - 1
+    assert actions["a"][1] == pytest.approx(10 / 30)
+
+
+def test_float16_landmarks_replay_through_the_source(tmp_path):
+    path = tmp_path / "session.trace"
+    frames = write_trace(path, dtype="float16")
+    source = TraceReplaySource(str(path))
+    for timestamp, points, handedness in frames:
+        ok, results, t = source.read()
+        assert ok and t == timestamp
+        replayed = results.multi_hand_landmarks or []
+        assert len(replayed) == len(points)
+        for hand, expected in zip(replayed, points):
+            assert hand.landmark[5].x == pytest.approx(expected[5, 0], abs=1e-3)
+        if len(points):
+            assert [item.classification[0].label for item in results.multi_handedness] == \
+                ["Right", "Left"][:len(points)]
+    assert source.read()[0] is False
+
+
+def test_truncated_trace_keeps_every_complete_chunk(tmp_path):
+    path = tmp_path / "crashed.trace"
+    write_trace(path)
+    reader = TraceReader(str(path))
+    last_chunk = reader._chunk_offsets()[-1]
+    # Unmapped before truncating, as a crashed writer would leave it
+    del reader
+    # Cut into the last chunk, losing it and the index
+    with open(path, "r+b") as f:
+        f.truncate(last_chunk + 20)
+    reader = TraceReader(str(path))
+    assert len(reader.chunks) == 2
+    assert reader.frames == 2 * CHUNK_FRAMES
+    timestamps = [t for t, _, _, _ in reader.iter_frames()]
+    assert timestamps == [i / 30 for i in range(2 * CHUNK_FRAMES)]
+
+
+def test_trace_without_a_trailer_is_walked(tmp_path):
+    path = tmp_path / "unclosed.trace"
+    writer = TraceWriter(str(path), "face", (640, 480), 1, 478, "float16", chunk_frames=2)
+    face = np.full((1, 478, 3), 0.5, dtype=np.float32)
+    for i in range(5):
+        writer.add(i / 30, ReplayResults("face", face))
+    # The process died: the last partial chunk and the index were never written
+    writer._file.flush()
+    reader = TraceReader(str(path))
+    assert reader.frames == 4
+    writer._file.close()
+
+
+def test_not_a_trace(tmp_path):
+    path = tmp_path / "other.trace"
+    path.write_bytes(b"not a trace at all")
+    with pytest.raises(ValueError):
+        TraceReader(str(path))
+
+
+def test_tracing_actuator_logs_and_forwards(tmp_path):
+    writer = TraceWriter(str(tmp_path / "actions.trace"), "hand", (640, 480), 2, 21, "float16")
+    actuator = RecordingActuator()
+    traced = TracingActuator(actuator, writer)
+    traced.click()
+    traced.press("volumedown")
+    assert traced.screen_size() == actuator.screen_size()
+    writer.close()
+    reader = TraceReader(str(tmp_path / "actions.trace"))
+    assert actuator.counts() == {"click": 1, "press": 1}
+    assert reader.action_counts() == {"click": 1, "press": 1}
+    assert reader.actions()["a"][1] == 1
@@ -0,0 +1,296 @@
+import argparse
+import json
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+# Append-only binary trace of a session: per-frame timestamps, landmarks, handedness
+# and detection scores, plus the actions sent to the actuator.
+#
+#   header   MAGIC, uint32 length, JSON (kind, frame_size, max_items, num_landmarks, dtype, ...)
+#   chunk*   CHUNK_MAGIC, uint32 frames, uint32 actions, then the chunk's arrays back to back:
+#            timestamps f8[n], counts u1[n], handedness i1[n, items], scores f4[n, items],
+#            landmarks dtype[n, items, points, 3], actions ACTION_DTYPE[a]
+#   index    INDEX_MAGIC, uint32 chunks, uint64 offsets[chunks]
+#   trailer  uint64 index offset, END_MAGIC
+#
+# Chunks are written as they fill, so a crashed session loses at most one chunk; a file
+# without a trailer is indexed by walking the chunks. TraceReader memory-maps the file
+# and hands out views, so replay never copies or decodes the whole trace.
+
+MAGIC = b"HCITRC01"
+CHUNK_MAGIC = b"CHNK"
+INDEX_MAGIC = b"INDX"
+END_MAGIC = b"HCIEND00"
+CHUNK_HEADER = struct.Struct("<4sII")
+TRAILER = struct.Struct("<Q8s")
+
+ACTIONS = ["move_to", "click", "double_click", "mouse_down", "mouse_up", "scroll", "press", "adjust_volume"]
+PRESS_KEYS = ["volumeup", "volumedown"]
+ACTION_DTYPE = np.dtype([("frame", "<u4"), ("time", "<f8"), ("action", "u1"), ("a", "<f4"), ("b", "<f4")])
+
+DTYPES = {"float16": np.float16, "float32": np.float32}
+CHUNK_FRAMES = 256
+
+
+class TraceWriter:
+    # Drop-in for LandmarkRecorder: add(timestamp, results) per inferred frame,
+    # add_action(name, args) for every actuator call, close() at the end
+    def __init__(self, path, kind, frame_size, max_items, num_landmarks, dtype="float16",
+                 chunk_frames=CHUNK_FRAMES):
+        self.path = path
+        self.kind = kind
+        self.max_items = max_items
+        self.num_landmarks = num_landmarks
+        self.chunk_frames = chunk_frames
+        self.frames = 0
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._offsets = []
+
+        self._timestamps = np.zeros(chunk_frames, dtype="<f8")
+        self._counts = np.zeros(chunk_frames, dtype="u1")
+        self._handedness = np.full((chunk_frames, max_items), -1, dtype="i1")
+        self._scores = np.full((chunk_frames, max_items), np.nan, dtype="<f4")
+        self._landmarks = np.zeros((chunk_frames, max_items, num_landmarks, 3), dtype=DTYPES[dtype])
+        self._actions = []
+        self._n = 0
+
+        header = json.dumps({
+            "kind": kind, "frame_size": list(frame_size), "max_items": max_items,
+            "num_landmarks": num_landmarks, "dtype": dtype, "created": time.time(),
+        }).encode()
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    def add(self, timestamp, results):
+        items = results.multi_hand_landmarks if self.kind == "hand" else results.multi_face_landmarks
+        labels = getattr(results, "multi_handedness", None) or []
+        with self._lock:
+            i = self._n
+            self._timestamps[i] = timestamp
+            self._handedness[i] = -1
+            self._scores[i] = np.nan
+            count = 0
+            for item in (items or [])[:self.max_items]:
+                self._landmarks[i, count] = [(lm.x, lm.y, lm.z) for lm in item.landmark[:self.num_landmarks]]
+                if count < len(labels):
+                    classification = labels[count].classification[0]
+                    self._handedness[i, count] = 1 if classification.label == "Right" else 0
+                    self._scores[i, count] = classification.score
+                count += 1
+            self._counts[i] = count
+            self._n += 1
+            self.frames += 1
+            if self._n == self.chunk_frames:
+                self._write_chunk()
+
+    def add_action(self, name, args):
+        # Tagged with the latest recorded frame and the seconds since recording started
+        if name not in ACTIONS:
+            return
+        a = b = 0.0
+        if name == "move_to":
+            a, b = args
+        elif name == "press":
+            a = PRESS_KEYS.index(args[0]) if args[0] in PRESS_KEYS else -1
+        elif args:
+            a = args[0]
+        with self._lock:
+            self._actions.append((max(self.frames - 1, 0), time.perf_counter() - self._start,
+                                  ACTIONS.index(name), a, b))
+
+    def _write_chunk(self):
+        n = self._n
+        actions = np.array(self._actions, dtype=ACTION_DTYPE)
+        f = self._file
+        self._offsets.append(f.tell())
+        f.write(CHUNK_HEADER.pack(CHUNK_MAGIC, n, len(actions)))
+        for array in (self._timestamps, self._counts, self._handedness, self._scores, self._landmarks):
+            f.write(array[:n].tobytes())
+        f.write(actions.tobytes())
+        f.flush()
+        self._n = 0
+        self._actions = []
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._n or self._actions:
+                self._write_chunk()
+            f = self._file
+            index_offset = f.tell()
+            f.write(INDEX_MAGIC + struct.pack("<I", len(self._offsets)))
+            f.write(np.array(self._offsets, dtype="<u8").tobytes())
+            f.write(TRAILER.pack(index_offset, END_MAGIC))
+            f.close()
+        print(f"💾 Saved {self.frames} frames to {self.path}")
+
+    # LandmarkRecorder compatibility
+    save = close
+
+
+class TraceChunk:
+    __slots__ = ("first_frame", "timestamps", "counts", "handedness", "scores", "landmarks", "actions")
+
+
+class TraceReader:
+    def __init__(self, path):
+        self.path = path
+        self.data = np.memmap(path, dtype="u1", mode="r")
+        if bytes(self.data[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a landmark trace")
+        (length,) = struct.unpack_from("<I", self.data, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(self.data[start:start + length]))
+        self.header = header
+        self.kind = header["kind"]
+        self.frame_size = tuple(header["frame_size"])
+        self.max_items = header["max_items"]
+        self.num_landmarks = header["num_landmarks"]
+        self.dtype = np.dtype(DTYPES[header["dtype"]])
+        self.first_chunk = start + length
+
+        self.chunks = []
+        frames = 0
+        for offset in self._chunk_offsets():
+            chunk = self._map_chunk(offset, frames)
+            frames += len(chunk.timestamps)
+            self.chunks.append(chunk)
+        self.frames = frames
+
+    def _chunk_offsets(self):
+        data = self.data
+        if len(data) >= TRAILER.size:
+            index_offset, end = TRAILER.unpack_from(data, len(data) - TRAILER.size)
+            if end == END_MAGIC and bytes(data[index_offset:index_offset + 4]) == INDEX_MAGIC:
+                (count,) = struct.unpack_from("<I", data, index_offset + 4)
+                return np.frombuffer(data, dtype="<u8", count=count, offset=index_offset + 8).tolist()
+        # No trailer (the session did not close cleanly): walk the chunks
+        offsets = []
+        offset = self.first_chunk
+        while offset + CHUNK_HEADER.size <= len(data):
+            magic, n, a = CHUNK_HEADER.unpack_from(data, offset)
+            size = CHUNK_HEADER.size + self._chunk_bytes(n) + a * ACTION_DTYPE.itemsize
+            if magic != CHUNK_MAGIC or offset + size > len(data):
+                break
+            offsets.append(offset)
+            offset += size
+        return offsets
+
+    def _chunk_bytes(self, n):
+        items, points = self.max_items, self.num_landmarks
+        return n * (8 + 1 + items + 4 * items + items * points * 3 * self.dtype.itemsize)
+
+    def _map_chunk(self, offset, first_frame):
+        data = self.data
+        magic, n, a = CHUNK_HEADER.unpack_from(data, offset)
+        offset += CHUNK_HEADER.size
+        items, points = self.max_items, self.num_landmarks
+
+        def take(dtype, shape):
+            nonlocal offset
+            count = int(np.prod(shape))
+            array = np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(shape)
+            offset += array.nbytes
+            return array
+
+        chunk = TraceChunk()
+        chunk.first_frame = first_frame
+        chunk.timestamps = take("<f8", (n,))
+        chunk.counts = take("u1", (n,))
+        chunk.handedness = take("i1", (n, items))
+        chunk.scores = take("<f4", (n, items))
+        chunk.landmarks = take(self.dtype, (n, items, points, 3))
+        chunk.actions = take(ACTION_DTYPE, (a,))
+        return chunk
+
+    def iter_frames(self):
+        # (timestamp, landmarks[count], handedness[count], scores[count]) per frame, as views
+        for chunk in self.chunks:
+            for i in range(len(chunk.timestamps)):
+                count = chunk.counts[i]
+                yield (float(chunk.timestamps[i]), chunk.landmarks[i, :count],
+                       chunk.handedness[i, :count], chunk.scores[i, :count])
+
+    def actions(self):
+        # All recorded actions as one structured array
+        if not self.chunks:
+            return np.zeros(0, dtype=ACTION_DTYPE)
+        return np.concatenate([chunk.actions for chunk in self.chunks])
+
+    def action_counts(self):
+        codes, counts = np.unique(self.actions()["action"], return_counts=True)
+        return {ACTIONS[code]: int(count) for code, count in zip(codes, counts)}
+
+
+class TracingActuator:
+    # Wraps the session's actuator and logs every action into the trace
+    def __init__(self, actuator, writer):
+        self.actuator = actuator
+        self.writer = writer
+
+    def __getattr__(self, name):
+        attr = getattr(self.actuator, name)
+        if name not in ACTIONS:
+            return attr
+
+        def traced(*args):
+            self.writer.add_action(name, args)
+            return attr(*args)
+
+        setattr(self, name, traced)
+        return traced
+
+
+def add_trace_args(parser):
+    parser.add_argument("--record-trace", metavar="PATH",
+                        help="stream landmarks and actions into a binary .trace file")
+    parser.add_argument("--trace-dtype", default="float16", choices=list(DTYPES),
+                        help="landmark precision in the trace")
+
+
+def convert_npz(npz_path, trace_path, dtype="float16"):
+    # Turns a LandmarkRecorder .npz into a trace, e.g. to benchmark replay on existing clips
+    from sources import LandmarkReplaySource
+    source = LandmarkReplaySource(npz_path)
+    writer = TraceWriter(trace_path, source.kind, source.frame_size(), source.landmarks.shape[1],
+                         source.landmarks.shape[2], dtype)
+    while True:
+        ok, results, timestamp = source.read()
+        if not ok:
+            break
+        writer.add(timestamp, results)
+    writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or convert landmark traces")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="summarize a trace")
+    info.add_argument("path")
+    convert = sub.add_parser("convert", help="convert a landmark .npz into a trace")
+    convert.add_argument("npz")
+    convert.add_argument("trace")
+    convert.add_argument("--dtype", default="float16", choices=list(DTYPES))
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        convert_npz(args.npz, args.trace, args.dtype)
+        return
+    reader = TraceReader(args.path)
+    duration = 0.0
+    if reader.frames:
+        duration = float(reader.chunks[-1].timestamps[-1] - reader.chunks[0].timestamps[0])
+    print(f"📼 {args.path}: {reader.kind}, {reader.frames} frames in {len(reader.chunks)} chunks, "
+          f"{duration:.1f} s, {reader.dtype.name} landmarks, {os.path.getsize(args.path) / 1e6:.1f} MB")
+    counts = reader.action_counts()
+    print("    actions: " + (", ".join(f"{name}={count}" for name, count in sorted(counts.items())) or "none"))
+
+
+if __name__ == "__main__":
+    main()